@@ -1,6 +1,7 @@
 import requests
 import uuid
 import sys
+import json
 
 BASE_URL = "http://localhost:8000"
 
@@ -9,7 +10,7 @@ def chat_session(initial_message=None):
     print(f"Starting session: {session_id}")
     
     if initial_message:
-        send_message(session_id, initial_message)
+        stream_message(session_id, initial_message)
         return
 
     print("Type 'quit' to exit.")
@@ -22,7 +23,48 @@ def chat_session(initial_message=None):
         if user_input.lower() in ["quit", "exit"]:
             break
         
-        send_message(session_id, user_input)
+        stream_message(session_id, user_input)
+
+def iter_stream_frames(response):
+    """Yield the JSON frames of a Server-Sent Events response."""
+    for line in response.iter_lines(decode_unicode=True):
+        if line and line.startswith("data: "):
+            yield json.loads(line[len("data: "):])
+
+def stream_message(session_id, message):
+    payload = {
+        "session_id": session_id,
+        "message": message
+    }
+    try:
+        with requests.post(f"{BASE_URL}/agent/chat/stream", json=payload, stream=True) as response:
+            response.raise_for_status()
+            streaming = False  # True while partial chunks of a message are being printed
+            print("Agent: ", end="", flush=True)
+            for frame in iter_stream_frames(response):
+                kind = frame["type"]
+                if kind == "text":
+                    if frame["partial"]:
+                        print(frame["text"], end="", flush=True)
+                        streaming = True
+                    elif not streaming:
+                        # Aggregated text that was not streamed chunk by chunk
+                        print(frame["text"], end="", flush=True)
+                    else:
+                        streaming = False
+                elif kind == "transfer":
+                    print(f"\n  [-> {frame['to']}] ", end="", flush=True)
+                elif kind == "tool_call":
+                    print(f"\n  [tool] {frame['name']}({frame['args']}) ", end="", flush=True)
+                elif kind == "artifact":
+                    print(f"\n  [artifact] {', '.join(frame['names'])} ", end="", flush=True)
+                elif kind == "error":
+                    print(f"\nError: {frame['detail']}")
+            print()
+    except requests.exceptions.ConnectionError:
+        print("Error: Could not connect to the Agent Engine. Is it running?")
+    except Exception as e:
+        print(f"Error: {e}")
 
 def send_message(session_id, message):
     payload = {
@@ -39,6 +81,29 @@ def send_message(session_id, message):
     except Exception as e:
         print(f"Error: {e}")
 
+def send_batch(items, max_concurrency=None):
+    """
+    Run many {"session_id", "message", "user_id"?} items through /agent/chat/batch.
+    Prints each result as it finishes; returns all item results ordered by index.
+    """
+    payload = {"items": items, "max_concurrency": max_concurrency}
+    results = [None] * len(items)
+    try:
+        with requests.post(f"{BASE_URL}/agent/chat/batch", json=payload, stream=True) as response:
+            response.raise_for_status()
+            for frame in iter_stream_frames(response):
+                if frame["type"] == "item":
+                    results[frame["index"]] = frame
+                    detail = frame.get("response") or frame.get("detail", "")
+                    print(f"[{frame['index']}] {frame['status']} {frame['latency_ms']:.0f}ms {frame['session_id']}: {detail[:80]}")
+                elif frame["type"] == "done":
+                    print(f"Batch done: {frame['ok']} ok, {frame['error']} failed, {frame['shed']} shed in {frame['duration_ms']:.0f}ms")
+    except requests.exceptions.ConnectionError:
+        print("Error: Could not connect to the Agent Engine. Is it running?")
+    except Exception as e:
+        print(f"Error: {e}")
+    return results
+
 if __name__ == "__main__":
     msg = sys.argv[1] if len(sys.argv) > 1 else None
     chat_session(msg)
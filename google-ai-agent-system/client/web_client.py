@@ -2,6 +2,7 @@ import streamlit as st
 import requests
 import uuid
 import time
+import json
 
 # Page Config
 st.set_page_config(page_title="Google AI Agent System", page_icon="🤖", layout="wide")
@@ -51,26 +52,50 @@ if prompt := st.chat_input("Ask me anything... (try 'Search for recent AI news')
     with st.chat_message("user"):
         st.markdown(prompt)
 
-    # Call API
+    # Call API (streamed, so partial text and agent activity render as they arrive)
     with st.chat_message("assistant"):
+        activity_placeholder = st.empty()
         message_placeholder = st.empty()
         full_response = ""
+        pending = ""  # partial chunks of the message currently being streamed
         
-        with st.spinner("Thinking..."):
-            try:
-                payload = {
-                    "session_id": st.session_state.session_id,
-                    "message": prompt
-                }
-                response = requests.post(f"{BASE_URL}/agent/chat", json=payload)
+        try:
+            payload = {
+                "session_id": st.session_state.session_id,
+                "message": prompt
+            }
+            with requests.post(f"{BASE_URL}/agent/chat/stream", json=payload, stream=True) as response:
                 if response.status_code == 200:
-                    data = response.json()
-                    full_response = data["response"]
-                    message_placeholder.markdown(full_response)
+                    for line in response.iter_lines(decode_unicode=True):
+                        if not line or not line.startswith("data: "):
+                            continue
+                        frame = json.loads(line[len("data: "):])
+                        kind = frame["type"]
+                        if kind == "text":
+                            if frame["partial"]:
+                                pending += frame["text"]
+                            else:
+                                # The aggregated event replaces the chunks streamed before it
+                                full_response += frame["text"]
+                                pending = ""
+                            message_placeholder.markdown(full_response + pending + "▌")
+                        elif kind == "transfer":
+                            activity_placeholder.caption(f"🔀 {frame['author']} → {frame['to']}")
+                        elif kind == "tool_call":
+                            activity_placeholder.caption(f"🛠 {frame['author']} is calling `{frame['name']}`")
+                        elif kind == "artifact":
+                            activity_placeholder.caption(f"📎 New artifacts: {', '.join(frame['names'])}")
+                        elif kind == "error":
+                            message_placeholder.error(f"Error: {frame['detail']}")
+                        elif kind == "done":
+                            full_response = frame["response"]
+                            activity_placeholder.empty()
+                    if full_response:
+                        message_placeholder.markdown(full_response)
                 else:
                     message_placeholder.error(f"Error: {response.status_code} - {response.text}")
-            except Exception as e:
-                message_placeholder.error(f"Connection Error: {e}")
+        except Exception as e:
+            message_placeholder.error(f"Connection Error: {e}")
                 
     # Add assistant response to state
     if full_response:
@@ -0,0 +1,173 @@
+import os
+import time
+from array import array
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.llm_response import LlmResponse
+from google.adk.plugins.base_plugin import BasePlugin
+
+# Per-bucket fields, in storage order
+FIELDS = ("calls", "prompt", "completion", "cached", "total", "cost_micros")
+DIMENSIONS = ("user", "session", "agent", "model")
+
+def parse_prices(spec: str) -> Dict[str, Tuple[float, ...]]:
+    """
+    'gemini-2.5-flash=0.30/2.50/0.03' -> {'gemini-2.5-flash': (0.30, 2.50, 0.03)}
+    (USD per 1M input/output[/cached input] tokens). Without a cached rate, cached tokens cost the input rate.
+    """
+    prices = {}
+    for item in spec.split(","):
+        if "=" in item and "/" in item:
+            model, rates = item.split("=", 1)
+            prices[model.strip()] = tuple(float(rate) for rate in rates.split("/")[:3])
+    return prices
+
+class _Usage:
+    """
+    Rolling usage for one key: a ring of time buckets per field plus all-time totals.
+    Flat typed arrays, so recording a call only writes integers in place.
+    """
+    __slots__ = ("epochs", "buckets", "totals")
+
+    def __init__(self, n_buckets: int):
+        self.epochs = array("q", [-1] * n_buckets)
+        self.buckets = [array("q", bytes(8 * n_buckets)) for _ in FIELDS]
+        self.totals = array("q", bytes(8 * len(FIELDS)))
+
+    def add(self, epoch: int, slot: int, prompt: int, completion: int, cached: int, total: int, cost: int):
+        buckets = self.buckets
+        if self.epochs[slot] != epoch:
+            # Slot last used a full ring ago: recycle it
+            self.epochs[slot] = epoch
+            for field in buckets:
+                field[slot] = 0
+        buckets[0][slot] += 1
+        buckets[1][slot] += prompt
+        buckets[2][slot] += completion
+        buckets[3][slot] += cached
+        buckets[4][slot] += total
+        buckets[5][slot] += cost
+        totals = self.totals
+        totals[0] += 1
+        totals[1] += prompt
+        totals[2] += completion
+        totals[3] += cached
+        totals[4] += total
+        totals[5] += cost
+
+    def window(self, since_epoch: int) -> List[int]:
+        sums = [0] * len(FIELDS)
+        for slot, epoch in enumerate(self.epochs):
+            if epoch >= since_epoch:
+                for i, field in enumerate(self.buckets):
+                    sums[i] += field[slot]
+        return sums
+
+class UsageLedger:
+    """
+    Token and cost accounting per user, session, agent and model.
+    Usage is kept in `bucket_seconds` buckets over a rolling `window_seconds` horizon (default:
+    one-minute buckets over an hour) plus all-time totals. Only touched from the event loop,
+    so updates need no locks; each dimension keeps at most `max_keys` keys (least recently used dropped).
+    """
+    def __init__(
+        self,
+        bucket_seconds: Optional[int] = None,
+        window_seconds: Optional[int] = None,
+        max_keys: Optional[int] = None,
+        prices: Optional[Dict[str, Tuple[float, ...]]] = None
+    ):
+        self.bucket_seconds = bucket_seconds or int(os.getenv("ACCOUNTING_BUCKET_SECONDS", "60"))
+        self.window_seconds = window_seconds or int(os.getenv("ACCOUNTING_WINDOW_SECONDS", "3600"))
+        self.max_keys = max_keys or int(os.getenv("ACCOUNTING_MAX_KEYS", "10000"))
+        self.prices = prices if prices is not None else parse_prices(os.getenv("ACCOUNTING_PRICES", ""))
+        self.n_buckets = max(1, -(-self.window_seconds // self.bucket_seconds))
+        self._keys: Dict[str, "OrderedDict[str, _Usage]"] = {dim: OrderedDict() for dim in DIMENSIONS}
+
+    def _usage(self, dimension: str, key: str) -> _Usage:
+        keys = self._keys[dimension]
+        usage = keys.get(key)
+        if usage is None:
+            usage = keys[key] = _Usage(self.n_buckets)
+            if len(keys) > self.max_keys:
+                keys.popitem(last=False)
+        else:
+            keys.move_to_end(key)
+        return usage
+
+    def record(self, user_id: str, session_id: str, agent: str, model: str,
+               prompt: int, completion: int, cached: int, total: int, thoughts: int = 0):
+        epoch = int(time.time()) // self.bucket_seconds
+        slot = epoch % self.n_buckets
+        rates = self.prices.get(model)
+        # USD per 1M tokens * tokens = micro-USD. Cached tokens are part of the prompt count
+        # and billed at the cached rate; thinking tokens are billed as output.
+        cost = 0
+        if rates:
+            cached_rate = rates[2] if len(rates) > 2 else rates[0]
+            cost = int((prompt - cached) * rates[0] + cached * cached_rate + (completion + thoughts) * rates[1])
+        self._usage("user", user_id).add(epoch, slot, prompt, completion, cached, total, cost)
+        self._usage("session", session_id).add(epoch, slot, prompt, completion, cached, total, cost)
+        self._usage("agent", agent).add(epoch, slot, prompt, completion, cached, total, cost)
+        self._usage("model", model).add(epoch, slot, prompt, completion, cached, total, cost)
+
+    def window_total(self, dimension: str, key: str, seconds: Optional[int] = None, field: str = "total") -> int:
+        """Sum of one field over the last `seconds` (rounded up to whole buckets). Used for budgets."""
+        usage = self._keys[dimension].get(key)
+        if usage is None:
+            return 0
+        return usage.window(self._since(seconds))[FIELDS.index(field)]
+
+    def _since(self, seconds: Optional[int]) -> int:
+        seconds = min(seconds or self.window_seconds, self.window_seconds)
+        return int(time.time()) // self.bucket_seconds - (-(-seconds // self.bucket_seconds)) + 1
+
+    def _describe(self, usage: _Usage, seconds: Optional[int]) -> Dict[str, Any]:
+        window = dict(zip(FIELDS, usage.window(self._since(seconds))))
+        totals = dict(zip(FIELDS, usage.totals))
+        for values in (window, totals):
+            values["cost_usd"] = round(values.pop("cost_micros") / 1e6, 6)
+        return {"window": window, "all_time": totals}
+
+    def report(self, dimension: str, key: Optional[str] = None, window_seconds: Optional[int] = None, top_n: int = 20) -> Dict[str, Any]:
+        if dimension not in self._keys:
+            raise ValueError(f"Unknown dimension '{dimension}'. Use one of: {', '.join(DIMENSIONS)}.")
+        seconds = min(window_seconds or self.window_seconds, self.window_seconds)
+        keys = self._keys[dimension]
+        if key is not None:
+            usage = keys.get(key)
+            return {"dimension": dimension, "key": key, "window_seconds": seconds,
+                    **(self._describe(usage, seconds) if usage else {"window": None, "all_time": None})}
+
+        ranked = sorted(keys.items(), key=lambda kv: kv[1].window(self._since(seconds))[4], reverse=True)
+        return {
+            "dimension": dimension,
+            "window_seconds": seconds,
+            "keys": len(keys),
+            "top": [{"key": k, **self._describe(u, seconds)} for k, u in ranked[:top_n]]
+        }
+
+class UsageAccountingPlugin(BasePlugin):
+    """Feeds usage_metadata from every final model response into a UsageLedger."""
+    def __init__(self, ledger: UsageLedger):
+        super().__init__(name="usage_accounting")
+        self.ledger = ledger
+
+    async def after_model_callback(self, *, callback_context: CallbackContext, llm_response: LlmResponse) -> Optional[LlmResponse]:
+        usage = llm_response.usage_metadata
+        if llm_response.partial or usage is None:
+            return None
+        self.ledger.record(
+            callback_context.user_id,
+            callback_context.session.id,
+            callback_context.agent_name,
+            llm_response.model_version or "unknown",
+            usage.prompt_token_count or 0,
+            usage.candidates_token_count or 0,
+            usage.cached_content_token_count or 0,
+            usage.total_token_count or 0,
+            usage.thoughts_token_count or 0
+        )
+        return None
@@ -0,0 +1,192 @@
+import asyncio
+import heapq
+import itertools
+import math
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from engine.identity import IdentityCache
+from observability.metrics import METRICS
+
+QUEUE_WAIT = METRICS.histogram(
+    "admission_queue_wait_seconds", "Time from arrival to admission; 0 for requests admitted without queuing.")
+
+def _parse_weights(spec: str) -> Dict[str, float]:
+    """'admin=4,researcher=2' -> {'admin': 4.0, 'researcher': 2.0}"""
+    weights = {}
+    for item in spec.split(","):
+        if "=" in item:
+            role, weight = item.split("=", 1)
+            weights[role.strip()] = float(weight)
+    return weights
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+class AdmissionRejected(Exception):
+    """Raised when a request is shed; the API maps it to 429 with Retry-After."""
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(f"Request shed ({reason}), retry after {retry_after}s")
+        self.reason = reason
+        self.retry_after = retry_after
+
+class AdmissionController:
+    """
+    Admission control in front of the Runner.
+    - At most `max_concurrent` invocations run at once; the rest wait in a bounded queue.
+    - Waiters are released in weighted-fair order: every user_id is its own flow, weighted
+      by role, so a single tenant flooding the queue cannot starve the others.
+    - A request that cannot be queued, or waits longer than `queue_timeout`, is shed.
+    """
+    def __init__(
+        self,
+        max_concurrent: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        max_queue_per_user: Optional[int] = None,
+        queue_timeout: Optional[float] = None,
+        role_weights: Optional[Dict[str, float]] = None,
+        identities: Optional[IdentityCache] = None
+    ):
+        self.max_concurrent = max_concurrent if max_concurrent is not None else int(os.getenv("ADMISSION_MAX_CONCURRENT", "8"))
+        self.max_queue = max_queue if max_queue is not None else int(os.getenv("ADMISSION_MAX_QUEUE", "64"))
+        self.max_queue_per_user = max_queue_per_user if max_queue_per_user is not None else int(os.getenv("ADMISSION_MAX_QUEUE_PER_USER", "16"))
+        self.queue_timeout = queue_timeout if queue_timeout is not None else float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "10"))
+        self.role_weights = role_weights or _parse_weights(os.getenv("ADMISSION_ROLE_WEIGHTS", "admin=4,researcher=2,guest=1"))
+        self.identities = identities or IdentityCache()
+
+        self._in_flight = 0
+        # WFQ state: heap of (finish_tag, seq, start_tag, user_id, future)
+        self._heap: List[Tuple[float, int, float, str, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._virtual_time = 0.0
+        self._last_finish: Dict[str, float] = {}
+        self._queued = 0
+        self._queued_per_user: Dict[str, int] = {}
+
+        # Metrics
+        self._service_ewma = 0.0
+        self._waits: Deque[float] = deque(maxlen=1024)
+        self.admitted = 0
+        self.shed: Dict[str, int] = {"queue_full": 0, "user_queue_full": 0, "queue_timeout": 0}
+
+    async def _weight(self, user_id: str) -> float:
+        identity = await self.identities.resolve(user_id)
+        return self.role_weights.get(identity.role, 1.0)
+
+    def _retry_after(self) -> int:
+        # Time for the queue ahead to drain at the observed service rate
+        return max(1, math.ceil(self._service_ewma * (self._queued + 1) / max(1, self.max_concurrent)))
+
+    def _reject(self, reason: str):
+        self.shed[reason] += 1
+        raise AdmissionRejected(reason, self._retry_after())
+
+    def _dispatch(self):
+        while self._in_flight < self.max_concurrent and self._heap:
+            _, _, start_tag, user_id, future = heapq.heappop(self._heap)
+            if future.cancelled():
+                continue  # gave up while queued; already uncounted
+            self._virtual_time = max(self._virtual_time, start_tag)
+            self._dequeued(user_id)
+            self._in_flight += 1
+            future.set_result(None)
+        if not self._queued:
+            # Busy period over: drop finish tags (and cancelled leftovers) so idle users start fresh
+            self._heap.clear()
+            self._last_finish.clear()
+
+    def _dequeued(self, user_id: str):
+        self._queued -= 1
+        self._queued_per_user[user_id] -= 1
+        if not self._queued_per_user[user_id]:
+            del self._queued_per_user[user_id]
+
+    async def acquire(self, user_id: str) -> float:
+        """Wait for a slot; returns the time spent queued. Raises AdmissionRejected."""
+        # Resolved first: no await between the checks below and taking a slot or a queue position
+        weight = await self._weight(user_id)
+        if self._in_flight < self.max_concurrent and not self._queued:
+            self._in_flight += 1
+            self.admitted += 1
+            self._waits.append(0.0)
+            QUEUE_WAIT.observe(0.0)
+            return 0.0
+
+        if self._queued >= self.max_queue:
+            self._reject("queue_full")
+        if self.max_queue_per_user and self._queued_per_user.get(user_id, 0) >= self.max_queue_per_user:
+            self._reject("user_queue_full")
+
+        # Unit-cost WFQ: a user's next request finishes 1/weight after its previous one
+        start_tag = max(self._virtual_time, self._last_finish.get(user_id, 0.0))
+        finish_tag = start_tag + 1.0 / weight
+        self._last_finish[user_id] = finish_tag
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._heap, (finish_tag, next(self._seq), start_tag, user_id, future))
+        self._queued += 1
+        self._queued_per_user[user_id] = self._queued_per_user.get(user_id, 0) + 1
+
+        enqueued = time.perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout=self.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if future.done():
+                # The slot was handed over just as we gave up: pass it on
+                self.release(None)
+            else:
+                future.cancel()
+                self._dequeued(user_id)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            self._reject("queue_timeout")
+
+        waited = time.perf_counter() - enqueued
+        self.admitted += 1
+        self._waits.append(waited)
+        QUEUE_WAIT.observe(waited)
+        return waited
+
+    def release(self, service_seconds: Optional[float]):
+        self._in_flight -= 1
+        if service_seconds is not None:
+            self._service_ewma = service_seconds if not self._service_ewma else 0.8 * self._service_ewma + 0.2 * service_seconds
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, user_id: str):
+        await self.acquire(user_id)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.release(time.perf_counter() - start)
+
+    def stats(self) -> Dict[str, Any]:
+        waits = list(self._waits)
+        return {
+            "limits": {
+                "max_concurrent": self.max_concurrent,
+                "max_queue": self.max_queue,
+                "max_queue_per_user": self.max_queue_per_user,
+                "queue_timeout": self.queue_timeout,
+                "role_weights": self.role_weights
+            },
+            "in_flight": self._in_flight,
+            "queue_depth": self._queued,
+            "queue_depth_per_user": dict(self._queued_per_user),
+            "admitted": self.admitted,
+            "shed": dict(self.shed),
+            "wait_ms": {
+                "p50": round(_percentile(waits, 0.50) * 1000, 2),
+                "p99": round(_percentile(waits, 0.99) * 1000, 2),
+                "max": round(max(waits, default=0.0) * 1000, 2)
+            },
+            "service_ms_ewma": round(self._service_ewma * 1000, 2)
+        }
@@ -1,6 +1,7 @@
 import os
 from google.adk.agents.llm_agent import Agent
 from engine.llm_factory import get_adk_model_name
+from engine.bootstrap import LazyToolset, bootstrap_mode, run_concurrently
 from google.adk.tools.google_search_agent_tool import GoogleSearchAgentTool, create_google_search_agent
 from tools.search_tool import web_search # keeping for fallback search
 
@@ -8,12 +9,23 @@ def build_researcher():
     model_name = get_adk_model_name()
     
     # Discover Enterprise tools via MCP
-    from frameworks.mcp.client import get_mcp_tools
-    mcp_tools = get_mcp_tools()
+    def discover_mcp_tools():
+        from frameworks.mcp.client import get_mcp_tools
+        return get_mcp_tools()
 
     # Use official ADK Search Agent as a tool
-    google_search_agent = create_google_search_agent(model=model_name)
-    search_agent_tool = GoogleSearchAgentTool(agent=google_search_agent)
+    def build_search_tools():
+        google_search_agent = create_google_search_agent(model=model_name)
+        return [GoogleSearchAgentTool(agent=google_search_agent)]
+
+    builders = {"search_agent": build_search_tools, "mcp_discovery": discover_mcp_tools}
+    if bootstrap_mode() == "lazy":
+        # Nothing is discovered until the researcher's first model call
+        tools = [LazyToolset("researcher", builders)]
+    else:
+        # The two builders are independent, so run them side by side
+        built = run_concurrently(builders, prefix="researcher")
+        tools = built["search_agent"] + built["mcp_discovery"]
     
     researcher = Agent(
         model=model_name,
@@ -25,7 +37,7 @@ def build_researcher():
         - You also have access to internal enterprise documents via MCP tools.
         Be precise, factual, and cite your sources. 
         IMPORTANT: If you use an MCP tool and it returns a SECURITY_BLOCK or an error, you MUST report this exact reason to the user immediately. Do not attempt to bypass or ignore security denials.""",
-        tools=[search_agent_tool] + mcp_tools,
+        tools=tools,
     )
     
     return researcher
@@ -3,16 +3,20 @@ from google.adk.agents.llm_agent import Agent as LlmAgent
 from engine.agents.researcher import build_researcher
 from engine.agents.writer import build_writer
 from engine.agents.analyst import build_data_analyst
-from tools.a2a_tools import open_a2a_communication, list_a2a_directory
+from engine.bootstrap import BOOTSTRAP
+from tools.a2a_tools import open_a2a_communication, broadcast_a2a, list_a2a_directory, find_a2a_agents
 
 def build_supervisor_team():
     from engine.llm_factory import get_adk_model_name
     model_name = get_adk_model_name()
 
     # 1. Initialize specialized agents
-    researcher_agent = build_researcher()
-    writer_agent = build_writer()
-    analyst_agent = build_data_analyst()
+    with BOOTSTRAP.phase("researcher.build"):
+        researcher_agent = build_researcher()
+    with BOOTSTRAP.phase("writer.build"):
+        writer_agent = build_writer()
+    with BOOTSTRAP.phase("analyst.build"):
+        analyst_agent = build_data_analyst()
     
     # 2. Build the Coordinator Agent (Supervisor)
     # The ADK Coordinator pattern uses an LlmAgent with sub_agents.
@@ -26,11 +30,13 @@ def build_supervisor_team():
         - Use the 'Professional_Tech_Writer' to format research results into high-quality documents.
         - Use the 'Data_Analyst' for complex calculations, python code execution, and data processing.
         - Use the A2A Open Protocol tools ('open_a2a_communication', 'list_a2a_directory') to collaborate with high-level remote agents found in the directory.
+        - To find which remote agents can do something, use 'find_a2a_agents' (or 'list_a2a_directory' for every agent and its capabilities); do not send discovery messages for that.
+        - To ask several remote agents the same thing (capabilities, bids, a shared task), use 'broadcast_a2a' once instead of one 'open_a2a_communication' call per agent.
         
         Analyze the request, transfer to the appropriate agent, and provide a final synthesized answer when all information gathered.
         When you need to transfer, use the exact internal names provided.""",
         sub_agents=[researcher_agent, writer_agent, analyst_agent],
-        tools=[open_a2a_communication, list_a2a_directory]
+        tools=[open_a2a_communication, broadcast_a2a, list_a2a_directory, find_a2a_agents]
     )
     
     return coordinator
@@ -0,0 +1,96 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+from google.adk.agents.readonly_context import ReadonlyContext
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.base_toolset import BaseToolset
+
+def bootstrap_mode() -> str:
+    """AGENT_BOOTSTRAP=lazy defers tool discovery to first use; 'eager' (default) does it at startup."""
+    return os.getenv("AGENT_BOOTSTRAP", "eager")
+
+class BootstrapTimer:
+    """
+    Records named startup phases (start offset and duration relative to process boot)
+    so /agent/bootstrap can show where cold-start seconds go. Safe to use from threads.
+    """
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self._phases: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def record(self, name: str, start: float, end: float, **details):
+        with self._lock:
+            self._phases.append({
+                "phase": name,
+                "start_ms": round((start - self.origin) * 1000, 2),
+                "duration_ms": round((end - start) * 1000, 2),
+                "thread": threading.current_thread().name,
+                **details
+            })
+
+    @contextmanager
+    def phase(self, name: str, **details):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, start, time.perf_counter(), **details)
+
+    def report(self) -> Dict[str, Any]:
+        with self._lock:
+            phases = sorted(self._phases, key=lambda p: p["start_ms"])
+        return {
+            "mode": bootstrap_mode(),
+            "phases": phases,
+            "ready_ms": round(max((p["start_ms"] + p["duration_ms"] for p in phases if not p.get("lazy")), default=0.0), 2)
+        }
+
+# Process-wide timer; created at first import, which engine/main.py does before anything else
+BOOTSTRAP = BootstrapTimer()
+
+def run_concurrently(builders: Dict[str, Callable[[], Any]], prefix: str) -> Dict[str, Any]:
+    """Run independent builders on worker threads, timing each one as '<prefix>.<name>'."""
+    def timed(name: str, builder: Callable[[], Any]):
+        with BOOTSTRAP.phase(f"{prefix}.{name}"):
+            return builder()
+
+    with ThreadPoolExecutor(max_workers=len(builders), thread_name_prefix=f"{prefix}-boot") as pool:
+        futures = {name: pool.submit(timed, name, builder) for name, builder in builders.items()}
+        return {name: future.result() for name, future in futures.items()}
+
+class LazyToolset(BaseToolset):
+    """
+    Toolset whose tools are only discovered on the agent's first model call.
+    The builders run concurrently off the event loop, once; later calls reuse the result.
+    """
+    def __init__(self, name: str, builders: Dict[str, Callable[[], List[BaseTool]]]):
+        super().__init__()
+        self.name = name
+        self._builders = builders
+        self._tools: Optional[List[BaseTool]] = None
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def _discover(self) -> List[BaseTool]:
+        def timed(key: str, builder: Callable[[], List[BaseTool]]):
+            with BOOTSTRAP.phase(f"{self.name}.{key}", lazy=True):
+                return builder()
+
+        results = await asyncio.gather(*(
+            asyncio.to_thread(timed, key, builder) for key, builder in self._builders.items()
+        ))
+        return [tool for tools in results for tool in tools]
+
+    async def get_tools(self, readonly_context: Optional[ReadonlyContext] = None) -> List[BaseTool]:
+        if self._tools is None:
+            if self._lock is None:
+                self._lock = asyncio.Lock()
+            async with self._lock:
+                if self._tools is None:
+                    self._tools = await self._discover()
+        return self._tools
@@ -1,4 +1,9 @@
-from typing import Dict, List, Optional
+import abc
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
 from pydantic import BaseModel
 
 class UserIdentity(BaseModel):
@@ -29,17 +34,178 @@ MOCK_USER_DB = {
     )
 }
 
-def get_user_identity(user_id: str) -> UserIdentity:
-    """Fetch identity from mock DB."""
-    return MOCK_USER_DB.get(user_id, UserIdentity(
+def _unknown_identity(user_id: str) -> UserIdentity:
+    return UserIdentity(
         user_id=user_id,
         username="Unknown",
         role="guest",
         permissions=["search_web"]
-    ))
+    )
+
+def get_user_identity(user_id: str) -> UserIdentity:
+    """Fetch identity from mock DB."""
+    return MOCK_USER_DB.get(user_id) or _unknown_identity(user_id)
 
 def check_permission(identity: UserIdentity, permission: str) -> bool:
     """Check if identity has a specific permission."""
     if identity.role == "admin":
         return True
     return permission in identity.permissions
+
+# --- Compiled permissions ---
+
+# One bit per permission name, assigned the first time a name is compiled
+PERMISSION_BITS: Dict[str, int] = {}
+
+def permission_mask(permissions: Iterable[str]) -> int:
+    mask = 0
+    for name in permissions:
+        bit = PERMISSION_BITS.get(name)
+        if bit is None:
+            bit = PERMISSION_BITS[name] = 1 << len(PERMISSION_BITS)
+        mask |= bit
+    return mask
+
+def permission_names(mask: int) -> List[str]:
+    return [name for name, bit in PERMISSION_BITS.items() if mask & bit]
+
+class IdentityContext:
+    """
+    A resolved identity with its permissions compiled into an integer bitset.
+    Immutable once built, so one instance is shared by every callback of an invocation.
+    """
+    __slots__ = ("user_id", "username", "role", "mask", "is_admin", "known")
+
+    def __init__(self, identity: UserIdentity, known: bool = True):
+        self.user_id = identity.user_id
+        self.username = identity.username
+        self.role = identity.role
+        self.mask = permission_mask(identity.permissions)
+        self.is_admin = identity.role == "admin"
+        self.known = known
+
+    def has(self, required: int) -> bool:
+        return self.is_admin or self.mask & required == required
+
+    def missing(self, required: int) -> List[str]:
+        return [] if self.is_admin else permission_names(required & ~self.mask)
+
+# --- Identity providers ---
+
+class IdentityProvider(abc.ABC):
+    """Source of truth for identities (an IdP). lookup() returns None for unknown users."""
+    @abc.abstractmethod
+    async def lookup(self, user_id: str) -> Optional[UserIdentity]:
+        raise NotImplementedError
+
+class LocalIdentityProvider(IdentityProvider):
+    """
+    In-process stand-in for a real IdP, backed by MOCK_USER_DB by default.
+    `latency` (seconds) simulates the network round trip for tests and benchmarks.
+    """
+    def __init__(self, users: Optional[Dict[str, UserIdentity]] = None, latency: float = 0.0):
+        self.users = users if users is not None else MOCK_USER_DB
+        self.latency = latency
+        self.lookups = 0
+
+    async def lookup(self, user_id: str) -> Optional[UserIdentity]:
+        self.lookups += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self.users.get(user_id)
+
+class IdentityCache:
+    """
+    TTL cache in front of an IdentityProvider.
+    Unknown users are cached too (as the guest fallback) for the shorter `negative_ttl`, so
+    repeated unknown ids don't hit the IdP. Concurrent misses for one user share a single
+    lookup, and if the IdP fails, a stale entry is served rather than failing the turn.
+    Past `max_entries` the least recently used entry is dropped.
+    """
+    def __init__(
+        self,
+        provider: Optional[IdentityProvider] = None,
+        ttl: Optional[float] = None,
+        negative_ttl: Optional[float] = None,
+        max_entries: Optional[int] = None
+    ):
+        self.provider = provider or LocalIdentityProvider()
+        self.ttl = ttl if ttl is not None else float(os.getenv("IDENTITY_CACHE_TTL", "300"))
+        self.negative_ttl = negative_ttl if negative_ttl is not None else float(os.getenv("IDENTITY_NEGATIVE_TTL", "30"))
+        self.max_entries = max_entries or int(os.getenv("IDENTITY_CACHE_MAX_ENTRIES", "10000"))
+        self._entries: "OrderedDict[str, Tuple[float, IdentityContext]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.negative_hits = 0
+        self.errors = 0
+
+    async def resolve(self, user_id: str) -> IdentityContext:
+        entry = self._entries.get(user_id)
+        if entry is not None and entry[0] > time.monotonic():
+            self.hits += 1
+            self._entries.move_to_end(user_id)  # LRU: active users outlive one-off ids at max_entries
+            if not entry[1].known:
+                self.negative_hits += 1
+            return entry[1]
+
+        pending = self._inflight.get(user_id)
+        if pending is not None:
+            self.hits += 1
+            return await asyncio.shield(pending)
+
+        self.misses += 1
+        future = self._inflight[user_id] = asyncio.get_running_loop().create_future()
+        try:
+            context = await self._fetch(user_id, entry)
+            future.set_result(context)
+            return context
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # retrieved here, so waiter-less futures don't warn
+            raise
+        finally:
+            del self._inflight[user_id]
+
+    async def _fetch(self, user_id: str, stale: Optional[Tuple[float, IdentityContext]]) -> IdentityContext:
+        try:
+            identity = await self.provider.lookup(user_id)
+        except Exception as e:
+            self.errors += 1
+            if stale is not None:
+                print(f"[Identity] IdP lookup failed for {user_id}, serving cached identity: {e}")
+                return stale[1]
+            # Fail closed: least-privileged identity, not cached, so the next call retries
+            print(f"[Identity] IdP lookup failed for {user_id}, treating as guest: {e}")
+            return IdentityContext(_unknown_identity(user_id), known=False)
+
+        if identity is None:
+            context, ttl = IdentityContext(_unknown_identity(user_id), known=False), self.negative_ttl
+        else:
+            context, ttl = IdentityContext(identity), self.ttl
+        self._entries[user_id] = (time.monotonic() + ttl, context)
+        self._entries.move_to_end(user_id)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return context
+
+    def invalidate(self, user_id: Optional[str] = None):
+        """Drop one user (e.g. after a role change) or everything."""
+        if user_id is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(user_id, None)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "negative_hits": self.negative_hits,
+            "errors": self.errors
+        }
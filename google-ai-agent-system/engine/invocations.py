@@ -0,0 +1,56 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, List, Optional
+
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.plugins.base_plugin import BasePlugin
+from google.adk.runners import Runner
+
+# Invocations started inside the current invocation_scope(). A list, not a set of ids per
+# task: tasks the runner spawns copy the context and append to the same list.
+_started: ContextVar[Optional[List[str]]] = ContextVar("invocations_started", default=None)
+
+class InvocationScopePlugin(BasePlugin):
+    """
+    Records which invocations each invocation_scope() started.
+    ADK calls after_run_callback only when a run completes: not when it raises, is cancelled,
+    or the caller stops iterating (an SSE client going away, a cancelled batch item). Plugins
+    that keep per-invocation state implement end_invocation(invocation_id, status) as well, and
+    the scope calls it for every invocation it started once the run is over, however it ended.
+    Register it first, so invocations are recorded before any other plugin opens state for them.
+    """
+    def __init__(self):
+        super().__init__(name="invocation_scope")
+
+    async def before_run_callback(self, *, invocation_context: InvocationContext) -> Optional[Any]:
+        started = _started.get()
+        if started is not None:
+            started.append(invocation_context.invocation_id)
+        return None
+
+@contextmanager
+def invocation_scope(runner: Runner):
+    """
+    Wrap a runner.run_async() loop. On exit, every plugin of `runner` with an end_invocation()
+    is told that the invocations started inside are over: "error" if the loop raised,
+    "cancelled" otherwise. After a completed run this follows after_run_callback, so
+    end_invocation must be a no-op for an invocation it already cleaned up.
+    """
+    started: List[str] = []
+    token = _started.set(started)
+    status = "cancelled"
+    try:
+        yield
+    except Exception:
+        status = "error"
+        raise
+    finally:
+        try:
+            _started.reset(token)
+        except ValueError:
+            pass  # exited in another context, e.g. an abandoned stream finalized later
+        for invocation_id in started:
+            for plugin in runner.plugin_manager.plugins:
+                end_invocation = getattr(plugin, "end_invocation", None)
+                if end_invocation is not None:
+                    end_invocation(invocation_id, status)
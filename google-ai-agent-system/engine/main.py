@@ -1,58 +1,120 @@
-from fastapi import FastAPI, HTTPException
+from engine.bootstrap import BOOTSTRAP  # first import: its timer marks process boot
+from fastapi import FastAPI, HTTPException, WebSocket
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.background import BackgroundTask
 from pydantic import BaseModel
-from typing import Optional
+from typing import Any, Dict, List, Optional
 from engine.space.registry import AgentRegistry, AgentMetadata
 from engine.agents.supervisor import build_supervisor_team
-from engine.memory.store import MemoryStore
+from engine.memory.store import MemoryStore, event_text
+from engine.sessions.sqlite_service import build_session_service
+from engine.warmup import WarmupManager
+from engine.admission import AdmissionController, AdmissionRejected
 from google.adk.runners import Runner
-from google.adk.sessions.in_memory_session_service import InMemorySessionService
 from google.adk.artifacts.in_memory_artifact_service import InMemoryArtifactService
 from google.adk.apps.app import App, ResumabilityConfig
 from google.adk.agents.context_cache_config import ContextCacheConfig
+from google.adk.agents.run_config import RunConfig, StreamingMode
 from google.adk.models.registry import LLMRegistry
 from google.adk.models.lite_llm import LiteLlm
 from google.genai import types
 import os
 from dotenv import load_dotenv
 from observability.monitor import EnterpriseObservabilityPlugin
-from engine.policy import AgentPolicyPlugin
+from observability.metrics import METRICS
+from observability.log_pipeline import configure_logging
+from observability.tracing import TRACER
+from engine.invocations import InvocationScopePlugin, invocation_scope
+from engine.policy import AgentPolicyPlugin, parse_budgets
+from engine.accounting import UsageAccountingPlugin, UsageLedger
+from engine.identity import IdentityCache
+from engine.response_cache import ResponseCachePlugin
+from tools.a2a_tools import A2A_NET
+from frameworks.a2a.network import A2AServerAdapter
+from frameworks.a2a.resilience import STATE_VALUES
+import asyncio
 import time
+import json
+
+BOOTSTRAP.record("engine.imports", BOOTSTRAP.origin, time.perf_counter())
 
 # Register Ollama support for ADK
 LLMRegistry._register(r"ollama/.*", LiteLlm)
 
 load_dotenv()
+configure_logging()  # batched JSON-lines writer; nothing logs synchronously to disk on the event loop
 
 app = FastAPI(title="Google AI Agent System Engine")
 memory = MemoryStore()
-session_service = InMemorySessionService()
+session_service = build_session_service()  # SESSION_BACKEND=sqlite for durable, multi-worker sessions
 artifact_service = InMemoryArtifactService()
 registry = AgentRegistry()
+monitor = EnterpriseObservabilityPlugin()
+usage_ledger = UsageLedger()  # token/cost accounting per user, session, agent and model
+identity_cache = IdentityCache()  # TTL cache in front of the IdP (LocalIdentityProvider stand-in)
+response_cache = ResponseCachePlugin(identities=identity_cache)  # RESPONSE_CACHE_AGENTS opts agents in
+a2a_server = A2AServerAdapter(A2A_NET)  # serves /a2a/ws for peers in other pods
+admission = AdmissionController(identities=identity_cache)  # sheds load before it reaches the LLM provider
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "4"))
+
+# Engine-level state, read at scrape time alongside the plugin's histograms and counters
+METRICS.gauge("engine_admission_in_flight", "Runner invocations currently admitted.", lambda: admission.stats()["in_flight"])
+METRICS.gauge("engine_admission_queue_depth", "Requests waiting for admission.", lambda: admission.stats()["queue_depth"])
+METRICS.gauge("engine_admission_shed_total", "Requests shed, by reason.",
+              lambda: {(reason,): n for reason, n in admission.shed.items()}, ["reason"], kind="counter")
+METRICS.gauge("engine_response_cache_hits_total", "Response cache hits, by kind.",
+              lambda: {("exact",): response_cache.exact_hits, ("similar",): response_cache.similar_hits}, ["kind"], kind="counter")
+METRICS.gauge("engine_response_cache_saved_tokens_total", "Tokens not spent thanks to response cache hits.",
+              lambda: response_cache.saved_tokens, kind="counter")
+METRICS.gauge("engine_identity_cache_lookups_total", "Identity resolutions, by result.",
+              lambda: {("hit",): identity_cache.hits, ("miss",): identity_cache.misses}, ["result"], kind="counter")
+METRICS.gauge("engine_identity_cache_negative_hits_total", "Cache hits for users unknown to the IdP.",
+              lambda: identity_cache.negative_hits, kind="counter")
+METRICS.gauge("engine_a2a_requests_in_flight", "A2A requests waiting for their reply.", lambda: A2A_NET.stats()["in_flight"])
+METRICS.gauge("engine_a2a_request_timeouts_total", "A2A requests that got no reply within their TTL.",
+              lambda: A2A_NET.timeouts, kind="counter")
+METRICS.gauge("engine_a2a_circuit_state", "A2A endpoint circuit breaker state (0 closed, 1 half-open, 2 open).",
+              lambda: {(uri,): STATE_VALUES[guard.breaker.state] for uri, guard in A2A_NET.resilience.items()}, ["endpoint"])
+METRICS.gauge("engine_a2a_circuit_opened_total", "Times an A2A endpoint's circuit breaker opened.",
+              lambda: {(uri,): guard.breaker.opened for uri, guard in A2A_NET.resilience.items()}, ["endpoint"], kind="counter")
+runner = None
 
 # ADK Core Components
 try:
     # Build the root team
-    team_alpha_agent = build_supervisor_team()
+    with BOOTSTRAP.phase("supervisor.build_team"):
+        team_alpha_agent = build_supervisor_team()
     
     # Create ADK App with Enterprise Features
     adk_app = App(
         name="Team_Alpha_App",
         root_agent=team_alpha_agent,
         plugins=[
-            EnterpriseObservabilityPlugin(),
-            AgentPolicyPlugin(sensitive_tools=["mcp_read_document"])
+            # First: records each invocation so invocation_scope() can clean up after failed runs
+            InvocationScopePlugin(),
+            monitor,
+            # Before the policy plugin: scoped per user itself, so its identity note is not needed in the key
+            response_cache,
+            UsageAccountingPlugin(usage_ledger),
+            AgentPolicyPlugin(
+                sensitive_tools=["mcp_read_document"],
+                ledger=usage_ledger,
+                token_budgets=parse_budgets(os.getenv("BUDGET_TOKENS_PER_HOUR", "")),
+                identities=identity_cache
+            )
         ],
         resumability_config=ResumabilityConfig(is_resumable=True),
         context_cache_config=ContextCacheConfig(ttl_seconds=3600) # 1 hour TTL
     )
     
     # Initialize ADK Runner
-    runner = Runner(
-        app=adk_app,
-        session_service=session_service,
-        artifact_service=artifact_service,
-        auto_create_session=True
-    )
+    with BOOTSTRAP.phase("runner.init"):
+        runner = Runner(
+            app=adk_app,
+            session_service=session_service,
+            artifact_service=artifact_service,
+            auto_create_session=True
+        )
     
     # Register agents for discovery/dashboard
     registry.register("team_alpha", lambda: team_alpha_agent, AgentMetadata(
@@ -64,68 +126,258 @@ try:
     # Add a health check for the team
     registry.set_health_check("team_alpha", lambda: runner is not None)
     
-    print("[Agentspace] ADK Runner initialized with Team Alpha.")
+    boot = BOOTSTRAP.report()
+    print(f"[Agentspace] ADK Runner initialized with Team Alpha ({boot['ready_ms']:.0f}ms, {boot['mode']} bootstrap).")
 except Exception as e:
     import traceback
     print(f"[Agentspace] Error bootstrapping agents: {e}")
     traceback.print_exc()
 
+warmup = WarmupManager(registry, runner)
+
+@app.on_event("startup")
+async def start_warmup():
+    # Model pinning swaps agent.model, so it finishes before the server accepts requests
+    await warmup.pin_models()
+    # The rest runs in the background: the server accepts connections while /ready stays 503
+    app.state.warmup_task = asyncio.create_task(warmup.run())
+
+@app.on_event("startup")
+async def start_a2a_discovery():
+    # Fills the capability directory for peers without declared capabilities, then keeps it fresh
+    app.state.a2a_discovery_task = asyncio.create_task(A2A_NET.refresh_capabilities())
+
 class ChatRequest(BaseModel):
     session_id: str
     message: str
     user_id: Optional[str] = "user_002" # Default to guest for safety
 
-@app.post("/agent/chat")
-async def chat(request: ChatRequest):
-    try:
-        # High-level tracking in our custom MemoryStore
-        memory.add_message(request.session_id, "user", request.message)
-        
-        # Invoke ADK Runner
-        new_msg = types.Content(
-            role="user",
-            parts=[types.Part(text=request.message)]
-        )
-        
-        response_content = ""
-        new_artifacts = []
-        
-        # Run the agent team within the ADK session
+def _event_frames(event) -> List[Dict[str, Any]]:
+    """Translate a single ADK event into the frames sent to streaming clients."""
+    frames = []
+    if event.author == "user":
+        return frames
+
+    text = event_text(event)
+    if text:
+        frames.append({"type": "text", "author": event.author, "text": text, "partial": bool(event.partial)})
+
+    # Partial function-call chunks are internal to the aggregator; only report complete calls
+    if not event.partial:
+        for call in event.get_function_calls():
+            frames.append({"type": "tool_call", "author": event.author, "name": call.name, "args": call.args or {}})
+        for resp in event.get_function_responses():
+            frames.append({"type": "tool_result", "author": event.author, "name": resp.name, "response": resp.response})
+
+    if event.actions:
+        if event.actions.transfer_to_agent:
+            frames.append({"type": "transfer", "author": event.author, "to": event.actions.transfer_to_agent})
+        if event.actions.artifact_delta:
+            frames.append({"type": "artifact", "author": event.author, "names": list(event.actions.artifact_delta.keys())})
+    return frames
+
+def _shed(e: AdmissionRejected) -> HTTPException:
+    return HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+def _sse(frame: Dict[str, Any]) -> str:
+    # Tool results are arbitrary dicts, so fall back to str() for anything non-JSON
+    return f"data: {json.dumps(frame, default=str)}\n\n"
+
+def _turn_summary(session_id: str) -> Dict[str, int]:
+    # Counters only: never materialize the history just to measure it
+    return {
+        "history_count": memory.history_count(session_id),
+        "artifacts_count": memory.artifacts_count(session_id)
+    }
+
+async def _run_turn(request: ChatRequest) -> Dict[str, Any]:
+    """Run one non-streaming turn through the Runner and sync it into the MemoryStore."""
+    # Invoke ADK Runner
+    new_msg = types.Content(
+        role="user",
+        parts=[types.Part(text=request.message)]
+    )
+
+    # High-level tracking in our custom MemoryStore
+    memory.add_user_message(request.session_id, new_msg)
+    
+    response_content = ""
+    turn_events = []
+    
+    # Run the agent team within the ADK session
+    with invocation_scope(runner):
         async for event in runner.run_async(
             user_id=request.user_id,
             session_id=request.session_id,
             new_message=new_msg
         ):
             # Process ADK Events
-            
+
             # Accumulate text from agent responses
-            if event.author != "user" and event.content:
-                if hasattr(event.content, 'parts'):
-                    for part in event.content.parts:
-                        if part.text:
-                            response_content += part.text
-            
-            # Extract artifact metadata if provided
-            if event.actions and event.actions.artifact_delta:
-                new_artifacts.extend(event.actions.artifact_delta.keys())
-
-        # Sync back to our MemoryStore
-        if response_content:
-            memory.add_message(request.session_id, "assistant", response_content)
+            response_content += event_text(event)
+
+            # Keep the event itself: MemoryStore derives text and artifacts from it
+            turn_events.append(event)
+
+    # Sync back to our MemoryStore
+    memory.add_turn(request.session_id, turn_events, response_content)
         
-        for art_name in new_artifacts:
-            memory.add_artifact(request.session_id, {"id": art_name, "type": "adk_artifact"})
-            
-        return {
-            "response": response_content,
-            "history_count": len(memory.get_history(request.session_id)),
-            "artifacts_count": len(memory.get_artifacts(request.session_id))
-        }
-            
+    return {
+        "response": response_content,
+        **_turn_summary(request.session_id)
+    }
+
+@app.post("/agent/chat")
+async def chat(request: ChatRequest):
+    try:
+        await admission.acquire(request.user_id)
+    except AdmissionRejected as e:
+        raise _shed(e)
+
+    started = time.perf_counter()
+    try:
+        return await _run_turn(request)
     except Exception as e:
         import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        admission.release(time.perf_counter() - started)
+
+class BatchChatRequest(BaseModel):
+    items: List[ChatRequest]
+    max_concurrency: Optional[int] = None
+
+@app.post("/agent/chat/batch")
+async def chat_batch(batch: BatchChatRequest):
+    """
+    Run many ChatRequests over the shared Runner and stream (SSE) each result as it finishes.
+    Distinct sessions run concurrently, bounded by max_concurrency (capped at BATCH_MAX_CONCURRENCY);
+    items sharing a session_id run in submission order, since turns on one ADK session must not
+    interleave. Each item passes admission control under its own user_id, and a failed or shed
+    item is reported without aborting the rest of the batch.
+    """
+    limit = max(1, min(batch.max_concurrency or BATCH_MAX_CONCURRENCY, BATCH_MAX_CONCURRENCY))
+    semaphore = asyncio.Semaphore(limit)
+    results: asyncio.Queue = asyncio.Queue()
+
+    by_session: Dict[str, List[int]] = {}
+    for index, item in enumerate(batch.items):
+        by_session.setdefault(item.session_id, []).append(index)
+
+    async def run_item(index: int, item: ChatRequest) -> Dict[str, Any]:
+        frame = {"type": "item", "index": index, "session_id": item.session_id}
+        started = time.perf_counter()
+        try:
+            async with admission.slot(item.user_id):
+                frame.update(status="ok", **await _run_turn(item))
+        except AdmissionRejected as e:
+            frame.update(status="shed", detail=str(e), retry_after=e.retry_after)
+        except Exception as e:
+            frame.update(status="error", detail=str(e))
+        frame["latency_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        return frame
+
+    async def run_session(indices: List[int]):
+        for index in indices:
+            async with semaphore:
+                frame = await run_item(index, batch.items[index])
+            await results.put(frame)
+
+    async def event_stream():
+        started = time.perf_counter()
+        counts = {"ok": 0, "error": 0, "shed": 0}
+        workers = [asyncio.create_task(run_session(indices)) for indices in by_session.values()]
+        try:
+            for _ in range(len(batch.items)):
+                frame = await results.get()
+                counts[frame["status"]] += 1
+                yield _sse(frame)
+        finally:
+            # No-op once everything finished; stops outstanding items if the client went away
+            for worker in workers:
+                worker.cancel()
+
+        yield _sse({
+            "type": "done",
+            "total": len(batch.items),
+            **counts,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 2)
+        })
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/agent/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """
+    Server-Sent Events variant of /agent/chat.
+    Each ADK event is forwarded as soon as the runner yields it, so clients see
+    partial text, agent transfers, tool calls and artifact deltas in real time.
+    """
+    try:
+        await admission.acquire(request.user_id)
+    except AdmissionRejected as e:
+        raise _shed(e)
+
+    started = time.perf_counter()
+    released = False
+
+    def release_slot():
+        # Called from the generator and as a background task, whichever runs first
+        nonlocal released
+        if not released:
+            released = True
+            admission.release(time.perf_counter() - started)
+
+    new_msg = types.Content(
+        role="user",
+        parts=[types.Part(text=request.message)]
+    )
+    memory.add_user_message(request.session_id, new_msg)
+
+    async def event_stream():
+        response_content = ""
+        turn_events = []
+        try:
+            with invocation_scope(runner):
+                async for event in runner.run_async(
+                    user_id=request.user_id,
+                    session_id=request.session_id,
+                    new_message=new_msg,
+                    run_config=RunConfig(streaming_mode=StreamingMode.SSE)
+                ):
+                    for frame in _event_frames(event):
+                        yield _sse(frame)
+
+                    # In SSE mode the aggregated (non-partial) event repeats the streamed chunks
+                    if not event.partial:
+                        response_content += event_text(event)
+                        turn_events.append(event)
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            yield _sse({"type": "error", "detail": str(e)})
+        finally:
+            # Runs on client disconnect too, so the transcript is never lost
+            memory.add_turn(request.session_id, turn_events, response_content)
+            release_slot()
+
+        yield _sse({
+            "type": "done",
+            "response": response_content,
+            **_turn_summary(request.session_id)
+        })
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(release_slot)
+    )
 
 @app.get("/health")
 def health_check():
@@ -136,7 +388,86 @@ def health_check():
         "timestamp": time.time()
     }
 
+@app.get("/ready")
+def readiness_check():
+    """Readiness probe: 200 only once warm-up finished. /health stays a pure liveness check."""
+    report = warmup.report()
+    report["status"] = "ready" if warmup.is_ready else "not_ready"
+    return JSONResponse(status_code=200 if warmup.is_ready else 503, content=report)
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus text format. Async on purpose: metrics are only touched from the event loop."""
+    return METRICS.render()
+
 @app.get("/agent/health/check")
 async def perform_health_check():
     results = registry.check_health()
     return {"results": results, "summary": registry.list_agents()}
+
+@app.get("/agent/memory/stats")
+async def memory_stats(top_n: int = 10):
+    """Resident MemoryStore footprint, configured caps and eviction counters. Async: sessions change on the event loop."""
+    return memory.stats(top_n=top_n)
+
+@app.get("/agent/admission/stats")
+async def admission_stats():
+    """In-flight count, queue depth (total and per user), queue wait percentiles and shed counts."""
+    return admission.stats()
+
+@app.get("/agent/cache/stats")
+async def cache_stats():
+    """Response cache hit rate (exact and similar), saved tokens and evictions, plus per-agent context cache hits."""
+    return {**response_cache.stats(), "context_cache": monitor.context_cache_stats()}
+
+@app.get("/agent/usage")
+async def usage_report(dimension: str = "user", key: Optional[str] = None, window_seconds: Optional[int] = None, top_n: int = 20):
+    """
+    Token and cost usage over the rolling window and all time, for one key or the top keys of a dimension.
+    Async on purpose: the ledger is only touched from the event loop.
+    """
+    try:
+        return usage_ledger.report(dimension, key=key, window_seconds=window_seconds, top_n=top_n)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+# Trace and A2A endpoints are async like /metrics: the tracer and the gateway are mutated on the event loop
+@app.get("/agent/traces")
+async def list_traces(session_id: Optional[str] = None, limit: int = 20):
+    """Most recent finished traces (newest first), optionally for one session."""
+    return {"traces": TRACER.traces(session_id=session_id, limit=limit)}
+
+@app.get("/agent/traces/export")
+async def export_traces(session_id: Optional[str] = None, trace_id: Optional[str] = None):
+    """Chrome trace-event JSON for one trace or a whole session; open it in ui.perfetto.dev."""
+    if not session_id and not trace_id:
+        raise HTTPException(status_code=400, detail="Pass session_id or trace_id.")
+    return TRACER.export_chrome(trace_ids=[trace_id] if trace_id else None, session_id=session_id)
+
+@app.get("/agent/traces/{trace_id}")
+async def get_trace(trace_id: str):
+    trace = TRACER.get(trace_id)
+    if trace is None:
+        raise HTTPException(status_code=404, detail=f"Trace '{trace_id}' not found (or evicted).")
+    return trace
+
+@app.websocket("/a2a/ws")
+async def a2a_peer_socket(websocket: WebSocket):
+    """Networked A2A transport: remote gateways reach this engine's registered endpoints here."""
+    await a2a_server.serve_fastapi(websocket)
+
+@app.get("/agent/a2a/stats")
+async def a2a_stats():
+    """Endpoints, requests in flight, timeouts, transport counters and history size of the A2A gateway."""
+    return A2A_NET.stats()
+
+@app.get("/agent/a2a/history")
+async def a2a_history(trace_id: Optional[str] = None, sender: Optional[str] = None, receiver: Optional[str] = None, limit: int = 50):
+    """Recent A2A traffic from the gateway's bounded history, newest first, filtered by any of trace/sender/receiver."""
+    messages = A2A_NET.history.query(trace_id=trace_id, sender=sender, receiver=receiver, limit=limit)
+    return {**A2A_NET.history.stats(), "messages": [m.model_dump(mode="json") for m in messages]}
+
+@app.get("/agent/bootstrap")
+def bootstrap_timings():
+    """Per-phase startup timings, including lazily discovered tools once they have loaded."""
+    return BOOTSTRAP.report()
@@ -0,0 +1,402 @@
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from array import array
+from typing import Any, Dict, List, Optional, Tuple
+
+KIND_MESSAGE = 1
+KIND_ARTIFACT = 2
+KIND_CLEAR = 3  # tombstone: drops every earlier record of the session
+
+# Record layout: crc32 | seq | payload_len | kind | session_id_len, then session_id and JSON payload.
+# The crc covers everything after the crc field.
+_HEADER = struct.Struct("<IQIBH")
+_HEADER_BODY = struct.Struct("<QIBH")
+# Hint entry layout (one per record of a sealed segment): seq | offset | record_len | kind | session_id_len
+_HINT = struct.Struct("<QQIBH")
+
+# Index positions pack the segment id and the byte offset into a single unsigned 64-bit int
+_SEG_SHIFT = 40
+_OFFSET_MASK = (1 << _SEG_SHIFT) - 1
+
+HintEntry = Tuple[int, int, int, int, str]  # seq, offset, record_len, kind, session_id
+
+class _Locations:
+    """Compact, ordered record locations for one (session, kind)."""
+    __slots__ = ("seqs", "positions", "lengths")
+
+    def __init__(self):
+        self.seqs = array("Q")
+        self.positions = array("Q")
+        self.lengths = array("I")
+
+    def append(self, seq: int, position: int, length: int):
+        self.seqs.append(seq)
+        self.positions.append(position)
+        self.lengths.append(length)
+
+    def __len__(self) -> int:
+        return len(self.seqs)
+
+class SegmentLog:
+    """
+    Append-only, segmented on-disk log of MemoryStore records.
+    - Writes go to a single active segment; full segments are sealed, memory-mapped
+      for reads and get a hint file (the segment's index without the payloads).
+    - A per-session offset index points at every live record, so a restart only
+      loads hint files instead of re-reading every payload.
+    - A background thread merges sealed segments, dropping records that were
+      trimmed by the ring-buffer limits or deleted by a tombstone.
+    """
+    def __init__(
+        self,
+        directory: str,
+        segment_bytes: int = 64 * 1024 * 1024,
+        max_records: Optional[Dict[int, int]] = None,
+        compact_interval: float = 300.0,
+        compact_ratio: float = 0.5,
+        fsync: bool = False
+    ):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.max_records = max_records or {}
+        self.compact_interval = compact_interval
+        self.compact_ratio = compact_ratio
+        self.fsync = fsync
+
+        self._lock = threading.RLock()
+        self._compaction_lock = threading.Lock()
+        self._index: Dict[str, Dict[int, _Locations]] = {}
+        self._maps: Dict[int, mmap.mmap] = {}
+        self._sizes: Dict[int, int] = {}
+        self._live: Dict[int, int] = {}
+        self._next_seq = 1
+        self._compactions = 0
+
+        os.makedirs(directory, exist_ok=True)
+        start = time.perf_counter()
+        self._next_segment_id = self._recover()
+        self.recovery_ms = (time.perf_counter() - start) * 1000
+        self._open_active()
+        print(f"[Memory] Segment log at {directory}: {len(self._index)} sessions "
+              f"from {len(self._maps)} segments recovered in {self.recovery_ms:.1f}ms")
+
+        self._stop = threading.Event()
+        self._compactor = None
+        if compact_interval > 0:
+            self._compactor = threading.Thread(target=self._compaction_loop, name="segment-log-compactor", daemon=True)
+            self._compactor.start()
+
+    # --- Paths and files -------------------------------------------------
+
+    def _path(self, segment_id: int, suffix: str = ".log") -> str:
+        return os.path.join(self.directory, f"segment-{segment_id:08d}{suffix}")
+
+    def _open_active(self):
+        self._active_id = self._next_segment_id
+        self._next_segment_id += 1
+        self._active_path = self._path(self._active_id)
+        self._active = open(self._active_path, "ab")
+        self._active_fd = os.open(self._active_path, os.O_RDONLY)
+        self._active_size = 0
+        self._active_entries: List[HintEntry] = []
+        self._sizes[self._active_id] = 0
+        self._live[self._active_id] = 0
+
+    def _map(self, segment_id: int):
+        with open(self._path(segment_id), "rb") as f:
+            self._maps[segment_id] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _write_hint(self, segment_id: int, entries: List[HintEntry]):
+        parts = []
+        for seq, offset, length, kind, session_id in entries:
+            sid = session_id.encode()
+            parts.append(_HINT.pack(seq, offset, length, kind, len(sid)))
+            parts.append(sid)
+        tmp = self._path(segment_id, ".hint.tmp")
+        with open(tmp, "wb") as f:
+            f.write(b"".join(parts))
+        os.replace(tmp, self._path(segment_id, ".hint"))
+
+    def _read_hint(self, path: str) -> List[HintEntry]:
+        with open(path, "rb") as f:
+            data = f.read()
+        entries, offset, size = [], 0, len(data)
+        while offset + _HINT.size <= size:
+            seq, rec_offset, length, kind, sid_len = _HINT.unpack_from(data, offset)
+            offset += _HINT.size
+            entries.append((seq, rec_offset, length, kind, data[offset:offset + sid_len].decode()))
+            offset += sid_len
+        return entries
+
+    def _scan_segment(self, path: str) -> Tuple[List[HintEntry], int]:
+        """Walk a segment without a hint file, stopping at the first torn or corrupt record."""
+        entries, offset = [], 0
+        with open(path, "rb") as f:
+            data = f.read()
+        size = len(data)
+        while offset + _HEADER.size <= size:
+            crc, seq, payload_len, kind, sid_len = _HEADER.unpack_from(data, offset)
+            length = _HEADER.size + sid_len + payload_len
+            if offset + length > size or zlib.crc32(data[offset + 4:offset + length]) != crc:
+                break
+            sid = data[offset + _HEADER.size:offset + _HEADER.size + sid_len].decode()
+            entries.append((seq, offset, length, kind, sid))
+            offset += length
+        return entries, offset
+
+    # --- Recovery ----------------------------------------------------------
+
+    def _recover(self) -> int:
+        for name in os.listdir(self.directory):
+            if name.endswith(".tmp"):
+                # Leftover of an interrupted compaction or hint write
+                os.remove(os.path.join(self.directory, name))
+        segment_ids = sorted(
+            int(name[len("segment-"):-len(".log")])
+            for name in os.listdir(self.directory)
+            if name.startswith("segment-") and name.endswith(".log")
+        )
+        raw: Dict[str, List[Tuple[int, int, int, int]]] = {}  # session -> [(seq, kind, position, length)]
+        cleared: Dict[str, int] = {}
+
+        for segment_id in segment_ids:
+            path = self._path(segment_id)
+            hint_path = self._path(segment_id, ".hint")
+            if os.path.exists(hint_path):
+                entries, size = self._read_hint(hint_path), os.path.getsize(path)
+            else:
+                # Only the segment that was active at shutdown lacks a hint
+                entries, size = self._scan_segment(path)
+                if size < os.path.getsize(path):
+                    with open(path, "r+b") as f:
+                        f.truncate(size)
+                if entries:
+                    self._write_hint(segment_id, entries)
+            if size == 0:
+                os.remove(path)
+                if os.path.exists(hint_path):
+                    os.remove(hint_path)
+                continue
+
+            self._map(segment_id)
+            self._sizes[segment_id] = size
+            self._live[segment_id] = 0
+            for seq, offset, length, kind, session_id in entries:
+                self._next_seq = max(self._next_seq, seq + 1)
+                if kind == KIND_CLEAR:
+                    cleared[session_id] = max(cleared.get(session_id, 0), seq)
+                else:
+                    raw.setdefault(session_id, []).append((seq, kind, (segment_id << _SEG_SHIFT) | offset, length))
+
+        for session_id, records in raw.items():
+            # Compacted segments can hold older records than the ones before them, and
+            # a crash mid-compaction can leave duplicates: order by seq and dedupe
+            records.sort()
+            floor = cleared.get(session_id, 0)
+            last_seq = 0
+            for seq, kind, position, length in records:
+                if seq <= floor or seq == last_seq:
+                    continue
+                last_seq = seq
+                self._add_location(session_id, kind, seq, position, length)
+            for kind in list(self._index.get(session_id, {})):
+                self._trim(session_id, kind)
+
+        return (segment_ids[-1] + 1) if segment_ids else 1
+
+    # --- Index maintenance ---------------------------------------------------
+
+    def _add_location(self, session_id: str, kind: int, seq: int, position: int, length: int):
+        self._index.setdefault(session_id, {}).setdefault(kind, _Locations()).append(seq, position, length)
+        self._live[position >> _SEG_SHIFT] += length
+
+    def _trim(self, session_id: str, kind: int):
+        """Apply the ring-buffer limit for this kind; trimmed records become garbage."""
+        limit = self.max_records.get(kind)
+        loc = self._index[session_id][kind]
+        excess = len(loc) - limit if limit else 0
+        if excess <= 0:
+            return
+        for i in range(excess):
+            self._live[loc.positions[i] >> _SEG_SHIFT] -= loc.lengths[i]
+        del loc.seqs[:excess]
+        del loc.positions[:excess]
+        del loc.lengths[:excess]
+
+    def _drop_session(self, session_id: str):
+        for loc in self._index.pop(session_id, {}).values():
+            for i in range(len(loc)):
+                self._live[loc.positions[i] >> _SEG_SHIFT] -= loc.lengths[i]
+
+    # --- Public API ------------------------------------------------------------
+
+    def append(self, session_id: str, kind: int, payload: Optional[Dict[str, Any]] = None):
+        data = json.dumps(payload, default=str, separators=(",", ":")).encode() if payload is not None else b""
+        sid = session_id.encode()
+        with self._lock:
+            seq = self._next_seq
+            self._next_seq += 1
+            body = _HEADER_BODY.pack(seq, len(data), kind, len(sid)) + sid + data
+            record = struct.pack("<I", zlib.crc32(body)) + body
+            offset = self._active_size
+            self._active.write(record)
+            self._active.flush()
+            if self.fsync:
+                os.fsync(self._active.fileno())
+            self._active_size += len(record)
+            self._sizes[self._active_id] = self._active_size
+            self._active_entries.append((seq, offset, len(record), kind, session_id))
+
+            if kind == KIND_CLEAR:
+                self._drop_session(session_id)
+            else:
+                self._add_location(session_id, kind, seq, (self._active_id << _SEG_SHIFT) | offset, len(record))
+                self._trim(session_id, kind)
+
+            if self._active_size >= self.segment_bytes:
+                self._seal_active()
+
+    def clear(self, session_id: str):
+        if self.has_session(session_id):
+            self.append(session_id, KIND_CLEAR)
+
+    def _seal_active(self):
+        self._active.flush()
+        os.fsync(self._active.fileno())
+        self._active.close()
+        os.close(self._active_fd)
+        self._write_hint(self._active_id, self._active_entries)
+        self._map(self._active_id)
+        self._open_active()
+
+    def _read_record(self, position: int, length: int) -> bytes:
+        segment_id, offset = position >> _SEG_SHIFT, position & _OFFSET_MASK
+        if segment_id == self._active_id:
+            return os.pread(self._active_fd, length, offset)
+        return self._maps[segment_id][offset:offset + length]
+
+    def read(self, session_id: str, kind: int, last_n: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Decode the live records of a session straight from the segments."""
+        with self._lock:
+            loc = self._index.get(session_id, {}).get(kind)
+            if not loc:
+                return []
+            start = max(0, len(loc) - last_n) if last_n else 0
+            records = [self._read_record(loc.positions[i], loc.lengths[i]) for i in range(start, len(loc))]
+        results = []
+        for record in records:
+            sid_len = _HEADER.unpack_from(record)[4]
+            results.append(json.loads(record[_HEADER.size + sid_len:]))
+        return results
+
+    def has_session(self, session_id: str) -> bool:
+        return session_id in self._index
+
+    def count(self, session_id: str, kind: int) -> int:
+        loc = self._index.get(session_id, {}).get(kind)
+        return len(loc) if loc else 0
+
+    # --- Compaction --------------------------------------------------------------
+
+    def garbage_ratio(self) -> float:
+        with self._lock:
+            sealed = list(self._maps)
+            total = sum(self._sizes[s] for s in sealed)
+            live = sum(self._live[s] for s in sealed)
+        return 1 - live / total if total else 0.0
+
+    def compact(self):
+        """Merge every sealed segment into one, keeping only live records."""
+        with self._compaction_lock:
+            with self._lock:
+                sealed = set(self._maps)
+                if not sealed:
+                    return
+                maps = {s: self._maps[s] for s in sealed}
+                live = []
+                for session_id, kinds in self._index.items():
+                    for kind, loc in kinds.items():
+                        for i in range(len(loc)):
+                            if loc.positions[i] >> _SEG_SHIFT in sealed:
+                                live.append((loc.seqs[i], loc.positions[i], loc.lengths[i], kind, session_id))
+                new_id = self._next_segment_id
+                self._next_segment_id += 1
+
+            # Copy live records outside the lock; appends only ever touch the active segment
+            live.sort()
+            remap: Dict[int, int] = {}
+            hint: List[HintEntry] = []
+            offset = 0
+            if live:
+                tmp = self._path(new_id, ".log.tmp")
+                with open(tmp, "wb") as f:
+                    for seq, position, length, kind, session_id in live:
+                        segment_id, old_offset = position >> _SEG_SHIFT, position & _OFFSET_MASK
+                        f.write(maps[segment_id][old_offset:old_offset + length])
+                        remap[position] = (new_id << _SEG_SHIFT) | offset
+                        hint.append((seq, offset, length, kind, session_id))
+                        offset += length
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp, self._path(new_id))
+                self._write_hint(new_id, hint)
+
+            with self._lock:
+                if live:
+                    self._map(new_id)
+                    self._sizes[new_id] = offset
+                    self._live[new_id] = 0
+                for kinds in self._index.values():
+                    for loc in kinds.values():
+                        for i in range(len(loc)):
+                            moved = remap.get(loc.positions[i])
+                            if moved is not None:
+                                loc.positions[i] = moved
+                                self._live[new_id] += loc.lengths[i]
+                for segment_id in sealed:
+                    self._maps.pop(segment_id).close()
+                    self._sizes.pop(segment_id, None)
+                    self._live.pop(segment_id, None)
+                self._compactions += 1
+
+            for segment_id in sealed:
+                for suffix in (".log", ".hint"):
+                    path = self._path(segment_id, suffix)
+                    if os.path.exists(path):
+                        os.remove(path)
+
+    def _compaction_loop(self):
+        while not self._stop.wait(self.compact_interval):
+            try:
+                if self.garbage_ratio() >= self.compact_ratio:
+                    self.compact()
+            except Exception as e:
+                print(f"[Memory] Segment compaction failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "directory": self.directory,
+                "sessions": len(self._index),
+                "segments": len(self._sizes),
+                "disk_bytes": sum(self._sizes.values()),
+                "live_bytes": sum(self._live.values()),
+                "compactions": self._compactions,
+                "recovery_ms": round(self.recovery_ms, 3)
+            }
+
+    def close(self):
+        self._stop.set()
+        if self._compactor is not None:
+            self._compactor.join(timeout=5)
+        with self._lock:
+            self._active.close()
+            os.close(self._active_fd)
+            for m in self._maps.values():
+                m.close()
+            self._maps.clear()
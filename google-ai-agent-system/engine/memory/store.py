@@ -1,27 +1,339 @@
-from typing import Dict, List, Any
+import os
+import sys
+import json
+import time
+from collections import OrderedDict, deque
+from typing import Dict, List, Any, Optional, Deque
+from engine.memory.segment_log import SegmentLog, KIND_MESSAGE, KIND_ARTIFACT
+
+# Rough per-entry overhead of a small dict plus its deque slot
+_ENTRY_OVERHEAD = sys.getsizeof({}) + 8
+
+def content_text(content) -> str:
+    """Concatenate the text parts of a types.Content."""
+    text = ""
+    if content and content.parts:
+        for part in content.parts:
+            if part.text:
+                text += part.text
+    return text
+
+def event_text(event) -> str:
+    """Concatenate the text parts of an agent-authored ADK event."""
+    return content_text(event.content) if event.author != "user" else ""
+
+class _EventView:
+    """
+    History entry that references the ADK events of one assistant turn
+    instead of holding a concatenated copy of their text.
+    """
+    __slots__ = ("role", "events")
+
+    def __init__(self, role: str, events: List[Any]):
+        self.role = role
+        self.events = events
+
+    def project(self) -> Dict[str, str]:
+        return {"role": self.role, "content": "".join(event_text(e) for e in self.events)}
+
+class _ContentView:
+    """
+    History entry for a user turn: references the types.Content passed to the runner,
+    which the session's user event wraps, instead of a copy of its text.
+    """
+    __slots__ = ("role", "content")
+
+    def __init__(self, role: str, content: Any):
+        self.role = role
+        self.content = content
+
+    def project(self) -> Dict[str, str]:
+        return {"role": self.role, "content": content_text(self.content)}
+
+_VIEWS = (_EventView, _ContentView)
+
+def _approx_bytes(entry: Any) -> int:
+    """Cheap size estimate of a message/artifact dict (not a deep getsizeof walk)."""
+    if isinstance(entry, _EventView):
+        # Only the references are ours; the events belong to the session service
+        return _ENTRY_OVERHEAD + 8 * len(entry.events)
+    if isinstance(entry, _ContentView):
+        return _ENTRY_OVERHEAD
+    size = _ENTRY_OVERHEAD
+    for key, value in entry.items():
+        size += sys.getsizeof(key)
+        size += sys.getsizeof(value) if isinstance(value, str) else len(json.dumps(value, default=str))
+    return size
+
+class _SessionMemory:
+    """Per-session ring buffers plus the accounting needed for eviction."""
+    __slots__ = ("messages", "artifacts", "bytes", "last_access", "dropped_messages", "version")
+
+    def __init__(self, max_messages: int, max_artifacts: int):
+        self.messages: Deque[Dict[str, str]] = deque(maxlen=max_messages)
+        self.artifacts: Deque[Dict[str, Any]] = deque(maxlen=max_artifacts)
+        self.bytes = 0
+        self.last_access = time.time()
+        self.dropped_messages = 0
+        self.version = 0  # bumped on every change; keys the history projection cache
 
 class MemoryStore:
-    def __init__(self):
-        self._conversations: Dict[str, List[Dict[str, str]]] = {}
-        self._artifacts: Dict[str, List[Dict[str, Any]]] = {}
+    """
+    High-level conversation mirror used for dashboards and response metadata.
+    Bounded so a long-running engine cannot grow without limit:
+    - max_sessions: LRU eviction of whole sessions.
+    - ttl_seconds: sessions idle for longer are expired.
+    - max_messages / max_artifacts: per-session ring buffers (oldest entries drop first).
+    - max_bytes: global budget on the approximate resident size.
+    Caps default to the MEMORY_* environment variables; 0 disables a cap.
+
+    With persist_dir (or MEMORY_PERSIST_DIR) set, every record is also appended to an
+    on-disk SegmentLog. The in-heap buffers then act as a hot cache: evicted sessions
+    stay on disk and are read back lazily from the mapped segments on next access.
+
+    With mode="view" (or MEMORY_MODE=view) turns are stored as references to the ADK
+    events (and user message contents) already held by the session service, so the transcript is not kept
+    in RAM twice. get_history() derives the message list on demand and caches the
+    projection for the most recently read sessions.
+    """
+    def __init__(
+        self,
+        max_sessions: Optional[int] = None,
+        max_messages: Optional[int] = None,
+        max_artifacts: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        max_bytes: Optional[int] = None,
+        persist_dir: Optional[str] = None,
+        mode: Optional[str] = None
+    ):
+        self.max_sessions = max_sessions if max_sessions is not None else int(os.getenv("MEMORY_MAX_SESSIONS", "10000"))
+        self.max_messages = max_messages if max_messages is not None else int(os.getenv("MEMORY_MAX_MESSAGES", "200"))
+        self.max_artifacts = max_artifacts if max_artifacts is not None else int(os.getenv("MEMORY_MAX_ARTIFACTS", "100"))
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else float(os.getenv("MEMORY_TTL_SECONDS", "86400"))
+        self.max_bytes = max_bytes if max_bytes is not None else int(os.getenv("MEMORY_MAX_BYTES", str(256 * 1024 * 1024)))
+
+        self._sessions: "OrderedDict[str, _SessionMemory]" = OrderedDict()
+        self._total_bytes = 0
+        self._evictions: Dict[str, int] = {"lru": 0, "ttl": 0, "bytes": 0, "cleared": 0}
+        self._evicted_bytes = 0
+        self._dropped_messages = 0
+
+        self.mode = mode or os.getenv("MEMORY_MODE", "copy")
+        self._projections: "OrderedDict[str, Any]" = OrderedDict()
+        self._projection_cache_size = int(os.getenv("MEMORY_PROJECTION_CACHE", "64"))
+
+        persist_dir = persist_dir if persist_dir is not None else os.getenv("MEMORY_PERSIST_DIR", "")
+        if persist_dir and self.mode == "view":
+            raise ValueError("MemoryStore view mode holds no copy of the transcript and cannot be persisted.")
+        self._log: Optional[SegmentLog] = None
+        if persist_dir:
+            self._log = SegmentLog(
+                persist_dir,
+                segment_bytes=int(os.getenv("MEMORY_SEGMENT_BYTES", str(64 * 1024 * 1024))),
+                max_records={KIND_MESSAGE: self.max_messages, KIND_ARTIFACT: self.max_artifacts},
+                compact_interval=float(os.getenv("MEMORY_COMPACT_INTERVAL", "300"))
+            )
+
+    # --- Internal bookkeeping --------------------------------------------
+
+    def _is_expired(self, entry: _SessionMemory, now: float) -> bool:
+        return bool(self.ttl_seconds) and now - entry.last_access > self.ttl_seconds
+
+    def _lookup(self, session_id: str) -> Optional[_SessionMemory]:
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            return self._hydrate(session_id)
+        now = time.time()
+        if self._is_expired(entry, now):
+            self._evict(session_id, "ttl")
+            return self._hydrate(session_id)
+        entry.last_access = now
+        self._sessions.move_to_end(session_id)
+        return entry
+
+    def _hydrate(self, session_id: str) -> Optional[_SessionMemory]:
+        """Load a cold session back into the hot cache from the segment log."""
+        if self._log is None or not self._log.has_session(session_id):
+            return None
+        entry = _SessionMemory(self.max_messages or None, self.max_artifacts or None)
+        for message in self._log.read(session_id, KIND_MESSAGE, last_n=self.max_messages):
+            self._push(entry, entry.messages, message)
+        for artifact in self._log.read(session_id, KIND_ARTIFACT, last_n=self.max_artifacts):
+            self._push(entry, entry.artifacts, artifact)
+        self._sessions[session_id] = entry
+        self._enforce_limits(keep=session_id)
+        return entry
+
+    def _get_or_create(self, session_id: str) -> _SessionMemory:
+        entry = self._lookup(session_id)
+        if entry is None:
+            entry = _SessionMemory(self.max_messages or None, self.max_artifacts or None)
+            self._sessions[session_id] = entry
+        return entry
+
+    def _evict(self, session_id: str, reason: str):
+        self._projections.pop(session_id, None)
+        entry = self._sessions.pop(session_id, None)
+        if entry is None:
+            return
+        self._total_bytes -= entry.bytes
+        self._evicted_bytes += entry.bytes
+        self._evictions[reason] += 1
+
+    def _enforce_limits(self, keep: str):
+        """Expire idle sessions and evict LRU sessions until every cap holds."""
+        now = time.time()
+        # The OrderedDict is in access order, so expired sessions sit at the front
+        while self._sessions:
+            oldest_id, oldest = next(iter(self._sessions.items()))
+            if oldest_id == keep or not self._is_expired(oldest, now):
+                break
+            self._evict(oldest_id, "ttl")
+
+        while self.max_sessions and len(self._sessions) > self.max_sessions:
+            self._evict(next(iter(self._sessions)), "lru")
+
+        while self.max_bytes and self._total_bytes > self.max_bytes and len(self._sessions) > 1:
+            oldest_id = next(iter(self._sessions))
+            if oldest_id == keep:
+                break
+            self._evict(oldest_id, "bytes")
+
+    def _push(self, entry: _SessionMemory, buffer: Deque[Dict[str, Any]], item: Dict[str, Any]) -> int:
+        """Append to a ring buffer, accounting for the entry that falls off the end."""
+        dropped = 0
+        if buffer.maxlen is not None and len(buffer) == buffer.maxlen:
+            old = buffer.popleft()
+            size = _approx_bytes(old)
+            entry.bytes -= size
+            self._total_bytes -= size
+            dropped = 1
+        buffer.append(item)
+        entry.version += 1
+        size = _approx_bytes(item)
+        entry.bytes += size
+        self._total_bytes += size
+        return dropped
+
+    # --- Public API --------------------------------------------------------
 
     def get_history(self, session_id: str) -> List[Dict[str, str]]:
-        return self._conversations.get(session_id, [])
+        entry = self._lookup(session_id)
+        if entry is None:
+            return []
+        if self.mode != "view":
+            return list(entry.messages)
+
+        cached = self._projections.get(session_id)
+        if cached is not None and cached[0] == entry.version:
+            self._projections.move_to_end(session_id)
+            return list(cached[1])
+        history = [m.project() if isinstance(m, _VIEWS) else m for m in entry.messages]
+        self._projections[session_id] = (entry.version, history)
+        self._projections.move_to_end(session_id)
+        while len(self._projections) > self._projection_cache_size:
+            self._projections.popitem(last=False)
+        return list(history)
+
+    def history_count(self, session_id: str) -> int:
+        entry = self._lookup(session_id)
+        return len(entry.messages) if entry else 0
+
+    def artifacts_count(self, session_id: str) -> int:
+        entry = self._lookup(session_id)
+        return len(entry.artifacts) if entry else 0
+
+    def _append_message(self, session_id: str, message: Any):
+        entry = self._get_or_create(session_id)
+        if self._log is not None:
+            self._log.append(session_id, KIND_MESSAGE, message)
+        dropped = self._push(entry, entry.messages, message)
+        entry.dropped_messages += dropped
+        self._dropped_messages += dropped
+        self._enforce_limits(keep=session_id)
 
     def add_message(self, session_id: str, role: str, content: str):
-        if session_id not in self._conversations:
-            self._conversations[session_id] = []
-        self._conversations[session_id].append({"role": role, "content": content})
+        self._append_message(session_id, {"role": role, "content": content})
+
+    def add_user_message(self, session_id: str, message: Any):
+        """
+        Record the types.Content about to be sent to the runner as the user turn.
+        In view mode only the Content is referenced; the runner's user event holds the same object.
+        """
+        if self.mode == "view":
+            self._append_message(session_id, _ContentView("user", message))
+        else:
+            self.add_message(session_id, "user", content_text(message))
+
+    def add_turn(self, session_id: str, events: List[Any], response_text: Optional[str] = None):
+        """
+        Record one assistant turn from the (non-partial) ADK events the runner yielded.
+        In copy mode the concatenated text is stored; in view mode only the events are referenced.
+        """
+        text_events = [e for e in events if event_text(e)]
+        if text_events:
+            if self.mode == "view":
+                self._append_message(session_id, _EventView("assistant", text_events))
+            else:
+                if response_text is None:
+                    response_text = "".join(event_text(e) for e in text_events)
+                self._append_message(session_id, {"role": "assistant", "content": response_text})
+
+        for event in events:
+            if event.actions and event.actions.artifact_delta:
+                for art_name in event.actions.artifact_delta:
+                    self.add_artifact(session_id, {"id": art_name, "type": "adk_artifact"})
 
     def get_artifacts(self, session_id: str) -> List[Dict[str, Any]]:
-        return self._artifacts.get(session_id, [])
+        entry = self._lookup(session_id)
+        return list(entry.artifacts) if entry else []
 
     def add_artifact(self, session_id: str, artifact: Dict[str, Any]):
-        if session_id not in self._artifacts:
-            self._artifacts[session_id] = []
-        self._artifacts[session_id].append(artifact)
+        entry = self._get_or_create(session_id)
+        if self._log is not None:
+            self._log.append(session_id, KIND_ARTIFACT, artifact)
+        self._push(entry, entry.artifacts, artifact)
+        self._enforce_limits(keep=session_id)
 
     def clear(self, session_id: str):
-        self._conversations.pop(session_id, None)
-        self._artifacts.pop(session_id, None)
+        self._evict(session_id, "cleared")
+        if self._log is not None:
+            self._log.clear(session_id)
+
+    def session_stats(self, session_id: str) -> Optional[Dict[str, Any]]:
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            return None
+        return {
+            "session_id": session_id,
+            "bytes": entry.bytes,
+            "messages": len(entry.messages),
+            "artifacts": len(entry.artifacts),
+            "dropped_messages": entry.dropped_messages,
+            "idle_seconds": round(time.time() - entry.last_access, 3)
+        }
 
+    def stats(self, top_n: int = 10) -> Dict[str, Any]:
+        """Resident footprint, configured caps and eviction counters."""
+        largest = sorted(self._sessions, key=lambda sid: self._sessions[sid].bytes, reverse=True)[:top_n]
+        return {
+            "resident": {
+                "sessions": len(self._sessions),
+                "bytes": self._total_bytes,
+                "largest_sessions": [self.session_stats(sid) for sid in largest]
+            },
+            "mode": self.mode,
+            "limits": {
+                "max_sessions": self.max_sessions,
+                "max_messages": self.max_messages,
+                "max_artifacts": self.max_artifacts,
+                "ttl_seconds": self.ttl_seconds,
+                "max_bytes": self.max_bytes
+            },
+            "evicted": {
+                "sessions": dict(self._evictions),
+                "bytes": self._evicted_bytes,
+                "messages_dropped": self._dropped_messages
+            },
+            "persisted": self._log.stats() if self._log is not None else None
+        }
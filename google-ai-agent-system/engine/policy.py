@@ -3,28 +3,104 @@ from google.adk.plugins.base_plugin import BasePlugin
 from google.adk.tools.base_tool import BaseTool
 from google.adk.tools.tool_context import ToolContext
 from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
 from google.adk.agents.callback_context import CallbackContext
 from google.adk.agents.base_agent import BaseAgent
 from google.genai import types
-from engine.identity import get_user_identity, check_permission
+from google.adk.agents.invocation_context import InvocationContext
+from engine.identity import IdentityCache, IdentityContext, permission_mask
+from engine.accounting import UsageLedger
+
+BUDGET_WINDOW_SECONDS = 3600
+
+# Sensitive tool -> permissions it requires (on top of the admin-only 'write' access level)
+DEFAULT_TOOL_RULES: Dict[str, List[str]] = {
+    "mcp_read_document": ["read_internal"]
+}
+
+# Appended to every agent's system instruction. It must not vary per user: ADK's context cache
+# (and Gemini's implicit prefix cache) only reuse a prefix that is byte-identical.
+POLICY_INSTRUCTION = (
+    "[IDENTITY POLICY]: The user you are assisting is named in the [IDENTITY CONTEXT] note at the end of the conversation. "
+    "Tailor your responses to their technical level and clearance. "
+    "Never disclose administrative credentials or bypass internal document IDs."
+)
+IDENTITY_MARKER = "[IDENTITY CONTEXT]:"
+
+def _has_identity_segment(contents: List[types.Content]) -> bool:
+    """True if the trailing run of user contents already carries the identity note."""
+    for content in reversed(contents):
+        if content.role != "user":
+            return False
+        if content.parts and content.parts[0].text and content.parts[0].text.startswith(IDENTITY_MARKER):
+            return True
+    return False
+
+def parse_budgets(spec: str) -> Dict[str, int]:
+    """'guest=50000,researcher=500000' -> tokens per hour by role"""
+    budgets = {}
+    for item in spec.split(","):
+        if "=" in item:
+            role, tokens = item.split("=", 1)
+            budgets[role.strip()] = int(tokens)
+    return budgets
 
 class AgentPolicyPlugin(BasePlugin):
     """
     Enterprise Policy Plugin to enforce Identity-based Human-in-the-loop (HITL) 
     and safety guardrails on tool execution.
+    The caller's identity is resolved once per invocation (through the IdentityCache) and
+    shared by every callback of that invocation; tool rules are compiled to permission
+    bitsets, so a tool check is a dict lookup and a mask test.
     """
-    def __init__(self, sensitive_tools: List[str]):
+    def __init__(
+        self,
+        sensitive_tools: List[str],
+        ledger: Optional[UsageLedger] = None,
+        token_budgets: Optional[Dict[str, int]] = None,
+        identities: Optional[IdentityCache] = None,
+        tool_rules: Optional[Dict[str, List[str]]] = None
+    ):
         super().__init__(name="agent_policy_enforcement")
         self.sensitive_tools = sensitive_tools
+        # Token budgets per role (tokens per hour), enforced against the usage ledger
+        self.ledger = ledger
+        self.token_budgets = token_budgets or {}
+        self.identities = identities or IdentityCache()
+        # Rule table: tool name -> required permission mask (0 = sensitive, no extra permission)
+        rules = DEFAULT_TOOL_RULES if tool_rules is None else tool_rules
+        self._tool_rules: Dict[str, int] = {
+            name: permission_mask(rules.get(name, ())) for name in set(sensitive_tools) | set(rules)
+        }
+        # Identity per invocation, set in before_run and dropped in after_run (or end_invocation)
+        self._contexts: Dict[str, IdentityContext] = {}
+
+    async def _identity(self, invocation_id: str, user_id: str) -> IdentityContext:
+        context = self._contexts.get(invocation_id)
+        if context is None:
+            context = await self.identities.resolve(user_id)
+        return context
+
+    async def before_run_callback(self, *, invocation_context: InvocationContext) -> Optional[Any]:
+        self._contexts[invocation_context.invocation_id] = await self.identities.resolve(invocation_context.user_id)
+        return None
+
+    async def after_run_callback(self, *, invocation_context: InvocationContext) -> None:
+        self.end_invocation(invocation_context.invocation_id)
+
+    def end_invocation(self, invocation_id: str, status: str = "ok"):
+        """Also called by engine/invocations.py for runs that end without after_run."""
+        self._contexts.pop(invocation_id, None)
 
     async def before_agent_callback(self, *, agent: BaseAgent, callback_context: CallbackContext) -> Optional[Any]:
         # Inject identity into the session state if not already there
-        user_id = callback_context.user_id
-        identity = get_user_identity(user_id)
+        identity = await self._identity(callback_context.invocation_id, callback_context.user_id)
         
-        # Store for retrieval in other callbacks
-        callback_context.state["user_role"] = identity.role
-        callback_context.state["username"] = identity.username
+        # Store for retrieval in other callbacks (only on change: every write is a state delta)
+        if callback_context.state.get("user_role") != identity.role:
+            callback_context.state["user_role"] = identity.role
+        if callback_context.state.get("username") != identity.username:
+            callback_context.state["username"] = identity.username
         return None
 
     async def before_tool_callback(
@@ -37,19 +113,21 @@ class AgentPolicyPlugin(BasePlugin):
         """
         Intercept tool calls based on verified identity and permissions.
         """
-        user_id = tool_context.user_id
-        identity = get_user_identity(user_id)
+        required = self._tool_rules.get(tool.name)
+        if required is None:
+            return None
+
+        identity = await self._identity(tool_context.invocation_id, tool_context.user_id)
+        print(f"[POLICY] Intercepted sensitive tool: {tool.name} for user: {identity.username} ({identity.role})")
         
-        if tool.name in self.sensitive_tools:
-            print(f"[POLICY] Intercepted sensitive tool: {tool.name} for user: {identity.username} ({identity.role})")
-            
-            # RBAC: 'mcp_read_document' requires 'read_internal' permission
-            if tool.name == "mcp_read_document" and not check_permission(identity, "read_internal"):
-                return {"error": f"SECURITY_BLOCK: User '{identity.username}' does not have the required 'read_internal' permission to use {tool.name}. Access Denied."}
-            
-            # Block 'write' level access for non-admins
-            if tool_args.get("access_level") == "write" and identity.role != "admin":
-                 return {"error": f"SECURITY_BLOCK: 'write' access to {tool.name} is restricted to Administrators only. User '{identity.username}' is unauthorized."}
+        # RBAC: e.g. 'mcp_read_document' requires 'read_internal' permission
+        if not identity.has(required):
+            missing = ", ".join(f"'{name}'" for name in identity.missing(required))
+            return {"error": f"SECURITY_BLOCK: User '{identity.username}' does not have the required {missing} permission to use {tool.name}. Access Denied."}
+        
+        # Block 'write' level access for non-admins
+        if tool_args.get("access_level") == "write" and not identity.is_admin:
+             return {"error": f"SECURITY_BLOCK: 'write' access to {tool.name} is restricted to Administrators only. User '{identity.username}' is unauthorized."}
         
         return None
 
@@ -61,19 +139,34 @@ class AgentPolicyPlugin(BasePlugin):
     ) -> Optional[Any]:
         """
         Inject identity-aware constraints.
+        The shared policy text goes into the system instruction; the per-user identity goes last,
+        in the trailing user contents that ADK's context cache leaves uncached.
         """
         user_id = callback_context.user_id
-        identity = get_user_identity(user_id)
-        
-        policy_instruction = (
-            f"\n\n[IDENTITY CONTEXT]: You are currently assisting {identity.username} (Role: {identity.role}). "
-            "Tailor your responses to their technical level and clearance. "
-            "Never disclose administrative credentials or bypass internal document IDs."
-        )
+        identity = await self._identity(callback_context.invocation_id, user_id)
+
+        budget = self.token_budgets.get(identity.role)
+        if budget and self.ledger is not None:
+            used = self.ledger.window_total("user", user_id, BUDGET_WINDOW_SECONDS)
+            if used >= budget:
+                # Short-circuit: the model is never called, so a runaway session costs nothing more
+                print(f"[POLICY] Token budget exhausted for {identity.username} ({identity.role}): {used}/{budget} tokens in the last hour")
+                return LlmResponse(
+                    content=types.Content(role="model", parts=[types.Part(
+                        text=f"Your hourly token budget ({budget} tokens for role '{identity.role}') has been used up. Please try again later."
+                    )]),
+                    custom_metadata={"policy": "token_budget_exceeded", "used": used, "budget": budget}
+                )
         
-        if llm_request.config.system_instruction:
-            llm_request.config.system_instruction += policy_instruction
-        else:
-            llm_request.config.system_instruction = policy_instruction
+        # Identical for every user: part of the cacheable prefix (agent instruction + tools)
+        system_instruction = llm_request.config.system_instruction
+        if not (isinstance(system_instruction, str) and POLICY_INSTRUCTION in system_instruction):
+            llm_request.append_instructions([POLICY_INSTRUCTION])
+
+        # Per-user part: a trailing user content, after everything the context cache can cover
+        if not _has_identity_segment(llm_request.contents):
+            llm_request.contents.append(types.Content(role="user", parts=[types.Part(
+                text=f"{IDENTITY_MARKER} You are currently assisting {identity.username} (Role: {identity.role})."
+            )]))
             
         return None
@@ -0,0 +1,237 @@
+import hashlib
+import json
+import math
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.plugins.base_plugin import BasePlugin
+from google.genai import types
+from engine.identity import IdentityCache
+
+Embedder = Callable[[str], Awaitable[List[float]]]
+
+def _normalize_text(text: str) -> str:
+    return " ".join(text.split()).casefold()
+
+def _part_key(part: types.Part) -> Any:
+    if part.text is not None:
+        return _normalize_text(part.text)
+    if part.function_call:
+        return {"call": part.function_call.name, "args": part.function_call.args}
+    if part.function_response:
+        return {"result": part.function_response.name, "response": part.function_response.response}
+    # Inline data, code execution etc.: fall back to the full part
+    return part.model_dump(exclude_none=True, mode="json")
+
+def _content_key(content: Optional[types.Content]) -> Any:
+    if content is None:
+        return None
+    return [content.role, [_part_key(p) for p in content.parts or []]]
+
+def _last_user_text(llm_request: LlmRequest) -> Optional[str]:
+    if not llm_request.contents or llm_request.contents[-1].role != "user":
+        return None
+    text = " ".join(p.text for p in llm_request.contents[-1].parts or [] if p.text)
+    return _normalize_text(text) or None
+
+def _digest(payload: Any) -> str:
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+def _unit(vector: List[float]) -> List[float]:
+    norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+    return [v / norm for v in vector]
+
+def gemini_embedder(model: str) -> Embedder:
+    """Embed text with a Gemini embedding model (only called on exact-key misses)."""
+    from google import genai
+    client = genai.Client()
+
+    async def embed(text: str) -> List[float]:
+        result = await client.aio.models.embed_content(model=model, contents=text)
+        return result.embeddings[0].values
+    return embed
+
+class _CacheEntry:
+    __slots__ = ("response", "expires_at", "tokens", "scope", "vector", "has_calls")
+
+    def __init__(self, response: LlmResponse, expires_at: float, scope: str, vector: Optional[List[float]]):
+        self.response = response
+        self.expires_at = expires_at
+        usage = response.usage_metadata
+        self.tokens = (usage.total_token_count or 0) if usage else 0
+        self.scope = scope
+        self.vector = vector
+        self.has_calls = any(p.function_call for p in response.content.parts or [])
+
+class ResponseCachePlugin(BasePlugin):
+    """
+    Serves repeated model calls from memory instead of a provider round trip.
+    The key is the normalized LlmRequest: model, system instruction, contents, tool
+    declarations, scoped to the caller (user id and role): the policy plugin tailors answers to
+    the user through a per-user identity note, so one user's answer is never served to another.
+    - Exact hits: identical normalized request.
+    - Similar hits (optional): same context (everything but the last user message) and a
+      last user message whose embedding clears `similarity_threshold`. Only plain-text
+      responses are served this way; function calls are only replayed for exact hits.
+    Entries expire after `ttl_seconds` and the least recently used are evicted beyond `max_entries`.
+    Only agents listed in `agents` are cached ("*" for all).
+    """
+    def __init__(
+        self,
+        agents: Optional[List[str]] = None,
+        ttl_seconds: Optional[float] = None,
+        max_entries: Optional[int] = None,
+        similarity_threshold: Optional[float] = None,
+        embedder: Optional[Embedder] = None,
+        identities: Optional[IdentityCache] = None
+    ):
+        super().__init__(name="response_cache")
+        if agents is None:
+            agents = [a.strip() for a in os.getenv("RESPONSE_CACHE_AGENTS", "Supervisor").split(",") if a.strip()]
+        self.agents = set(agents)
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else float(os.getenv("RESPONSE_CACHE_TTL", "600"))
+        self.max_entries = max_entries if max_entries is not None else int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1024"))
+        self.similarity_threshold = similarity_threshold if similarity_threshold is not None else float(os.getenv("RESPONSE_CACHE_SIMILARITY", "0"))
+        if embedder is None and self.similarity_threshold > 0:
+            embedder = gemini_embedder(os.getenv("RESPONSE_CACHE_EMBED_MODEL", "gemini-embedding-001"))
+        self.embedder = embedder
+        self.identities = identities or IdentityCache()
+
+        self._entries: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        # Keys computed in before_model, waiting for the matching after_model; dropped per invocation
+        self._pending: Dict[Tuple[str, str], Tuple[str, str, Optional[List[float]]]] = {}
+
+        self.lookups = 0
+        self.exact_hits = 0
+        self.similar_hits = 0
+        self.saved_tokens = 0
+        self.evictions = {"ttl": 0, "lru": 0}
+
+    def _enabled_for(self, agent_name: str) -> bool:
+        return "*" in self.agents or agent_name in self.agents
+
+    def _keys(self, llm_request: LlmRequest, user_id: str, role: str) -> Tuple[str, str]:
+        """(exact key, scope key): the scope leaves out the last user message."""
+        config = llm_request.config
+        instruction = config.system_instruction if config else None
+        if isinstance(instruction, types.Content):
+            instruction = _content_key(instruction)
+        elif isinstance(instruction, str):
+            instruction = _normalize_text(instruction)
+        tools = [t.model_dump(exclude_none=True, mode="json") for t in (config.tools or [])] if config else []
+        contents = [_content_key(c) for c in llm_request.contents]
+
+        scope = _digest([llm_request.model, user_id, role, instruction, tools, contents[:-1]])
+        return _digest([scope, contents[-1:]]), scope
+
+    def _get(self, key: str) -> Optional[_CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at < time.monotonic():
+            del self._entries[key]
+            self.evictions["ttl"] += 1
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _nearest(self, scope: str, vector: List[float]) -> Optional[_CacheEntry]:
+        best, best_score = None, self.similarity_threshold
+        for key, entry in list(self._entries.items()):
+            if entry.scope != scope or entry.vector is None or entry.has_calls:
+                continue
+            score = sum(a * b for a, b in zip(vector, entry.vector))
+            if score >= best_score and self._get(key) is not None:
+                best, best_score = entry, score
+        return best
+
+    def _serve(self, entry: _CacheEntry, kind: str) -> LlmResponse:
+        self.saved_tokens += entry.tokens
+        response = entry.response.model_copy(deep=True)
+        # No tokens were spent on this call; keep usage-based accounting honest
+        response.usage_metadata = None
+        for part in response.content.parts:
+            if part.function_call:
+                part.function_call.id = None  # ADK assigns a fresh id to the replayed call
+        response.custom_metadata = {**(response.custom_metadata or {}), "response_cache": kind}
+        return response
+
+    async def before_model_callback(self, *, callback_context: CallbackContext, llm_request: LlmRequest) -> Optional[LlmResponse]:
+        if not self._enabled_for(callback_context.agent_name) or not llm_request.contents:
+            return None
+        self.lookups += 1
+        identity = await self.identities.resolve(callback_context.user_id)
+        key, scope = self._keys(llm_request, callback_context.user_id, identity.role)
+
+        entry = self._get(key)
+        if entry is not None:
+            self.exact_hits += 1
+            return self._serve(entry, "exact")
+
+        vector = None
+        if self.embedder is not None:
+            text = _last_user_text(llm_request)
+            if text:
+                try:
+                    vector = _unit(await self.embedder(text))
+                except Exception as e:
+                    print(f"[Cache] Embedding failed, exact matching only: {e}")
+            if vector is not None:
+                entry = self._nearest(scope, vector)
+                if entry is not None:
+                    self.similar_hits += 1
+                    return self._serve(entry, "similar")
+
+        self._pending[(callback_context.invocation_id, callback_context.agent_name)] = (key, scope, vector)
+        return None
+
+    async def after_model_callback(self, *, callback_context: CallbackContext, llm_response: LlmResponse) -> Optional[LlmResponse]:
+        if llm_response.partial:
+            return None  # streamed chunks; the aggregated response follows
+        pending = self._pending.pop((callback_context.invocation_id, callback_context.agent_name), None)
+        if pending is None or llm_response.error_code or not llm_response.content or not llm_response.content.parts:
+            return None
+
+        key, scope, vector = pending
+        self._entries[key] = _CacheEntry(
+            llm_response.model_copy(deep=True), time.monotonic() + self.ttl_seconds, scope, vector
+        )
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions["lru"] += 1
+        return None
+
+    async def on_model_error_callback(self, *, callback_context: CallbackContext, llm_request: LlmRequest, error: Exception) -> Optional[LlmResponse]:
+        self._pending.pop((callback_context.invocation_id, callback_context.agent_name), None)
+        return None
+
+    async def after_run_callback(self, *, invocation_context: InvocationContext) -> None:
+        self.end_invocation(invocation_context.invocation_id)
+
+    def end_invocation(self, invocation_id: str, status: str = "ok"):
+        """Drop keys whose model call never completed; also called by engine/invocations.py."""
+        for key in [k for k in self._pending if k[0] == invocation_id]:
+            del self._pending[key]
+
+    def stats(self) -> Dict[str, Any]:
+        hits = self.exact_hits + self.similar_hits
+        return {
+            "agents": sorted(self.agents),
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "similarity_threshold": self.similarity_threshold if self.embedder else None,
+            "lookups": self.lookups,
+            "exact_hits": self.exact_hits,
+            "similar_hits": self.similar_hits,
+            "hit_rate": round(hits / self.lookups, 4) if self.lookups else 0.0,
+            "saved_tokens": self.saved_tokens,
+            "evictions": dict(self.evictions)
+        }
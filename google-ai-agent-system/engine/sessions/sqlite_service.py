@@ -0,0 +1,362 @@
+import asyncio
+import copy
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+
+from google.adk.errors.already_exists_error import AlreadyExistsError
+from google.adk.events.event import Event
+from google.adk.sessions import _session_util
+from google.adk.sessions.base_session_service import BaseSessionService, GetSessionConfig, ListSessionsResponse
+from google.adk.sessions.in_memory_session_service import InMemorySessionService
+from google.adk.sessions.session import Session
+from google.adk.sessions.state import State
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS app_states (
+    app_name TEXT PRIMARY KEY,
+    state TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS user_states (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    state TEXT NOT NULL,
+    PRIMARY KEY (app_name, user_id)
+);
+CREATE TABLE IF NOT EXISTS sessions (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    state TEXT NOT NULL,
+    create_time REAL NOT NULL,
+    update_time REAL NOT NULL,
+    event_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (app_name, user_id, id)
+);
+CREATE TABLE IF NOT EXISTS events (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    timestamp REAL NOT NULL,
+    event_data TEXT NOT NULL,
+    PRIMARY KEY (app_name, user_id, session_id, seq)
+) WITHOUT ROWID;
+"""
+
+SessionKey = Tuple[str, str, str]
+
+class _CachedSession:
+    """Hot-cache entry: the master copy of a session and how many events it holds."""
+    __slots__ = ("session", "event_count")
+
+    def __init__(self, session: Session, event_count: int):
+        self.session = session
+        self.event_count = event_count
+
+class SqliteSessionService(BaseSessionService):
+    """
+    Durable ADK session service backed by a local SQLite database in WAL mode.
+    Events are appended as individual rows (never rewriting the session), and an
+    in-process LRU cache keeps recently active sessions hot. Each read validates
+    the cache against the stored event count, so several worker processes on the
+    same box can serve the same sessions.
+    The connection belongs to a single worker thread: every query (and a BEGIN IMMEDIATE
+    waiting out another process's write lock) runs there, never on the event loop.
+    """
+    def __init__(self, db_path: str = "sessions.sqlite", cache_size: int = 1024):
+        self.db_path = db_path
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[SessionKey, _CachedSession]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite-sessions")
+        self._conn = self._executor.submit(self._connect).result()
+        print(f"[Sessions] SQLite session store at {db_path} (WAL, hot cache={cache_size})")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        conn.executescript(SCHEMA)
+        return conn
+
+    async def _run(self, fn, *args):
+        """Run blocking database work on the connection's thread."""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    # --- Hot cache -------------------------------------------------------
+
+    def _cache_get(self, key: SessionKey) -> Optional[_CachedSession]:
+        entry = self._cache.get(key)
+        if entry is not None:
+            self._cache.move_to_end(key)
+        return entry
+
+    def _cache_put(self, key: SessionKey, entry: _CachedSession):
+        self._cache[key] = entry
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    # --- State helpers ---------------------------------------------------
+
+    def _load_state(self, query: str, params: tuple) -> Dict[str, Any]:
+        row = self._conn.execute(query, params).fetchone()
+        return json.loads(row[0]) if row else {}
+
+    def _merged_state(self, app_name: str, user_id: str, session_state: Dict[str, Any]) -> Dict[str, Any]:
+        merged = dict(session_state)
+        app_state = self._load_state("SELECT state FROM app_states WHERE app_name=?", (app_name,))
+        user_state = self._load_state(
+            "SELECT state FROM user_states WHERE app_name=? AND user_id=?", (app_name, user_id)
+        )
+        for k, v in app_state.items():
+            merged[State.APP_PREFIX + k] = v
+        for k, v in user_state.items():
+            merged[State.USER_PREFIX + k] = v
+        return merged
+
+    def _write_state_deltas(self, app_name: str, user_id: str, deltas: Dict[str, Dict[str, Any]]):
+        # Load -> dict.update -> dump: ADK replaces top-level keys and keeps None values, where
+        # SQLite's json_patch (RFC 7396) would merge nested dicts and delete keys set to None.
+        # Callers hold the write transaction, so the read-modify-write is atomic across workers.
+        if deltas["app"]:
+            state = self._load_state("SELECT state FROM app_states WHERE app_name=?", (app_name,))
+            state.update(deltas["app"])
+            self._conn.execute(
+                "INSERT INTO app_states (app_name, state) VALUES (?, ?) "
+                "ON CONFLICT(app_name) DO UPDATE SET state=excluded.state",
+                (app_name, json.dumps(state))
+            )
+        if deltas["user"]:
+            state = self._load_state(
+                "SELECT state FROM user_states WHERE app_name=? AND user_id=?", (app_name, user_id)
+            )
+            state.update(deltas["user"])
+            self._conn.execute(
+                "INSERT INTO user_states (app_name, user_id, state) VALUES (?, ?, ?) "
+                "ON CONFLICT(app_name, user_id) DO UPDATE SET state=excluded.state",
+                (app_name, user_id, json.dumps(state))
+            )
+
+    # --- BaseSessionService ----------------------------------------------
+
+    async def create_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        state: Optional[Dict[str, Any]] = None,
+        session_id: Optional[str] = None,
+    ) -> Session:
+        session_id = session_id.strip() if session_id and session_id.strip() else str(uuid.uuid4())
+        return await self._run(self._create_session, app_name, user_id, session_id, state)
+
+    def _create_session(self, app_name: str, user_id: str, session_id: str, state: Optional[Dict[str, Any]]) -> Session:
+        deltas = _session_util.extract_state_delta(state)
+        now = time.time()
+
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._write_state_deltas(app_name, user_id, deltas)
+                self._conn.execute(
+                    "INSERT INTO sessions (app_name, user_id, id, state, create_time, update_time, event_count) "
+                    "VALUES (?, ?, ?, ?, ?, ?, 0)",
+                    (app_name, user_id, session_id, json.dumps(deltas["session"]), now, now)
+                )
+                self._conn.execute("COMMIT")
+            except sqlite3.IntegrityError:
+                self._conn.execute("ROLLBACK")
+                raise AlreadyExistsError(f"Session with id {session_id} already exists.")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+            session = Session(
+                app_name=app_name,
+                user_id=user_id,
+                id=session_id,
+                state=deltas["session"],
+                last_update_time=now
+            )
+            self._cache_put((app_name, user_id, session_id), _CachedSession(session, 0))
+            return self._copy_out(session, app_name, user_id, None)
+
+    async def get_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        config: Optional[GetSessionConfig] = None,
+    ) -> Optional[Session]:
+        return await self._run(self._get_session, (app_name, user_id, session_id), config)
+
+    def _get_session(self, key: SessionKey, config: Optional[GetSessionConfig]) -> Optional[Session]:
+        app_name, user_id, session_id = key
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT state, update_time, event_count FROM sessions WHERE app_name=? AND user_id=? AND id=?",
+                key
+            ).fetchone()
+            if row is None:
+                self._cache.pop(key, None)
+                return None
+            state_json, update_time, event_count = row
+
+            entry = self._cache_get(key)
+            if entry is None or entry.event_count > event_count:
+                # Cold (or the session was recreated elsewhere): load everything
+                entry = _CachedSession(
+                    Session(app_name=app_name, user_id=user_id, id=session_id, events=[]), 0
+                )
+                self._cache_put(key, entry)
+
+            if entry.event_count < event_count:
+                # Another worker appended since we last looked: only fetch the tail
+                rows = self._conn.execute(
+                    "SELECT event_data FROM events WHERE app_name=? AND user_id=? AND session_id=? AND seq>=? "
+                    "ORDER BY seq",
+                    key + (entry.event_count,)
+                ).fetchall()
+                entry.session.events.extend(Event.model_validate_json(r[0]) for r in rows)
+                entry.event_count += len(rows)
+
+            entry.session.state = json.loads(state_json)
+            entry.session.last_update_time = update_time
+            return self._copy_out(entry.session, app_name, user_id, config)
+
+    def _copy_out(self, session: Session, app_name: str, user_id: str, config: Optional[GetSessionConfig]) -> Session:
+        """Return a light copy so runner appends never mutate the cached master."""
+        events = session.events
+        if config:
+            if config.num_recent_events is not None:
+                events = events[-config.num_recent_events:] if config.num_recent_events else []
+            if config.after_timestamp:
+                events = [e for e in events if e.timestamp >= config.after_timestamp]
+        copied = session.model_copy(deep=False)
+        copied.events = list(events)
+        copied.state = self._merged_state(app_name, user_id, copy.copy(session.state))
+        return copied
+
+    async def list_sessions(self, *, app_name: str, user_id: Optional[str] = None) -> ListSessionsResponse:
+        return await self._run(self._list_sessions, app_name, user_id)
+
+    def _list_sessions(self, app_name: str, user_id: Optional[str]) -> ListSessionsResponse:
+        with self._lock:
+            if user_id is None:
+                rows = self._conn.execute(
+                    "SELECT user_id, id, state, update_time FROM sessions WHERE app_name=?", (app_name,)
+                ).fetchall()
+            else:
+                rows = self._conn.execute(
+                    "SELECT user_id, id, state, update_time FROM sessions WHERE app_name=? AND user_id=?",
+                    (app_name, user_id)
+                ).fetchall()
+            sessions = [
+                Session(
+                    app_name=app_name,
+                    user_id=uid,
+                    id=sid,
+                    state=self._merged_state(app_name, uid, json.loads(state)),
+                    last_update_time=update_time
+                )
+                for uid, sid, state, update_time in rows
+            ]
+        return ListSessionsResponse(sessions=sessions)
+
+    async def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        await self._run(self._delete_session, (app_name, user_id, session_id))
+
+    def _delete_session(self, key: SessionKey):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._conn.execute("DELETE FROM events WHERE app_name=? AND user_id=? AND session_id=?", key)
+            self._conn.execute("DELETE FROM sessions WHERE app_name=? AND user_id=? AND id=?", key)
+            self._conn.execute("COMMIT")
+            self._cache.pop(key, None)
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        if event.partial:
+            return event
+
+        # Let the base class apply temp state, trim it and update the caller's session object
+        event = await super().append_event(session=session, event=event)
+        session.last_update_time = event.timestamp
+
+        await self._run(self._append_event, session, event)
+        return event
+
+    def _append_event(self, session: Session, event: Event):
+        key = (session.app_name, session.user_id, session.id)
+        deltas = _session_util.extract_state_delta(event.actions.state_delta if event.actions else None)
+
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT event_count, state FROM sessions WHERE app_name=? AND user_id=? AND id=?", key
+                ).fetchone()
+                if row is None:
+                    raise ValueError(f"Session {session.id} not found.")
+                seq = row[0]
+                session_state = row[1]
+                if deltas["session"]:
+                    state = json.loads(session_state)
+                    state.update(deltas["session"])
+                    session_state = json.dumps(state)
+                self._write_state_deltas(session.app_name, session.user_id, deltas)
+                self._conn.execute(
+                    "INSERT INTO events (app_name, user_id, session_id, seq, timestamp, event_data) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    key + (seq, event.timestamp, event.model_dump_json(exclude_none=True))
+                )
+                self._conn.execute(
+                    "UPDATE sessions SET state=?, update_time=?, event_count=? "
+                    "WHERE app_name=? AND user_id=? AND id=?",
+                    (session_state, event.timestamp, seq + 1) + key
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+            # Keep the hot copy in step when nobody else wrote in between
+            entry = self._cache_get(key)
+            if entry is not None:
+                if entry.event_count == seq:
+                    entry.session.events.append(event)
+                    entry.session.state.update(deltas["session"])
+                    entry.session.last_update_time = event.timestamp
+                    entry.event_count += 1
+                else:
+                    self._cache.pop(key, None)
+
+    def cache_info(self) -> Dict[str, Any]:
+        return {"backend": "sqlite", "db_path": self.db_path, "hot_sessions": len(self._cache), "cache_size": self.cache_size}
+
+    def clear_cache(self):
+        """Drop every hot session (used by benchmarks to measure cold loads)."""
+        with self._lock:
+            self._cache.clear()
+
+def build_session_service() -> BaseSessionService:
+    """
+    Session backend factory.
+    SESSION_BACKEND=sqlite enables the durable store; anything else keeps the ADK in-memory service.
+    """
+    backend = os.getenv("SESSION_BACKEND", "memory")
+    if backend == "sqlite":
+        return SqliteSessionService(
+            db_path=os.getenv("SESSION_DB_PATH", "sessions.sqlite"),
+            cache_size=int(os.getenv("SESSION_CACHE_SIZE", "1024"))
+        )
+    return InMemorySessionService()
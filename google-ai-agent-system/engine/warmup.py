@@ -0,0 +1,161 @@
+import asyncio
+import os
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from google.adk.agents.base_agent import BaseAgent
+from google.adk.agents.llm_agent import LlmAgent
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.registry import LLMRegistry
+from google.adk.runners import Runner
+from google.adk.sessions.in_memory_session_service import InMemorySessionService
+from google.adk.tools.agent_tool import AgentTool
+from google.genai import types
+from engine.invocations import invocation_scope
+from engine.space.registry import AgentRegistry
+
+class WarmupManager:
+    """
+    Readiness warm-up for every agent registered in the AgentRegistry (and every agent nested under it).
+    - pin_models(), awaited at startup before the server accepts requests: pins one shared
+      model instance per model name, so the client and its connection pool survive across
+      requests instead of being rebuilt on each model call. It swaps agent.model, which is
+      only safe while no invocation can be reading it.
+    - run(), in the background while /ready reports 503: resolves tools (including
+      LazyToolsets) and builds their function declarations, then, in "full" mode, runs a
+      synthetic invocation per agent to open the provider connection and pay first-call costs.
+    ENGINE_WARMUP selects the mode: off | light (no model calls) | full (default).
+    """
+    def __init__(
+        self,
+        registry: AgentRegistry,
+        runner: Optional[Runner],
+        mode: Optional[str] = None,
+        prompt: Optional[str] = None,
+        timeout: Optional[float] = None
+    ):
+        self.registry = registry
+        self.runner = runner
+        self.mode = mode or os.getenv("ENGINE_WARMUP", "full")
+        self.prompt = prompt or os.getenv("WARMUP_PROMPT", "Reply with the single word: ready.")
+        self.timeout = timeout if timeout is not None else float(os.getenv("WARMUP_TIMEOUT", "30"))
+        self.state = "pending"
+        self.steps: List[Dict[str, Any]] = []
+        self.duration_ms: Optional[float] = None
+        self._shared_models: Dict[str, BaseLlm] = {}
+
+    @property
+    def is_ready(self) -> bool:
+        return self.state == "ready"
+
+    def report(self) -> Dict[str, Any]:
+        failed = [s for s in self.steps if s["status"] != "ok"]
+        return {
+            "state": self.state,
+            "mode": self.mode,
+            "duration_ms": self.duration_ms,
+            "degraded": bool(failed),
+            "steps": self.steps
+        }
+
+    def _agents(self):
+        """(registry id, agent) for each registered agent, its sub-agents and the agents wrapped as tools."""
+        for entry in self.registry.list_agents():
+            agent_id = entry["id"]
+            visited = set()
+            pending = [self.registry.get_agent(agent_id)]
+            while pending:
+                agent = pending.pop()
+                if id(agent) in visited:
+                    continue
+                visited.add(id(agent))
+                pending.extend(agent.sub_agents)
+                if isinstance(agent, LlmAgent):
+                    # AgentTool wraps a whole agent (code_interpreter, google_search_agent)
+                    pending.extend(t.agent for t in agent.tools if isinstance(t, AgentTool))
+                yield agent_id, agent
+
+    async def pin_models(self):
+        """
+        Pin shared models before serving. Agents that a LazyToolset only builds on first use
+        (AGENT_BOOTSTRAP=lazy) are not reachable yet and keep their per-call clients.
+        """
+        if self.runner is None or self.mode == "off":
+            return
+        for agent_id, agent in self._agents():
+            if isinstance(agent, LlmAgent):
+                await self._step(agent_id, agent.name, "pin_model", self._pin_model(agent))
+
+    async def run(self):
+        if self.runner is None:
+            self.state = "failed"
+            return
+        if self.mode == "off":
+            self.state = "ready"
+            return
+
+        self.state = "running"
+        start = time.perf_counter()
+        for agent_id, agent in self._agents():
+            if isinstance(agent, LlmAgent):
+                await self._step(agent_id, agent.name, "tools", self._preload_tools(agent))
+
+        if self.mode == "full":
+            for entry in self.registry.list_agents():
+                root = self.registry.get_agent(entry["id"])
+                await self._step(entry["id"], root.name, "synthetic_invocation", self._invoke(root))
+
+        self.duration_ms = round((time.perf_counter() - start) * 1000, 2)
+        self.state = "ready"
+        print(f"[Warmup] Completed in {self.duration_ms:.0f}ms ({len(self.steps)} steps, mode={self.mode}).")
+
+    async def _step(self, agent_id: str, agent_name: str, step: str, coro) -> Any:
+        record = {"agent_id": agent_id, "agent": agent_name, "step": step}
+        start = time.perf_counter()
+        result = None
+        try:
+            result = await asyncio.wait_for(coro, timeout=self.timeout)
+            record["status"] = "ok"
+        except Exception as e:
+            record["status"] = "failed"
+            record["error"] = f"{type(e).__name__}: {e}"
+            print(f"[Warmup] {agent_name}/{step} failed: {e}")
+        record["duration_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        self.steps.append(record)
+        return result
+
+    async def _pin_model(self, agent: LlmAgent):
+        if not isinstance(agent.model, str) or not agent.model:
+            return
+        model = self._shared_models.get(agent.model)
+        if model is None:
+            model = LLMRegistry.new_llm(agent.model)
+            # Gemini builds its genai client lazily; build it now, off the event loop
+            if hasattr(type(model), "api_client"):
+                await asyncio.to_thread(lambda: model.api_client)
+            self._shared_models[agent.model] = model
+        agent.model = model
+
+    async def _preload_tools(self, agent: LlmAgent) -> List[Any]:
+        tools = await agent.canonical_tools()
+        for tool in tools:
+            tool._get_declaration()
+        return tools
+
+    async def _invoke(self, root: BaseAgent):
+        runner = self.runner
+        if runner.agent is not root:
+            runner = Runner(
+                app_name="warmup",
+                agent=root,
+                session_service=InMemorySessionService(),
+                auto_create_session=True
+            )
+        session_id = f"warmup-{uuid.uuid4()}"
+        message = types.Content(role="user", parts=[types.Part(text=self.prompt)])
+        with invocation_scope(runner):  # a warmup timeout cancels the run mid-way
+            async for _ in runner.run_async(user_id="warmup", session_id=session_id, new_message=message):
+                pass
+        # Keep synthetic sessions out of the real session store
+        await runner.session_service.delete_session(app_name=runner.app_name, user_id="warmup", session_id=session_id)
@@ -0,0 +1,105 @@
+import os
+import re
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from frameworks.a2a.protocol import A2AMessage
+
+# Free-text DISCOVERY replies, e.g. "Capabilities: budget_analysis, tax_forecasting."
+_CAPABILITY_TEXT = re.compile(r"capabilities\s*:\s*(.+)", re.IGNORECASE | re.DOTALL)
+
+def normalize_capability(name: str) -> str:
+    """'Budget Analysis' / 'budget-analysis' / 'budget_analysis.' -> 'budget_analysis'"""
+    return re.sub(r"[\s\-]+", "_", name.strip().strip(".").strip().lower())
+
+def parse_capabilities(reply: A2AMessage) -> List[str]:
+    """
+    Capabilities announced in a DISCOVERY reply: the structured metadata["capabilities"] list
+    when the peer sends one, otherwise the comma-separated list after "Capabilities:".
+    """
+    declared = reply.metadata.get("capabilities")
+    if isinstance(declared, (list, tuple)):
+        names = [str(c) for c in declared]
+    else:
+        match = _CAPABILITY_TEXT.search(reply.content or "")
+        names = re.split(r"[,;\n]", match.group(1)) if match else []
+    return list(dict.fromkeys(n for n in (normalize_capability(c) for c in names) if n))
+
+class CapabilityIndex:
+    """
+    Structured A2A directory: capability -> endpoints, as a hash index.
+    Entries are declared at registration (kept until the endpoint re-registers) or learned
+    from DISCOVERY replies, which go stale after `ttl` seconds and are re-discovered in the
+    background. A stale entry keeps answering lookups until a refresh replaces it, so a
+    peer that is briefly unreachable does not drop out of the directory.
+    """
+    def __init__(self, ttl: Optional[float] = None):
+        self.ttl = ttl if ttl is not None else float(os.getenv("A2A_CAPABILITY_TTL", "300"))
+        # uri -> (capabilities, source, learned at)
+        self._entries: Dict[str, Tuple[Tuple[str, ...], str, float]] = {}
+        # capability -> endpoints, dict as an insertion-ordered set
+        self._by_capability: Dict[str, Dict[str, None]] = {}
+        self.lookups = 0
+        self.discovered = 0
+        self.refresh_failures = 0
+
+    def set(self, uri: str, capabilities: Iterable[str], source: str = "declared"):
+        self.remove(uri)
+        names = tuple(dict.fromkeys(normalize_capability(c) for c in capabilities if c))
+        self._entries[uri] = (names, source, time.monotonic())
+        for name in names:
+            self._by_capability.setdefault(name, {})[uri] = None
+
+    def remove(self, uri: str):
+        entry = self._entries.pop(uri, None)
+        if entry is None:
+            return
+        for name in entry[0]:
+            endpoints = self._by_capability.get(name)
+            if endpoints is not None:
+                endpoints.pop(uri, None)
+                if not endpoints:
+                    del self._by_capability[name]
+
+    def learn(self, uri: str, reply: A2AMessage) -> bool:
+        """
+        Index the capabilities in a DISCOVERY reply from `uri`. False if it announced none;
+        the endpoint is still indexed (empty) so it is not asked again before the TTL.
+        """
+        names = parse_capabilities(reply)
+        self.set(uri, names, source="discovered")
+        self.discovered += 1
+        return bool(names)
+
+    def lookup(self, capability: str) -> List[str]:
+        """Endpoints offering `capability`; one dict lookup, no network."""
+        self.lookups += 1
+        return list(self._by_capability.get(normalize_capability(capability), ()))
+
+    def capabilities_of(self, uri: str) -> List[str]:
+        entry = self._entries.get(uri)
+        return list(entry[0]) if entry else []
+
+    def known(self) -> List[str]:
+        return sorted(self._by_capability)
+
+    def needs_refresh(self, uris: Iterable[str]) -> List[str]:
+        """Endpoints never discovered, or whose discovered entry is older than the TTL."""
+        cutoff = time.monotonic() - self.ttl
+        due = []
+        for uri in uris:
+            entry = self._entries.get(uri)
+            if entry is None or (entry[1] == "discovered" and entry[2] <= cutoff):
+                due.append(uri)
+        return due
+
+    def stats(self) -> Dict[str, Any]:
+        cutoff = time.monotonic() - self.ttl
+        return {
+            "endpoints": len(self._entries),
+            "capabilities": len(self._by_capability),
+            "stale": sum(1 for _, source, at in self._entries.values() if source == "discovered" and at <= cutoff),
+            "ttl_seconds": self.ttl,
+            "lookups": self.lookups,
+            "discovered": self.discovered,
+            "refresh_failures": self.refresh_failures
+        }
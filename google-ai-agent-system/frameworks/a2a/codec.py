@@ -0,0 +1,73 @@
+import os
+from typing import Any, Dict, Union
+import msgpack
+from frameworks.a2a.protocol import A2AMessage
+
+Frame = Union[str, bytes]
+
+class JsonCodec:
+    """Pydantic JSON, sent as WebSocket text frames. Readable; the reference for the binary codec."""
+    name = "json"
+
+    def encode(self, message: A2AMessage) -> Frame:
+        return message.model_dump_json()
+
+    def decode(self, frame: Frame) -> A2AMessage:
+        return A2AMessage.model_validate_json(frame)
+
+class MsgpackCodec:
+    """
+    Compact binary encoding, sent as WebSocket binary frames.
+    Fields are packed positionally (no key names on the wire) and the enum as its value;
+    decoding still validates, since frames come from another process.
+    """
+    name = "msgpack"
+
+    def __init__(self):
+        # Reused: packb() builds a new Packer per call. Encoding only happens on the event loop.
+        self._packer = msgpack.Packer(default=str)
+
+    def encode(self, message: A2AMessage) -> Frame:
+        context = message.context
+        return self._packer.pack([
+            message.protocol_version,
+            message.message_id,
+            message.timestamp,
+            message.sender,
+            message.receiver,
+            message.type.value,
+            message.content,
+            message.in_reply_to,
+            [context.trace_id, context.priority, context.ttl, context.security_level],
+            [[a.id, a.mimetype, a.payload, a.schema_url] for a in message.artifacts],
+            message.metadata
+        ])
+
+    def decode(self, frame: Frame) -> A2AMessage:
+        (version, message_id, timestamp, sender, receiver, type_, content, in_reply_to,
+         context, artifacts, metadata) = msgpack.unpackb(frame)
+        return A2AMessage.model_validate({
+            "protocol_version": version,
+            "message_id": message_id,
+            "timestamp": timestamp,
+            "sender": sender,
+            "receiver": receiver,
+            "type": type_,
+            "content": content,
+            "in_reply_to": in_reply_to,
+            "context": {"trace_id": context[0], "priority": context[1], "ttl": context[2], "security_level": context[3]},
+            "artifacts": [{"id": a[0], "mimetype": a[1], "payload": a[2], "schema_url": a[3]} for a in artifacts],
+            "metadata": metadata
+        })
+
+CODECS: Dict[str, Any] = {JsonCodec.name: JsonCodec(), MsgpackCodec.name: MsgpackCodec()}
+
+def codec_for(frame: Frame):
+    """The codec a peer used, told apart by frame type (text = JSON, binary = msgpack)."""
+    return CODECS["json"] if isinstance(frame, str) else CODECS["msgpack"]
+
+def codec_from_env():
+    name = os.getenv("A2A_CODEC", "msgpack")
+    if name not in CODECS:
+        raise ValueError(f"Unknown A2A codec '{name}'. Use one of: {', '.join(CODECS)}.")
+    return CODECS[name]
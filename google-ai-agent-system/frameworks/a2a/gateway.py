@@ -1,49 +1,396 @@
 import asyncio
 import logging
-from typing import Dict, Any, List, Optional, Callable
-from frameworks.a2a.protocol import A2AMessage, A2AMessageType, A2AContext
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Callable, Tuple
+from frameworks.a2a.protocol import A2AMessage, A2AMessageType, A2AContext, new_id
+from frameworks.a2a.history import MessageHistory
+from frameworks.a2a.capabilities import CapabilityIndex
+from frameworks.a2a.transport import A2ATransport, transport_from_env
+from frameworks.a2a.scheduler import A2ASchedulingError, EndpointQueue
+from frameworks.a2a.resilience import CLOSED, HEDGES, REJECTED, RETRIES, EndpointResilience, ResiliencePolicy
+from observability.tracing import TRACER
+import math
+import os
 import time
 
 logger = logging.getLogger("A2A_Dispatcher")
 
+# Fan-out completion policies: how many successful replies end a broadcast early
+BROADCAST_POLICIES = ("all", "quorum", "first")
+BROADCAST_TYPES = (A2AMessageType.DISCOVERY, A2AMessageType.NEGOTIATION, A2AMessageType.TASK_ASSIGN)
+
+@dataclass
+class BroadcastResult:
+    receivers: List[str]
+    required: int
+    replies: Dict[str, A2AMessage] = field(default_factory=dict)
+    errors: Dict[str, str] = field(default_factory=dict)
+    unanswered: List[str] = field(default_factory=list)  # still pending at the deadline or after the policy was met
+    elapsed_ms: float = 0.0
+
+    @property
+    def satisfied(self) -> bool:
+        return len(self.replies) >= self.required
+
 class A2AGateway:
     """
     The A2A Open Protocol Gateway.
     Manages communication for a fleet of autonomous agents.
     """
-    def __init__(self):
+    def __init__(self, history_size: Optional[int] = None, transport: Optional[A2ATransport] = None):
         self._registry: Dict[str, Callable[[A2AMessage], Any]] = {}
-        self._message_history: List[A2AMessage] = []
+        # Default transport (A2A_TRANSPORT), overridable per endpoint at registration
+        self.transport = transport or transport_from_env()
+        self._transports: Dict[str, A2ATransport] = {}
+        # Capability -> endpoints directory, declared at registration or learned from DISCOVERY
+        self.capabilities = CapabilityIndex()
+        # Per-endpoint priority queues and concurrency limits (frameworks/a2a/scheduler.py)
+        self._queues: Dict[str, EndpointQueue] = {}
+        # Per-endpoint deadlines, retries, circuit breakers and hedging (frameworks/a2a/resilience.py)
+        self.resilience: Dict[str, EndpointResilience] = {}
+        # Correlation table for request(): request message_id -> future of its reply
+        self._pending: Dict[str, asyncio.Future] = {}
+        self.timeouts = 0
+        self.late_replies = 0
+        # Bounded, indexed record of requests and replies (A2A_HISTORY_SIZE messages)
+        self.history = MessageHistory(history_size)
 
-    def register_endpoint(self, agent_uri: str, callback: Callable):
-        """Register an agent endpoint to receive A2A messages."""
+    def register_endpoint(
+        self,
+        agent_uri: str,
+        callback: Optional[Callable],
+        transport: Optional[A2ATransport] = None,
+        capabilities: Optional[List[str]] = None,
+        max_concurrent: Optional[int] = None,
+        resilience: Optional[ResiliencePolicy] = None
+    ):
+        """
+        Register an agent endpoint to receive A2A messages.
+        Remote agents have no local callback: pass None and the networked transport that reaches them.
+        `resilience` overrides the A2A_* environment defaults for this endpoint's timeouts,
+        retries, circuit breaker and hedging.
+        """
         self._registry[agent_uri] = callback
+        if capabilities:
+            self.capabilities.set(agent_uri, capabilities)
+        else:
+            self.capabilities.remove(agent_uri)  # learned on the next discovery pass
+        self._queues[agent_uri] = EndpointQueue(agent_uri, max_concurrent=max_concurrent)
+        self.resilience[agent_uri] = EndpointResilience(agent_uri, resilience)
+        if transport is not None:
+            self._transports[agent_uri] = transport
         logger.info(f"[A2A] Agent endpoint registered: {agent_uri}")
 
+    def is_local(self, agent_uri: str) -> bool:
+        """True if agent_uri is served by a callback in this process (not a remote peer)."""
+        return self._registry.get(agent_uri) is not None
+
     async def dispatch(self, message: A2AMessage) -> Optional[A2AMessage]:
         """Route an A2A message to its destination."""
-        self._message_history.append(message)
-        
+        # The message's trace_id ties this hop to the ADK invocation that sent it
+        with TRACER.span(
+            f"a2a {message.type.value} {message.receiver}", "a2a",
+            trace_id=message.context.trace_id,
+            sender=message.sender, receiver=message.receiver, message_id=message.message_id
+        ) as span:
+            self.history.record(message)
+            response = await self._dispatch(message, span)
+            if response is not None:
+                self.history.record(response)
+            return response
+
+    async def _dispatch(self, message: A2AMessage, span) -> Optional[A2AMessage]:
         print(f"[A2A Dispatch] {message.type.upper()}: {message.sender} -> {message.receiver}")
         
         if message.receiver not in self._registry:
             logger.warning(f"[A2A] Receiver not found: {message.receiver}")
-            return A2AMessage(
-                sender="system://gateway",
-                receiver=message.sender,
-                type=A2AMessageType.ERROR,
-                content=f"Routing Error: Agent {message.receiver} is unreachable.",
-                context=A2AContext(trace_id=message.context.trace_id)
-            )
+            span.status = "unreachable"
+            return self.error_reply(message, f"Routing Error: Agent {message.receiver} is unreachable.")
+
+        guard = self.resilience[message.receiver]
+        status = "error"
+        # Idempotent types get several attempts, spaced by jittered backoff within the TTL
+        for attempt in range(guard.attempts(message.type)):
+            if attempt:
+                delay = guard.backoff(attempt - 1)
+                if self._remaining(message) <= delay:
+                    break
+                guard.retries += 1
+                RETRIES.inc(message.receiver, message.type.value)
+                await asyncio.sleep(delay)
+
+            if not guard.breaker.allow():
+                guard.rejected += 1
+                REJECTED.inc(message.receiver)
+                span.status = "circuit_open"
+                return self.error_reply(message, f"Circuit Open: {message.receiver} is failing; "
+                                                 f"not contacted again for {guard.breaker.retry_after():.1f}s.")
+            try:
+                reply, status = await self._hedged(message, guard)
+            except asyncio.CancelledError:
+                guard.breaker.abandon()
+                raise
+            if status == "ok":
+                guard.breaker.record_success()
+                return reply
+            if status not in ("timeout", "error"):
+                # Dropped by the local scheduler: says nothing about the peer, and retrying won't help
+                guard.breaker.abandon()
+                span.status = status
+                return reply
+            guard.breaker.record_failure()
 
+        span.status = status
+        return reply
+
+    async def _hedged(self, message: A2AMessage, guard: EndpointResilience) -> Tuple[Optional[A2AMessage], str]:
+        """
+        One delivery. If hedging applies and no reply arrives within the endpoint's latency
+        percentile, a duplicate (own message_id) is sent and the first successful answer wins.
+        """
+        hedge_after = guard.hedge_after(message.type) if guard.breaker.state == CLOSED else None
+        if hedge_after is None:
+            return await self._attempt(message, guard)
+
+        primary = asyncio.ensure_future(self._attempt(message, guard))
+        tasks = {primary}
         try:
-            # Simulate network latency
-            await asyncio.sleep(0.1)
-            response = await self._registry[message.receiver](message)
-            return response
+            done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+            if done:
+                return primary.result()
+            duplicate = message.model_copy(update={
+                "message_id": new_id(), "metadata": {**message.metadata, "hedge_of": message.message_id}})
+            hedge = asyncio.ensure_future(self._attempt(duplicate, guard))
+            tasks.add(hedge)
+            guard.hedged += 1
+            pending = set(tasks)
+            while True:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                # Both copies can finish in the same batch: a success wins over a failure
+                winner = next((task for task in done if task.result()[1] == "ok"), None)
+                if winner is None:
+                    if pending:
+                        continue  # the other copy may still succeed
+                    winner = primary if primary in done else hedge
+                reply, status = winner.result()
+                HEDGES.inc(message.receiver, "hedge" if winner is hedge else "primary")
+                if reply is not None and reply.in_reply_to == duplicate.message_id:
+                    reply.in_reply_to = message.message_id
+                return reply, status
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _attempt(self, message: A2AMessage, guard: EndpointResilience) -> Tuple[Optional[A2AMessage], str]:
+        """One send through the endpoint's queue, bounded by the policy timeout and the message's TTL."""
+        # Waits for a slot on the receiver; lower priorities queue behind higher ones
+        queue = self._queues[message.receiver]
+        try:
+            await queue.acquire(message)
+        except A2ASchedulingError as e:
+            logger.warning(f"[A2A] Dropped {message.type.value} to {message.receiver} ({e.reason})")
+            return self.error_reply(message, f"Scheduling Error: {e}"), e.reason
+
+        timeout = max(0.001, min(guard.policy.timeout, self._remaining(message)))
+        started = time.perf_counter()
+        try:
+            transport = self._transports.get(message.receiver, self.transport)
+            reply = await asyncio.wait_for(transport.send(message, self._registry[message.receiver]), timeout)
+        except asyncio.TimeoutError:
+            guard.timeouts += 1
+            logger.warning(f"[A2A] {message.receiver} did not answer within {timeout:.1f}s")
+            return self.error_reply(message, f"Timeout: {message.receiver} did not answer within {timeout:.1f}s."), "timeout"
         except Exception as e:
             logger.error(f"[A2A] Dispatch error: {e}")
-            return None
+            return None, "error"
+        finally:
+            queue.release()
+        guard.record_latency(time.perf_counter() - started)
+        return reply, "ok"
+
+    @staticmethod
+    def _remaining(message: A2AMessage) -> float:
+        return message.timestamp + message.context.ttl - time.time()
+
+    async def request(self, message: A2AMessage, timeout: Optional[float] = None) -> A2AMessage:
+        """
+        Send a message and wait for its reply, matched by message_id.
+        The endpoint may return the reply directly, or return an ACKNOWLEDGEMENT and deliver the
+        reply later through receive(). Waits at most the message's remaining TTL
+        (timestamp + context.ttl) unless `timeout` is given; any number of requests can be in
+        flight at once. Failures come back as ERROR messages, never as exceptions.
+        """
+        if timeout is None:
+            timeout = self._remaining(message)
+        if timeout <= 0:
+            return self.error_reply(message, f"Message to {message.receiver} expired before it was sent.")
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[message.message_id] = future
+        try:
+            reply = await asyncio.wait_for(self._exchange(message, future), timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            logger.warning(f"[A2A] No reply from {message.receiver} within {timeout:.1f}s")
+            return self.error_reply(message, f"Timeout: no reply from {message.receiver} within {timeout:.1f}s.")
+        finally:
+            self._pending.pop(message.message_id, None)
+
+        # Every DISCOVERY answer, whoever asked, keeps the capability index current
+        if message.type == A2AMessageType.DISCOVERY and reply.type != A2AMessageType.ERROR:
+            self.capabilities.learn(message.receiver, reply)
+        return reply
+
+    async def _exchange(self, message: A2AMessage, future: asyncio.Future) -> A2AMessage:
+        reply = await self.dispatch(message)
+        if reply is None:
+            return self.error_reply(message, f"Dispatch Error: {message.receiver} failed to process the message.")
+        if reply.type != A2AMessageType.ACKNOWLEDGEMENT:
+            if reply.in_reply_to is None:
+                reply.in_reply_to = message.message_id
+            self.receive(reply)
+        return await future
+
+    def receive(self, reply: A2AMessage) -> bool:
+        """
+        Deliver a reply to the request waiting on it (reply.in_reply_to).
+        Returns False when nobody is waiting any more, e.g. the request already timed out.
+        """
+        if self.history.get(reply.message_id) is not reply:
+            self.history.record(reply)  # replies returned by dispatch() are already recorded
+        future = self._pending.get(reply.in_reply_to) if reply.in_reply_to else None
+        if future is None or future.done():
+            self.late_replies += 1
+            return False
+        future.set_result(reply)
+        return True
+
+    def endpoints_with(self, capability: str) -> List[str]:
+        """Endpoints offering `capability`, from the capability index (no network)."""
+        return self.capabilities.lookup(capability)
+
+    async def discover(self, receivers: Optional[List[str]] = None, deadline: Optional[float] = None) -> BroadcastResult:
+        """
+        Send DISCOVERY to `receivers` (default: every endpoint never discovered or past the
+        index TTL) and index their answers. Endpoints that fail keep their previous entry.
+        """
+        targets = self.capabilities.needs_refresh(self._registry) if receivers is None else receivers
+        if not targets:
+            return BroadcastResult(receivers=[], required=0)
+        deadline = deadline or float(os.getenv("A2A_DISCOVERY_TIMEOUT", "5"))
+        result = await self.broadcast(
+            A2AMessageType.DISCOVERY, "List your capabilities.", sender="system://gateway",
+            receivers=targets, deadline=deadline
+        )
+        self.capabilities.refresh_failures += len(result.errors) + len(result.unanswered)
+        return result
+
+    async def refresh_capabilities(self, interval: Optional[float] = None):
+        """Background task: re-discover missing and stale directory entries every `interval` seconds."""
+        interval = interval or float(os.getenv("A2A_CAPABILITY_REFRESH", "60"))
+        while True:
+            try:
+                result = await self.discover()
+                if result.receivers:
+                    logger.info(f"[A2A] Capability refresh: {len(result.replies)}/{len(result.receivers)} endpoints answered")
+            except Exception as e:
+                logger.error(f"[A2A] Capability refresh failed: {e}")
+            await asyncio.sleep(interval)
+
+    async def broadcast(
+        self,
+        message_type: A2AMessageType,
+        content: str,
+        sender: str,
+        receivers: Optional[List[str]] = None,
+        capability: Optional[str] = None,
+        policy: str = "all",
+        min_replies: Optional[int] = None,
+        deadline: float = 10.0,
+        context: Optional[A2AContext] = None
+    ) -> BroadcastResult:
+        """
+        Scatter-gather: send one message to many receivers concurrently and collect the replies.
+        Receivers are the explicit list, or every endpoint with `capability`. The policy says
+        how many successful replies are enough ("all", "quorum" = majority, "first" = 1;
+        `min_replies` overrides). Ends when that many replies are in, every receiver has
+        answered, or `deadline` seconds pass; requests still out are cancelled.
+        """
+        if message_type not in BROADCAST_TYPES:
+            raise ValueError(f"Cannot broadcast '{message_type.value}' messages. Use one of: {', '.join(t.value for t in BROADCAST_TYPES)}.")
+        if policy not in BROADCAST_POLICIES:
+            raise ValueError(f"Unknown broadcast policy '{policy}'. Use one of: {', '.join(BROADCAST_POLICIES)}.")
+
+        targets = list(dict.fromkeys(receivers if receivers else self.endpoints_with(capability or "")))
+        n = len(targets)
+        required = min_replies or {"all": n, "quorum": n // 2 + 1, "first": 1}[policy]
+        result = BroadcastResult(receivers=targets, required=min(required, n))
+        if not targets:
+            return result
+
+        print(f"[A2A Dispatch] BROADCAST {message_type.upper()}: {sender} -> {n} receivers (need {result.required}, {deadline}s)")
+        context = context or A2AContext()
+        context = context.model_copy(update={"ttl": max(1, math.ceil(deadline))})
+        # The per-receiver dispatch spans nest under one broadcast span
+        with TRACER.span(
+            f"a2a broadcast {message_type.value}", "a2a", trace_id=context.trace_id,
+            sender=sender, receivers=n, policy=policy, required=result.required
+        ) as span:
+            await self._gather(message_type, content, sender, context, deadline, result)
+            if not result.satisfied:
+                span.status = "unsatisfied"
+        return result
+
+    async def _gather(self, message_type: A2AMessageType, content: str, sender: str,
+                      context: A2AContext, deadline: float, result: BroadcastResult):
+        started = time.perf_counter()
+        tasks = {
+            asyncio.ensure_future(self.request(
+                A2AMessage(sender=sender, receiver=uri, type=message_type, content=content, context=context),
+                timeout=deadline
+            )): uri
+            for uri in result.receivers
+        }
+        pending = set(tasks)
+        loop = asyncio.get_running_loop()
+        stop_at = loop.time() + deadline
+        try:
+            while pending and len(result.replies) < result.required:
+                remaining = stop_at - loop.time()
+                if remaining <= 0:
+                    break
+                done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    reply = task.result()
+                    if reply.type == A2AMessageType.ERROR:
+                        result.errors[tasks[task]] = reply.content
+                    else:
+                        result.replies[tasks[task]] = reply
+        finally:
+            for task in pending:
+                task.cancel()
+        result.unanswered = [tasks[task] for task in pending]
+        result.elapsed_ms = round((time.perf_counter() - started) * 1000, 3)
+
+    def error_reply(self, message: A2AMessage, content: str) -> A2AMessage:
+        return message.reply(A2AMessageType.ERROR, content, sender="system://gateway", trusted=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "endpoints": len(self._registry),
+            "in_flight": len(self._pending),
+            "timeouts": self.timeouts,
+            "late_replies": self.late_replies,
+            "transport": self.transport.stats(),
+            "queues": {uri: queue.stats() for uri, queue in self._queues.items()},
+            "capabilities": self.capabilities.stats(),
+            "resilience": {uri: guard.stats() for uri, guard in self.resilience.items()},
+            "history": self.history.stats()
+        }
+
+    def get_trace_history(self, trace_id: str, limit: int = 50) -> List[A2AMessage]:
+        """Recent requests and replies of one trace, newest first."""
+        return self.history.by_trace(trace_id, limit)
 
     def get_system_topology(self) -> List[str]:
         """Return a list of all active agent endpoints in the A2A mesh."""
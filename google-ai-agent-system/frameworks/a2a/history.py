@@ -0,0 +1,122 @@
+import os
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+from frameworks.a2a.protocol import A2AMessage
+
+class MessageHistory:
+    """
+    Fixed-capacity ring buffer of A2A traffic with secondary indexes.
+    Every message gets a sequence number and lives in slot `seq % capacity`. The indexes
+    (trace_id, sender, receiver) map to deques of sequence numbers in arrival order, so the
+    message a write evicts is always at the left end of its deques and is dropped in O(1).
+    Memory is bounded by `capacity` messages however long the gateway runs.
+    """
+    def __init__(self, capacity: Optional[int] = None):
+        self.capacity = max(1, capacity or int(os.getenv("A2A_HISTORY_SIZE", "1024")))
+        self._slots: List[Optional[Tuple[int, A2AMessage]]] = [None] * self.capacity
+        self._seq = 0
+        self._by_id: Dict[str, int] = {}
+        self._by_trace: Dict[str, Deque[int]] = {}
+        self._by_sender: Dict[str, Deque[int]] = {}
+        self._by_receiver: Dict[str, Deque[int]] = {}
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return min(self._seq, self.capacity)
+
+    def record(self, message: A2AMessage) -> int:
+        seq = self._seq
+        self._seq += 1
+        slot = seq % self.capacity
+        old = self._slots[slot]
+        if old is not None:
+            self._evict(*old)
+        self._slots[slot] = (seq, message)
+
+        self._by_id[message.message_id] = seq
+        self._index(self._by_trace, message.context.trace_id, seq)
+        self._index(self._by_sender, message.sender, seq)
+        self._index(self._by_receiver, message.receiver, seq)
+        return seq
+
+    @staticmethod
+    def _index(index: Dict[str, Deque[int]], key: str, seq: int):
+        seqs = index.get(key)
+        if seqs is None:
+            seqs = index[key] = deque()
+        seqs.append(seq)
+
+    @staticmethod
+    def _unindex(index: Dict[str, Deque[int]], key: str, seq: int):
+        seqs = index.get(key)
+        if seqs and seqs[0] == seq:
+            seqs.popleft()
+            if not seqs:
+                del index[key]
+
+    def _evict(self, seq: int, message: A2AMessage):
+        self.evicted += 1
+        if self._by_id.get(message.message_id) == seq:
+            del self._by_id[message.message_id]
+        self._unindex(self._by_trace, message.context.trace_id, seq)
+        self._unindex(self._by_sender, message.sender, seq)
+        self._unindex(self._by_receiver, message.receiver, seq)
+
+    def _message(self, seq: int) -> Optional[A2AMessage]:
+        entry = self._slots[seq % self.capacity]
+        return entry[1] if entry is not None and entry[0] == seq else None
+
+    # --- Queries (newest first) ---
+
+    def get(self, message_id: str) -> Optional[A2AMessage]:
+        seq = self._by_id.get(message_id)
+        return self._message(seq) if seq is not None else None
+
+    def by_trace(self, trace_id: str, limit: int = 50) -> List[A2AMessage]:
+        return self.query(trace_id=trace_id, limit=limit)
+
+    def query(
+        self,
+        trace_id: Optional[str] = None,
+        sender: Optional[str] = None,
+        receiver: Optional[str] = None,
+        limit: int = 50
+    ) -> List[A2AMessage]:
+        """
+        Recent messages matching every given filter. Scans only the shortest matching
+        index (or the ring itself when no filter is given).
+        """
+        filters = [
+            (index, key) for index, key in
+            ((self._by_trace, trace_id), (self._by_sender, sender), (self._by_receiver, receiver))
+            if key is not None
+        ]
+        if filters:
+            candidates = [index.get(key) for index, key in filters]
+            if not all(candidates):
+                return []
+            seqs = reversed(min(candidates, key=len))
+        else:
+            seqs = range(self._seq - 1, self._seq - 1 - len(self), -1)
+
+        results = []
+        for seq in seqs:
+            message = self._message(seq)
+            if message is None:
+                continue
+            if (trace_id is None or message.context.trace_id == trace_id) \
+                    and (sender is None or message.sender == sender) \
+                    and (receiver is None or message.receiver == receiver):
+                results.append(message)
+                if len(results) >= limit:
+                    break
+        return results
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self),
+            "capacity": self.capacity,
+            "recorded": self._seq,
+            "evicted": self.evicted,
+            "traces": len(self._by_trace)
+        }
@@ -0,0 +1,204 @@
+import asyncio
+import logging
+import os
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from websockets.asyncio.client import connect
+from websockets.exceptions import ConnectionClosed
+from frameworks.a2a.codec import Frame, codec_for, codec_from_env
+from frameworks.a2a.protocol import A2AMessage
+from frameworks.a2a.transport import A2ATransport, A2ATransportError
+
+logger = logging.getLogger("A2A_Network")
+
+# Generous for artifacts; the default (1 MiB) is easy to hit with a document payload
+MAX_FRAME_BYTES = 16 * 1024 * 1024
+
+class _Connection:
+    """One persistent WebSocket to a peer. Requests are pipelined; replies are matched by in_reply_to."""
+    def __init__(self, websocket):
+        self.websocket = websocket
+        self.pending: Dict[str, asyncio.Future] = {}
+        self.closed = False
+        self.reader = asyncio.ensure_future(self._read())
+
+    async def _read(self):
+        error = "connection closed"
+        try:
+            async for frame in self.websocket:
+                try:
+                    reply = codec_for(frame).decode(frame)
+                except Exception as e:
+                    logger.error(f"[A2A] Undecodable frame from peer: {e}")
+                    continue
+                future = self.pending.pop(reply.in_reply_to, None)
+                if future is not None and not future.done():
+                    future.set_result(reply)
+        except Exception as e:
+            error = str(e)
+        finally:
+            self.closed = True
+            for future in self.pending.values():
+                if not future.done():
+                    future.set_exception(A2ATransportError("connection_lost", f"Connection to peer lost: {error}"))
+            self.pending.clear()
+
+class WebSocketTransport(A2ATransport):
+    """
+    Client side of the networked transport: a pool of up to `pool_size` persistent
+    WebSockets to one peer, opened on demand. Each connection carries any number of
+    requests at once (pipelining); a new connection is only opened when every existing
+    one is busy. Lost connections fail their in-flight requests and are replaced on the next send.
+    """
+    name = "websocket"
+
+    def __init__(self, url: str, pool_size: Optional[int] = None, codec=None, connect_timeout: Optional[float] = None):
+        self.url = url
+        self.pool_size = max(1, pool_size or int(os.getenv("A2A_WS_POOL_SIZE", "4")))
+        self.codec = codec or codec_from_env()
+        self.connect_timeout = connect_timeout or float(os.getenv("A2A_WS_CONNECT_TIMEOUT", "5"))
+        self._pool: List[_Connection] = []
+        self._lock = asyncio.Lock()
+        self.connects = 0
+        self.sent = 0
+
+    async def _connection(self) -> _Connection:
+        self._pool = [c for c in self._pool if not c.closed]
+        if self._pool:
+            idlest = min(self._pool, key=lambda c: len(c.pending))
+            if not idlest.pending or len(self._pool) >= self.pool_size:
+                return idlest
+
+        async with self._lock:
+            self._pool = [c for c in self._pool if not c.closed]
+            if len(self._pool) < self.pool_size:
+                try:
+                    websocket = await asyncio.wait_for(
+                        connect(self.url, compression=None, max_size=MAX_FRAME_BYTES), self.connect_timeout)
+                except (OSError, asyncio.TimeoutError) as e:
+                    if not self._pool:
+                        raise A2ATransportError("connect_failed", f"Cannot connect to {self.url}: {e}")
+                else:
+                    self.connects += 1
+                    self._pool.append(_Connection(websocket))
+            return min(self._pool, key=lambda c: len(c.pending))
+
+    async def send(self, message: A2AMessage, endpoint: Optional[Callable] = None) -> Optional[A2AMessage]:
+        connection = await self._connection()
+        future = asyncio.get_running_loop().create_future()
+        connection.pending[message.message_id] = future
+        try:
+            await connection.websocket.send(self.codec.encode(message))
+            self.sent += 1
+            return await future
+        except ConnectionClosed as e:
+            raise A2ATransportError("connection_lost", f"Connection to {self.url} lost: {e}")
+        finally:
+            connection.pending.pop(message.message_id, None)
+
+    async def close(self):
+        for connection in self._pool:
+            await connection.websocket.close()
+            await connection.reader
+        self._pool = []
+
+    def stats(self) -> Dict[str, Any]:
+        live = [c for c in self._pool if not c.closed]
+        return {
+            "transport": self.name,
+            "url": self.url,
+            "codec": self.codec.name,
+            "connections": len(live),
+            "in_flight": sum(len(c.pending) for c in live),
+            "connects": self.connects,
+            "sent": self.sent
+        }
+
+class A2AServerAdapter:
+    """
+    Server side: exposes the local endpoints registered on a gateway to remote peers.
+    Each incoming frame is dispatched through the gateway (so scheduling, history and tracing
+    apply) as its own task, and the reply goes back in the codec the peer used.
+    Messages for remote endpoints are refused rather than forwarded: the adapter is not a
+    relay, so a peer cannot route through this engine and two peers cannot loop a message.
+    """
+    def __init__(self, gateway):
+        self.gateway = gateway
+
+    async def handle_frame(self, frame: Frame) -> Optional[Frame]:
+        codec = codec_for(frame)
+        try:
+            message = codec.decode(frame)
+        except Exception as e:
+            logger.error(f"[A2A] Rejected undecodable frame: {e}")
+            return None
+        if self.gateway.is_local(message.receiver):
+            reply = await self.gateway.dispatch(message)
+        else:
+            logger.warning(f"[A2A] Refused to relay {message.type.value} from {message.sender} to non-local {message.receiver}")
+            reply = self.gateway.error_reply(message, f"Routing Error: Agent {message.receiver} is not served by this peer.")
+        if reply is None:
+            reply = self.gateway.error_reply(message, f"Dispatch Error: {message.receiver} failed to process the message.")
+        if reply.in_reply_to is None:
+            reply.in_reply_to = message.message_id
+        return codec.encode(reply)
+
+    async def _serve(self, receive: Callable[[], Awaitable[Optional[Frame]]], send: Callable[[Frame], Awaitable[Any]]):
+        send_lock = asyncio.Lock()
+        tasks = set()
+
+        async def respond(frame: Frame):
+            try:
+                reply = await self.handle_frame(frame)
+                if reply is not None:
+                    async with send_lock:
+                        await send(reply)
+            except Exception as e:
+                logger.error(f"[A2A] Failed to answer peer: {e}")
+
+        try:
+            while True:
+                frame = await receive()
+                if frame is None:
+                    break
+                task = asyncio.ensure_future(respond(frame))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def serve_websockets(self, websocket):
+        """Connection handler for `websockets.asyncio.server.serve` (standalone peers)."""
+        async def receive() -> Optional[Frame]:
+            try:
+                return await websocket.recv()
+            except ConnectionClosed:
+                return None
+        await self._serve(receive, websocket.send)
+
+    async def serve_fastapi(self, websocket):
+        """Handler body for a FastAPI/Starlette WebSocket route (the engine's /a2a/ws)."""
+        await websocket.accept()
+
+        async def receive() -> Optional[Frame]:
+            event = await websocket.receive()
+            if event["type"] == "websocket.disconnect":
+                return None
+            return event["bytes"] if event.get("bytes") is not None else event.get("text")
+
+        async def send(frame: Frame):
+            if isinstance(frame, bytes):
+                await websocket.send_bytes(frame)
+            else:
+                await websocket.send_text(frame)
+
+        await self._serve(receive, send)
+
+def parse_peers(spec: str) -> Dict[str, str]:
+    """'agent://finance=ws://finance:8000/a2a/ws,...' -> {agent URI: peer URL}"""
+    peers = {}
+    for item in spec.split(","):
+        if "=" in item:
+            uri, url = item.split("=", 1)
+            peers[uri.strip()] = url.strip()
+    return peers
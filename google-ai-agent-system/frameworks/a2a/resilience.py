@@ -0,0 +1,145 @@
+import os
+import random
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, Optional
+from frameworks.a2a.protocol import A2AMessageType
+from observability.metrics import METRICS
+
+# Safe to send twice: retried on failure and eligible for hedging
+IDEMPOTENT_TYPES = (A2AMessageType.DISCOVERY, A2AMessageType.OBSERVATION)
+
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}  # breaker state as a metric value
+
+RETRIES = METRICS.counter(
+    "a2a_retries_total", "A2A deliveries retried after a failed attempt.", ["endpoint", "type"])
+REJECTED = METRICS.counter(
+    "a2a_circuit_rejections_total", "A2A messages failed fast because the endpoint's circuit was open.", ["endpoint"])
+HEDGES = METRICS.counter(
+    "a2a_hedged_requests_total", "Duplicate A2A requests sent after the hedge threshold, by which copy answered.", ["endpoint", "winner"])
+
+class ResiliencePolicy:
+    """
+    Per-endpoint delivery policy. Unset values come from the environment:
+    - timeout: longest wait for one delivery attempt (A2A_ENDPOINT_TIMEOUT); the message's
+      remaining TTL caps it further.
+    - retry_attempts / retry_base_delay / retry_max_delay: attempts for idempotent types and
+      the full-jitter exponential backoff between them (A2A_RETRY_ATTEMPTS, A2A_RETRY_BASE_MS, A2A_RETRY_MAX_MS).
+    - breaker_failures / breaker_reset: consecutive failures that open the circuit, and seconds
+      before a trial request is let through (A2A_BREAKER_FAILURES, A2A_BREAKER_RESET).
+    - hedge_percentile: send a duplicate of a request still unanswered after this latency
+      percentile of the endpoint's recent replies; 0 disables (A2A_HEDGE_PERCENTILE).
+    - retry_types: message types safe to send twice, the only ones retried or hedged.
+    """
+    def __init__(
+        self,
+        timeout: Optional[float] = None,
+        retry_attempts: Optional[int] = None,
+        retry_base_delay: Optional[float] = None,
+        retry_max_delay: Optional[float] = None,
+        breaker_failures: Optional[int] = None,
+        breaker_reset: Optional[float] = None,
+        hedge_percentile: Optional[float] = None,
+        hedge_min_samples: Optional[int] = None,
+        retry_types: Iterable[A2AMessageType] = IDEMPOTENT_TYPES
+    ):
+        self.timeout = timeout or float(os.getenv("A2A_ENDPOINT_TIMEOUT", "30"))
+        self.retry_attempts = max(1, retry_attempts or int(os.getenv("A2A_RETRY_ATTEMPTS", "3")))
+        self.retry_base_delay = retry_base_delay if retry_base_delay is not None else float(os.getenv("A2A_RETRY_BASE_MS", "50")) / 1000
+        self.retry_max_delay = retry_max_delay if retry_max_delay is not None else float(os.getenv("A2A_RETRY_MAX_MS", "1000")) / 1000
+        self.breaker_failures = max(1, breaker_failures or int(os.getenv("A2A_BREAKER_FAILURES", "5")))
+        self.breaker_reset = breaker_reset if breaker_reset is not None else float(os.getenv("A2A_BREAKER_RESET", "30"))
+        self.hedge_percentile = hedge_percentile if hedge_percentile is not None else float(os.getenv("A2A_HEDGE_PERCENTILE", "0"))
+        self.hedge_min_samples = hedge_min_samples or int(os.getenv("A2A_HEDGE_MIN_SAMPLES", "20"))
+        self.retry_types = frozenset(retry_types)
+
+class CircuitBreaker:
+    """
+    Consecutive-failure breaker. closed: everything passes. open: everything fails fast
+    until `reset` seconds have passed. half_open: one trial request at a time; its success
+    closes the circuit, its failure opens it again.
+    """
+    def __init__(self, failures: int, reset: float):
+        self.failure_threshold = failures
+        self.reset = reset
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trial_in_flight = False
+        self.opened = 0
+
+    def allow(self) -> bool:
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN:
+            if time.monotonic() - self.opened_at < self.reset:
+                return False
+            self.state = HALF_OPEN
+        if self.trial_in_flight:
+            return False
+        self.trial_in_flight = True
+        return True
+
+    def retry_after(self) -> float:
+        return max(0.0, self.reset - (time.monotonic() - self.opened_at)) if self.state == OPEN else 0.0
+
+    def record_success(self):
+        self.state = CLOSED
+        self.failures = 0
+        self.trial_in_flight = False
+
+    def abandon(self):
+        """The attempt ended without telling anything about the peer (dropped locally, cancelled)."""
+        self.trial_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        self.trial_in_flight = False
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != OPEN:
+                self.opened += 1
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+
+class EndpointResilience:
+    """Breaker, recent reply latencies and retry/hedge counts for one endpoint."""
+    def __init__(self, uri: str, policy: Optional[ResiliencePolicy] = None):
+        self.uri = uri
+        self.policy = policy or ResiliencePolicy()
+        self.breaker = CircuitBreaker(self.policy.breaker_failures, self.policy.breaker_reset)
+        self._latencies: Deque[float] = deque(maxlen=256)
+        self.retries = 0
+        self.timeouts = 0
+        self.rejected = 0
+        self.hedged = 0
+
+    def attempts(self, message_type: A2AMessageType) -> int:
+        return self.policy.retry_attempts if message_type in self.policy.retry_types else 1
+
+    def backoff(self, attempt: int) -> float:
+        """Full jitter: uniform in [0, min(max_delay, base * 2^attempt)]."""
+        return random.uniform(0, min(self.policy.retry_max_delay, self.policy.retry_base_delay * (2 ** attempt)))
+
+    def record_latency(self, seconds: float):
+        self._latencies.append(seconds)
+
+    def hedge_after(self, message_type: A2AMessageType) -> Optional[float]:
+        """Seconds after which to send a duplicate, or None when hedging does not apply."""
+        if (self.policy.hedge_percentile <= 0 or message_type not in self.policy.retry_types
+                or len(self._latencies) < self.policy.hedge_min_samples):
+            return None
+        ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * self.policy.hedge_percentile / 100))]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.breaker.state,
+            "consecutive_failures": self.breaker.failures,
+            "opened": self.breaker.opened,
+            "retry_after_seconds": round(self.breaker.retry_after(), 3),
+            "retries": self.retries,
+            "timeouts": self.timeouts,
+            "rejected": self.rejected,
+            "hedged": self.hedged
+        }
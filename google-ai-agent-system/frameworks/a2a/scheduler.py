@@ -0,0 +1,170 @@
+import asyncio
+import os
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+from frameworks.a2a.protocol import A2AMessage
+from observability.metrics import METRICS
+
+PRIORITIES = (5, 4, 3, 2, 1)  # A2AContext.priority, most urgent first
+
+QUEUE_WAIT = METRICS.histogram(
+    "a2a_queue_wait_seconds", "Time an A2A message waited for a free endpoint slot.", ["priority"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0))
+DROPPED = METRICS.counter(
+    "a2a_messages_dropped_total", "A2A messages dropped before delivery.", ["reason", "priority"])
+
+class A2ASchedulingError(Exception):
+    """A message was dropped before delivery: expired, queue_full or displaced."""
+    def __init__(self, reason: str, message: str):
+        super().__init__(message)
+        self.reason = reason
+
+def parse_weights(spec: str) -> Dict[int, int]:
+    """'5=16,4=8,3=4,2=2,1=1' -> share of dequeues per priority class under weighted scheduling"""
+    weights = {}
+    for item in spec.split(","):
+        if "=" in item:
+            priority, weight = item.split("=", 1)
+            weights[int(priority)] = int(weight)
+    return weights
+
+def _priority(message: A2AMessage) -> int:
+    return min(5, max(1, message.context.priority))
+
+def _expired(message: A2AMessage, now: float) -> bool:
+    return message.timestamp + message.context.ttl < now
+
+class _Waiter:
+    __slots__ = ("message", "priority", "future", "enqueued")
+
+    def __init__(self, message: A2AMessage, priority: int, future: asyncio.Future):
+        self.message = message
+        self.priority = priority
+        self.future = future
+        self.enqueued = time.perf_counter()
+
+class EndpointQueue:
+    """
+    Admission to one A2A endpoint: at most `max_concurrent` messages in delivery, the rest
+    waiting in one FIFO per priority class (bounded to `max_queue` in total).
+    - "strict": the highest non-empty class always goes first.
+    - "weighted": classes share dequeues by weight (smooth weighted round robin), so low
+      priorities slow down under load but never starve.
+    Messages past `timestamp + ttl` are dropped on arrival or when their turn comes. When the
+    queue is full, a new message displaces the oldest queued message of a lower class, or is
+    dropped if there is none.
+    """
+    def __init__(
+        self,
+        uri: str,
+        max_concurrent: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        policy: Optional[str] = None,
+        weights: Optional[Dict[int, int]] = None
+    ):
+        self.uri = uri
+        self.max_concurrent = max_concurrent or int(os.getenv("A2A_ENDPOINT_CONCURRENCY", "8"))
+        self.max_queue = max_queue if max_queue is not None else int(os.getenv("A2A_ENDPOINT_QUEUE", "256"))
+        self.policy = policy or os.getenv("A2A_SCHEDULING", "strict")
+        if self.policy not in ("strict", "weighted"):
+            raise ValueError(f"Unknown A2A scheduling policy '{self.policy}'. Use strict or weighted.")
+        configured = weights or parse_weights(os.getenv("A2A_PRIORITY_WEIGHTS", "5=16,4=8,3=4,2=2,1=1"))
+        self.weights = {p: max(1, configured.get(p, 1)) for p in PRIORITIES}
+
+        self._queues: Dict[int, Deque[_Waiter]] = {p: deque() for p in PRIORITIES}
+        self._credits: Dict[int, int] = {p: 0 for p in PRIORITIES}
+        self.in_flight = 0
+        self.queued = 0
+        self.delivered = 0
+        self.dropped: Dict[str, int] = {"expired": 0, "queue_full": 0, "displaced": 0}
+
+    async def acquire(self, message: A2AMessage):
+        """Wait for a delivery slot. Raises A2ASchedulingError if the message is dropped."""
+        priority = _priority(message)
+        if _expired(message, time.time()):
+            self._drop("expired", priority)
+            raise A2ASchedulingError("expired", f"Message to {self.uri} expired before delivery (ttl {message.context.ttl}s).")
+
+        if self.in_flight < self.max_concurrent and not self.queued:
+            self.in_flight += 1
+            QUEUE_WAIT.observe(0.0, str(priority))
+            return
+
+        if self.queued >= self.max_queue:
+            victim = self._lowest_below(priority)
+            if victim is None:
+                self._drop("queue_full", priority)
+                raise A2ASchedulingError("queue_full", f"Queue for {self.uri} is full ({self.max_queue} messages).")
+            self._drop("displaced", victim.priority)
+            victim.future.set_exception(A2ASchedulingError(
+                "displaced", f"Message to {self.uri} was displaced by higher-priority traffic."))
+
+        waiter = _Waiter(message, priority, asyncio.get_running_loop().create_future())
+        self._queues[priority].append(waiter)
+        self.queued += 1
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                self.release()  # granted a slot just as the sender gave up
+            elif waiter in self._queues[priority]:
+                self._queues[priority].remove(waiter)
+                self.queued -= 1
+            raise
+        QUEUE_WAIT.observe(time.perf_counter() - waiter.enqueued, str(priority))
+
+    def release(self):
+        self.in_flight -= 1
+        self.delivered += 1
+        now = time.time()
+        while self.in_flight < self.max_concurrent and self.queued:
+            waiter = self._next()
+            if waiter.future.done():
+                continue
+            if _expired(waiter.message, now):
+                self._drop("expired", waiter.priority)
+                waiter.future.set_exception(A2ASchedulingError(
+                    "expired", f"Message to {self.uri} expired while queued (ttl {waiter.message.context.ttl}s)."))
+                continue
+            self.in_flight += 1
+            waiter.future.set_result(None)
+
+    def _next(self) -> _Waiter:
+        if self.policy == "strict":
+            priority = next(p for p in PRIORITIES if self._queues[p])
+        else:
+            # Smooth weighted round robin over the non-empty classes
+            ready = [p for p in PRIORITIES if self._queues[p]]
+            total = 0
+            for p in ready:
+                self._credits[p] += self.weights[p]
+                total += self.weights[p]
+            priority = max(ready, key=self._credits.__getitem__)
+            self._credits[priority] -= total
+        self.queued -= 1
+        return self._queues[priority].popleft()
+
+    def _lowest_below(self, priority: int) -> Optional[_Waiter]:
+        for p in reversed(PRIORITIES):
+            if p >= priority:
+                return None
+            if self._queues[p]:
+                self.queued -= 1
+                return self._queues[p].popleft()
+        return None
+
+    def _drop(self, reason: str, priority: int):
+        self.dropped[reason] += 1
+        DROPPED.inc(reason, str(priority))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "policy": self.policy,
+            "max_concurrent": self.max_concurrent,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "queued_by_priority": {p: len(self._queues[p]) for p in PRIORITIES},
+            "delivered": self.delivered,
+            "dropped": dict(self.dropped)
+        }
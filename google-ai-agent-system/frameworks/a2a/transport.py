@@ -0,0 +1,125 @@
+import abc
+import asyncio
+import inspect
+import math
+import os
+import random
+from typing import Any, Callable, Dict, Optional
+from frameworks.a2a.protocol import A2AMessage
+
+class A2ATransportError(Exception):
+    """The transport could not deliver a message or bring back its reply."""
+    def __init__(self, reason: str, message: str):
+        super().__init__(message)
+        self.reason = reason  # "lost", "injected_error", ...
+
+class A2ATransport(abc.ABC):
+    """Carries a message to an endpoint callback and its reply back to the gateway."""
+    name = "base"
+
+    @abc.abstractmethod
+    async def send(self, message: A2AMessage, endpoint: Callable[[A2AMessage], Any]) -> Optional[A2AMessage]:
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, Any]:
+        return {"transport": self.name}
+
+async def _call(endpoint: Callable[[A2AMessage], Any], message: A2AMessage) -> Optional[A2AMessage]:
+    reply = endpoint(message)
+    if inspect.isawaitable(reply):
+        reply = await reply
+    return reply
+
+class InProcessTransport(A2ATransport):
+    """Co-located agents: a direct call, no copies and no artificial delay."""
+    name = "inprocess"
+
+    async def send(self, message: A2AMessage, endpoint: Callable[[A2AMessage], Any]) -> Optional[A2AMessage]:
+        return await _call(endpoint, message)
+
+class SimulatedNetworkTransport(A2ATransport):
+    """
+    Adds network behaviour to in-process endpoints for load tests.
+    Each leg (request, reply) waits half a sampled round-trip time:
+    - "uniform": latency_ms +/- jitter_ms
+    - "normal": gaussian around latency_ms with jitter_ms standard deviation
+    - "lognormal": median latency_ms with a long tail; jitter_ms sets the spread
+    A lost message is never delivered: the sender sees a failure after `loss_timeout` seconds.
+    An injected error fails the call after the request leg, as a reset connection would.
+    """
+    name = "simulated"
+
+    def __init__(
+        self,
+        latency_ms: Optional[float] = None,
+        jitter_ms: Optional[float] = None,
+        distribution: Optional[str] = None,
+        loss_rate: Optional[float] = None,
+        error_rate: Optional[float] = None,
+        loss_timeout: Optional[float] = None,
+        seed: Optional[int] = None
+    ):
+        self.latency_ms = latency_ms if latency_ms is not None else float(os.getenv("A2A_SIM_LATENCY_MS", "100"))
+        self.jitter_ms = jitter_ms if jitter_ms is not None else float(os.getenv("A2A_SIM_JITTER_MS", "0"))
+        self.distribution = distribution or os.getenv("A2A_SIM_DISTRIBUTION", "uniform")
+        self.loss_rate = loss_rate if loss_rate is not None else float(os.getenv("A2A_SIM_LOSS_RATE", "0"))
+        self.error_rate = error_rate if error_rate is not None else float(os.getenv("A2A_SIM_ERROR_RATE", "0"))
+        self.loss_timeout = loss_timeout if loss_timeout is not None else float(os.getenv("A2A_SIM_LOSS_TIMEOUT", "1.0"))
+        if self.distribution not in ("uniform", "normal", "lognormal"):
+            raise ValueError(f"Unknown latency distribution '{self.distribution}'. Use uniform, normal or lognormal.")
+        self._rng = random.Random(seed)
+        self.sent = 0
+        self.lost = 0
+        self.errors = 0
+
+    def sample_rtt(self) -> float:
+        """One round-trip time in seconds."""
+        latency, jitter = self.latency_ms, self.jitter_ms
+        if self.distribution == "uniform":
+            rtt = latency + self._rng.uniform(-jitter, jitter)
+        elif self.distribution == "normal":
+            rtt = self._rng.gauss(latency, jitter)
+        else:
+            sigma = math.log1p(jitter / latency) if latency > 0 else 0.0
+            rtt = latency * self._rng.lognormvariate(0.0, sigma)
+        return max(0.0, rtt) / 1000
+
+    async def send(self, message: A2AMessage, endpoint: Callable[[A2AMessage], Any]) -> Optional[A2AMessage]:
+        self.sent += 1
+        leg = self.sample_rtt() / 2
+        if self.loss_rate and self._rng.random() < self.loss_rate:
+            self.lost += 1
+            await asyncio.sleep(self.loss_timeout)
+            raise A2ATransportError("lost", f"No reply from {message.receiver} within {self.loss_timeout}s (message lost).")
+        if leg:
+            await asyncio.sleep(leg)
+        if self.error_rate and self._rng.random() < self.error_rate:
+            self.errors += 1
+            raise A2ATransportError("injected_error", f"Connection to {message.receiver} reset (injected error).")
+        reply = await _call(endpoint, message)
+        if leg:
+            await asyncio.sleep(leg)
+        return reply
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "transport": self.name,
+            "latency_ms": self.latency_ms,
+            "jitter_ms": self.jitter_ms,
+            "distribution": self.distribution,
+            "sent": self.sent,
+            "lost": self.lost,
+            "errors": self.errors
+        }
+
+TRANSPORTS = {
+    InProcessTransport.name: InProcessTransport,
+    SimulatedNetworkTransport.name: SimulatedNetworkTransport
+}
+
+def transport_from_env() -> A2ATransport:
+    """Gateway default transport, from A2A_TRANSPORT (inprocess or simulated)."""
+    name = os.getenv("A2A_TRANSPORT", "inprocess")
+    if name not in TRANSPORTS:
+        raise ValueError(f"Unknown A2A transport '{name}'. Use one of: {', '.join(TRANSPORTS)}.")
+    return TRANSPORTS[name]()
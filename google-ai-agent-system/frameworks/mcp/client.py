@@ -2,6 +2,7 @@ from typing import List, Callable, Dict, Any, Optional
 from google.adk.tools.base_tool import BaseTool
 from google.adk.tools.tool_context import ToolContext
 from google.genai import types
+from observability.tracing import TRACER
 
 class MCPClient:
     """
@@ -49,8 +50,20 @@ class MCPClient:
             }
         ]
 
-    def call_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
-        """Execute a tool on the MCP server."""
+    def call_tool(self, tool_name: str, arguments: Dict[str, Any], meta: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Execute a tool on the MCP server.
+        `meta` travels as the request's `_meta` (e.g. a W3C traceparent linking the call to the caller's trace).
+        """
+        with TRACER.span(f"mcp {tool_name}", "mcp", server=self.server_url, tool=tool_name):
+            request = {"name": tool_name, "arguments": arguments}
+            if meta:
+                request["_meta"] = meta
+            return self._handle_call(request)
+
+    def _handle_call(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        # Stand-in for the server side of tools/call
+        tool_name, arguments = request["name"], request["arguments"]
         print(f"[MCP] Calling remote tool {tool_name} with {arguments}")
         
         if tool_name == "mcp_read_document":
@@ -86,7 +99,8 @@ class MCPTool(BaseTool):
         )
 
     async def run_async(self, *, args: Dict[str, Any], tool_context: ToolContext) -> Any:
-        return self.client.call_tool(self.name, args)
+        traceparent = TRACER.traceparent()
+        return self.client.call_tool(self.name, args, meta={"traceparent": traceparent} if traceparent else None)
 
 def get_mcp_tools(server_url: str = "http://mcp-server:8080") -> List[BaseTool]:
     """
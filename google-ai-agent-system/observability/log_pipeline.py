@@ -0,0 +1,199 @@
+import atexit
+import json
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+class Truncated:
+    """
+    Lazy log argument: str(value)[:limit] is only computed by the writer thread, if at all.
+    Dicts and lists are shallow-copied here, on the caller's thread, so the writer formats
+    them as they were when logged rather than as the event loop has since mutated them.
+    """
+    __slots__ = ("value", "limit")
+
+    def __init__(self, value: Any, limit: int = 200):
+        if isinstance(value, dict):
+            value = dict(value)
+        elif isinstance(value, list):
+            value = list(value)
+        self.value = value
+        self.limit = limit
+
+    def __str__(self) -> str:
+        text = str(self.value)
+        return text if len(text) <= self.limit else text[:self.limit] + "..."
+
+class EventSampler(logging.Filter):
+    """
+    Keeps a fraction of high-volume records, chosen by their `event` extra
+    (e.g. LOG_SAMPLE="tool.start=0.1"). Warnings and errors are never sampled out.
+    """
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+        self.sampled_out = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        rate = self.rates.get(getattr(record, "event", None))
+        if rate is None or record.levelno >= logging.WARNING or random.random() < rate:
+            return True
+        self.sampled_out += 1
+        return False
+
+class BatchedJsonLogHandler(logging.Handler):
+    """
+    Non-blocking log handler. emit() only appends the unformatted LogRecord to a bounded
+    queue; a background thread formats the records as JSON lines and writes them in batches,
+    flushing when `batch_size` records are waiting or every `flush_interval` seconds, and
+    rotating the file at `max_bytes` (keeping `backup_count` old files).
+    When the queue is full, new records are dropped and counted rather than blocking the caller.
+    """
+    def __init__(
+        self,
+        filename: str,
+        max_bytes: int = 10 * 1024 * 1024,
+        backup_count: int = 5,
+        batch_size: int = 256,
+        flush_interval: float = 1.0,
+        max_queue: int = 10000
+    ):
+        super().__init__()
+        self.filename = filename
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.dropped = 0
+        self.written = 0
+
+        self._queue: Deque[logging.LogRecord] = deque()
+        self._wakeup = threading.Event()
+        self._write_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._file = open(filename, "a", encoding="utf-8")
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def emit(self, record: logging.LogRecord):
+        if len(self._queue) >= self.max_queue:
+            self.dropped += 1
+            return
+        self._queue.append(record)
+        if len(self._queue) >= self.batch_size:
+            self._wakeup.set()
+
+    def _format_line(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 6),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage()
+        }
+        event = getattr(record, "event", None)
+        if event:
+            entry["event"] = event
+        fields = getattr(record, "fields", None)
+        if fields:
+            entry.update(fields)
+        if record.exc_info:
+            entry["exc"] = logging.Formatter().formatException(record.exc_info)
+        return json.dumps(entry, default=str) + "\n"
+
+    def _drain(self):
+        with self._write_lock:
+            lines = []
+            while self._queue:
+                record = self._queue.popleft()
+                try:
+                    lines.append(self._format_line(record))
+                except Exception:
+                    self.handleError(record)
+            if not lines:
+                return
+            self._file.write("".join(lines))
+            self._file.flush()
+            self.written += len(lines)
+            if self.max_bytes and self._file.tell() >= self.max_bytes:
+                self._rotate()
+
+    def _rotate(self):
+        self._file.close()
+        for i in range(self.backup_count - 1, 0, -1):
+            src = f"{self.filename}.{i}"
+            if os.path.exists(src):
+                os.replace(src, f"{self.filename}.{i + 1}")
+        if self.backup_count:
+            os.replace(self.filename, f"{self.filename}.1")
+        else:
+            os.remove(self.filename)
+        self._file = open(self.filename, "a", encoding="utf-8")
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self._drain()
+
+    def flush(self):
+        """Block until everything queued so far is on disk (shutdown, tests, benchmarks)."""
+        while self._queue and self._thread.is_alive():
+            self._wakeup.set()
+            time.sleep(0.001)
+        with self._write_lock:
+            pass  # a batch popped just before we looked is still being written
+
+    def close(self):
+        if not self._stopped.is_set():
+            self._stopped.set()
+            self._wakeup.set()
+            self._thread.join()
+            self._drain()
+            self._file.close()
+        super().close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"queued": len(self._queue), "written": self.written, "dropped": self.dropped}
+
+def _parse_rates(spec: str) -> Dict[str, float]:
+    rates = {}
+    for item in spec.split(","):
+        if "=" in item:
+            event, rate = item.split("=", 1)
+            rates[event.strip()] = float(rate)
+    return rates
+
+_handler: Optional[BatchedJsonLogHandler] = None
+
+def configure_logging(level: int = logging.INFO) -> BatchedJsonLogHandler:
+    """
+    Route all logging through the batched JSON-lines writer. Called once by the engine at
+    startup (never at import). Configured with LOG_FILE, LOG_MAX_BYTES, LOG_BACKUP_COUNT,
+    LOG_BATCH_SIZE, LOG_FLUSH_INTERVAL, LOG_QUEUE_SIZE and LOG_SAMPLE.
+    """
+    global _handler
+    if _handler is not None:
+        return _handler
+
+    _handler = BatchedJsonLogHandler(
+        os.getenv("LOG_FILE", "agent_trace.log"),
+        max_bytes=int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024))),
+        backup_count=int(os.getenv("LOG_BACKUP_COUNT", "5")),
+        batch_size=int(os.getenv("LOG_BATCH_SIZE", "256")),
+        flush_interval=float(os.getenv("LOG_FLUSH_INTERVAL", "1.0")),
+        max_queue=int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+    )
+    rates = _parse_rates(os.getenv("LOG_SAMPLE", ""))
+    if rates:
+        _handler.addFilter(EventSampler(rates))
+
+    root = logging.getLogger()
+    root.addHandler(_handler)
+    root.setLevel(level)
+    atexit.register(_handler.close)
+    return _handler
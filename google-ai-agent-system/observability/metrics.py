@@ -0,0 +1,119 @@
+from bisect import bisect_left
+from typing import Callable, Dict, List, Sequence, Tuple, Union
+
+# Seconds; spans a fast local tool call up to a long multi-agent turn
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1.0):
+        self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def value(self, *label_values: str) -> float:
+        return self._values.get(label_values, 0.0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for values, total in list(self._values.items()):
+            lines.append(f"{self.name}{_labels(self.label_names, values)} {_number(total)}")
+        return lines
+
+class Histogram:
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [per-bucket counts (last slot is +Inf), sum, count]
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *label_values: str):
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for values, (counts, total, count) in list(self._series.items()):
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                le = 'le="%s"' % _number(bound)
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, values, le)} {cumulative}")
+            inf = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{_labels(self.label_names, values, inf)} {count}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, values)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, values)} {count}")
+        return lines
+
+GaugeValue = Union[float, Dict[Tuple[str, ...], float]]
+
+class Gauge:
+    """
+    Read at scrape time from a callback, so owners of the state don't push updates.
+    kind="counter" exposes a cumulative value the owner already tracks.
+    """
+    def __init__(self, name: str, help: str, read: Callable[[], GaugeValue], labels: Sequence[str] = (), kind: str = "gauge"):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self.kind = kind
+        self._read = read
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        value = self._read()
+        series = value if isinstance(value, dict) else {(): value}
+        for values, v in series.items():
+            lines.append(f"{self.name}{_labels(self.label_names, values)} {_number(v)}")
+        return lines
+
+class MetricsRegistry:
+    """
+    In-process metrics rendered in the Prometheus text exposition format.
+    Updated from the event loop only (plugin callbacks), so no locking; scrape from the loop too.
+    """
+    def __init__(self):
+        self._metrics: Dict[str, Union[Counter, Histogram, Gauge]] = {}
+
+    def _add(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> Counter:
+        return self._metrics.get(name) or self._add(Counter(name, help, labels))
+
+    def histogram(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._metrics.get(name) or self._add(Histogram(name, help, labels, buckets))
+
+    def gauge(self, name: str, help: str, read: Callable[[], GaugeValue], labels: Sequence[str] = (), kind: str = "gauge") -> Gauge:
+        return self._add(Gauge(name, help, read, labels, kind))
+
+    def render(self) -> str:
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+# Process-wide registry served at /metrics
+METRICS = MetricsRegistry()
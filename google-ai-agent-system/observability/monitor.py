@@ -1,6 +1,5 @@
 import logging
-import time
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from google.adk.plugins.base_plugin import BasePlugin
 from google.adk.agents.base_agent import BaseAgent
 from google.adk.agents.callback_context import CallbackContext
@@ -8,47 +7,205 @@ from google.adk.tools.base_tool import BaseTool
 from google.adk.tools.tool_context import ToolContext
 from google.adk.models.llm_response import LlmResponse
 from google.adk.models.llm_request import LlmRequest
+from google.adk.agents.invocation_context import InvocationContext
+from observability.metrics import METRICS
+from observability.log_pipeline import Truncated
+from observability.tracing import TRACER, Span
 
-# Configure basic logging to file
-logging.basicConfig(
-    filename='agent_trace.log',
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
-
+# Handlers are attached by the engine (observability/log_pipeline.configure_logging), not at import.
+# Calls below pass %-style args and an `event` extra: nothing is formatted on the event loop,
+# and LOG_SAMPLE can thin out high-volume events by name.
 logger = logging.getLogger("EnterpriseMonitor")
 
+AGENT_DURATION = METRICS.histogram(
+    "adk_agent_duration_seconds", "Agent run time from before_agent to after_agent.", ["agent", "outcome"])
+TOOL_DURATION = METRICS.histogram(
+    "adk_tool_duration_seconds", "Tool execution time.", ["agent", "tool", "outcome"])
+MODEL_DURATION = METRICS.histogram(
+    "adk_model_duration_seconds", "Model call time up to the final (non-partial) response.", ["agent", "model", "outcome"])
+MODEL_TOKENS = METRICS.counter(
+    "adk_model_tokens_total", "Tokens reported in usage_metadata.", ["agent", "model", "type"])
+CONTEXT_CACHE = METRICS.counter(
+    "adk_context_cache_requests_total", "Final model responses by context cache result (hit: some prompt tokens were cached).", ["agent", "result"])
+
+# usage_metadata field -> "type" label
+_TOKEN_FIELDS = (
+    ("prompt_token_count", "prompt"),
+    ("candidates_token_count", "candidates"),
+    ("cached_content_token_count", "cached"),
+    ("thoughts_token_count", "thoughts"),
+    ("tool_use_prompt_token_count", "tool_use_prompt"),
+    ("total_token_count", "total"),
+)
+
 class EnterpriseObservabilityPlugin(BasePlugin):
     """
     ADK Plugin for deep observability and tracing.
     Mimics Google Cloud Operations suite by logging critical agent lifecycle events.
+    Every before/after pair opens and closes a span (observability/tracing.py); the same
+    spans feed the latency histograms.
     """
     def __init__(self):
         super().__init__(name="enterprise_monitor")
+        # Spans of open before/after pairs, keyed by invocation first so pairs that never
+        # close (errors, short-circuits) are closed as errors in after_run, or end_invocation if
+        # the run ended without one
+        self._run_spans: Dict[str, Span] = {}
+        self._agent_starts: Dict[Tuple[str, str], List[Span]] = {}
+        self._model_starts: Dict[Tuple[str, str], Span] = {}
+        self._tool_starts: Dict[Tuple[str, str], Span] = {}
+        # Per agent: [responses, cache hits, prompt tokens, cached prompt tokens]
+        self._context_cache: Dict[str, List[int]] = {}
+
+    async def before_run_callback(self, *, invocation_context: InvocationContext) -> Optional[Any]:
+        # Root span of the turn; an AgentTool's nested runner nests under the calling tool's span
+        span = TRACER.start_span(
+            f"invocation {invocation_context.agent.name}", "invocation",
+            session_id=invocation_context.session.id,
+            user_id=invocation_context.user_id,
+            invocation_id=invocation_context.invocation_id
+        )
+        self._run_spans[invocation_context.invocation_id] = span
+        TRACER.activate(span)
+        return None
 
     async def before_agent_callback(self, *, agent: BaseAgent, callback_context: CallbackContext) -> Optional[Any]:
-        logger.info(f"[Agent:{agent.name}] Invocation started. Session: {callback_context.session.id}")
+        logger.info("[Agent:%s] Invocation started. Session: %s", agent.name, callback_context.session.id,
+                    extra={"event": "agent.start", "fields": {"agent": agent.name, "invocation_id": callback_context.invocation_id}})
+        # A list, since an agent can be re-entered (transferred back to) within one invocation
+        span = TRACER.start_span(f"agent {agent.name}", "agent", agent=agent.name)
+        self._agent_starts.setdefault((callback_context.invocation_id, agent.name), []).append(span)
+        TRACER.activate(span)
         return None
 
     async def after_agent_callback(self, *, agent: BaseAgent, callback_context: CallbackContext) -> Optional[Any]:
-        logger.info(f"[Agent:{agent.name}] Invocation completed.")
+        starts = self._agent_starts.get((callback_context.invocation_id, agent.name))
+        if starts:
+            span = starts.pop()
+            TRACER.end_span(span)
+            TRACER.activate(span.parent)
+            AGENT_DURATION.observe(span.duration_s, agent.name, "ok")
+        logger.info("[Agent:%s] Invocation completed.", agent.name,
+                    extra={"event": "agent.end", "fields": {"agent": agent.name, "invocation_id": callback_context.invocation_id}})
         return None
 
     async def before_tool_callback(self, *, tool: BaseTool, tool_args: Dict[str, Any], tool_context: ToolContext) -> Optional[Dict]:
-        logger.info(f"[Tool:{tool.name}] Starting execution with args: {tool_args}")
+        logger.info("[Tool:%s] Starting execution with args: %s", tool.name, Truncated(tool_args),
+                    extra={"event": "tool.start", "fields": {"tool": tool.name, "invocation_id": tool_context.invocation_id}})
+        span = TRACER.start_span(f"tool {tool.name}", "tool", tool=tool.name, agent=tool_context.agent_name)
+        self._tool_starts[(tool_context.invocation_id, tool_context.function_call_id)] = span
+        # Each function call runs in its own task, so this only parents spans opened by the tool itself
+        TRACER.activate(span)
         return None
 
     async def after_tool_callback(self, *, tool: BaseTool, tool_args: Dict[str, Any], tool_context: ToolContext, result: Dict) -> Optional[Dict]:
-        # Truncate result for logs
-        res_str = str(result)[:200]
-        logger.info(f"[Tool:{tool.name}] Completed. Result: {res_str}...")
+        # Tools report failures as {"error": ...} results as well as by raising
+        self._finish_tool(tool, tool_context, "error" if isinstance(result, dict) and "error" in result else "ok")
+        # Truncated lazily by the log writer, never on the event loop
+        logger.info("[Tool:%s] Completed. Result: %s", tool.name, Truncated(result),
+                    extra={"event": "tool.end", "fields": {"tool": tool.name, "invocation_id": tool_context.invocation_id}})
+        return None
+
+    async def before_model_callback(self, *, callback_context: CallbackContext, llm_request: LlmRequest) -> Optional[LlmResponse]:
+        model = llm_request.model or "unknown"
+        # Not activated: a model call has no child spans
+        self._model_starts[(callback_context.invocation_id, callback_context.agent_name)] = TRACER.start_span(
+            f"model {model}", "model", model=model, agent=callback_context.agent_name)
         return None
 
     async def after_model_callback(self, *, callback_context: CallbackContext, llm_response: LlmResponse) -> Optional[LlmResponse]:
-        usage = llm_response.usage_metadata if hasattr(llm_response, 'usage_metadata') else "N/A"
-        logger.info(f"[LLM] Model responded. Usage: {usage}")
+        if llm_response.partial:
+            return None  # streamed chunk; the aggregated response closes the pair
+        agent = callback_context.agent_name
+        span = self._model_starts.pop((callback_context.invocation_id, agent), None)
+        model = span.attrs["model"] if span else "unknown"
+        if span:
+            outcome = "error" if llm_response.error_code else "ok"
+            TRACER.end_span(span, outcome)
+            MODEL_DURATION.observe(span.duration_s, agent, model, outcome)
+
+        usage = llm_response.usage_metadata
+        if usage:
+            for field, kind in _TOKEN_FIELDS:
+                count = getattr(usage, field, None)
+                if count:
+                    MODEL_TOKENS.inc(agent, model, kind, amount=count)
+            if usage.prompt_token_count:
+                self._record_context_cache(agent, usage.prompt_token_count, usage.cached_content_token_count or 0)
+            logger.info("[LLM] Model responded. Tokens: prompt=%s candidates=%s total=%s",
+                        usage.prompt_token_count, usage.candidates_token_count, usage.total_token_count,
+                        extra={"event": "model.response", "fields": {"agent": agent, "model": model}})
+        return None
+
+    async def on_model_error_callback(self, *, callback_context: CallbackContext, llm_request: LlmRequest, error: Exception) -> Optional[LlmResponse]:
+        span = self._model_starts.pop((callback_context.invocation_id, callback_context.agent_name), None)
+        if span:
+            TRACER.end_span(span, "error")
+            MODEL_DURATION.observe(span.duration_s, callback_context.agent_name, span.attrs["model"], "error")
+        logger.error("[LLM] Model call FAILED with error: %s", error,
+                     extra={"event": "model.error", "fields": {"agent": callback_context.agent_name}})
         return None
 
     async def on_tool_error_callback(self, *, tool: BaseTool, tool_args: Dict[str, Any], tool_context: ToolContext, error: Exception) -> Optional[Dict]:
-        logger.error(f"[Tool:{tool.name}] FAILED with error: {str(error)}")
+        self._finish_tool(tool, tool_context, "exception")
+        logger.error("[Tool:%s] FAILED with error: %s", tool.name, error,
+                     extra={"event": "tool.error", "fields": {"tool": tool.name, "invocation_id": tool_context.invocation_id}})
         return None
+
+    async def after_run_callback(self, *, invocation_context: InvocationContext) -> None:
+        self.end_invocation(invocation_context.invocation_id)
+
+    def end_invocation(self, invocation_id: str, status: str = "ok"):
+        """
+        Close the invocation's open pairs and end its root span with `status`. Also called by
+        engine/invocations.py, as "cancelled" or "error", for runs that end without after_run.
+        A pair still open here never completed, so it is observed with outcome "error".
+        """
+        for key in [k for k in self._agent_starts if k[0] == invocation_id]:
+            for span in self._agent_starts.pop(key):
+                TRACER.end_span(span, "error")
+                AGENT_DURATION.observe(span.duration_s, key[1], "error")
+        for key in [k for k in self._model_starts if k[0] == invocation_id]:
+            span = self._model_starts.pop(key)
+            TRACER.end_span(span, "error")
+            MODEL_DURATION.observe(span.duration_s, key[1], span.attrs["model"], "error")
+        for key in [k for k in self._tool_starts if k[0] == invocation_id]:
+            span = self._tool_starts.pop(key)
+            TRACER.end_span(span, "error")
+            TOOL_DURATION.observe(span.duration_s, span.attrs["agent"], span.attrs["tool"], "error")
+        span = self._run_spans.pop(invocation_id, None)
+        if span:
+            # Ending the root finishes (and exports) the trace; spans left open are marked incomplete
+            TRACER.end_span(span, status)
+            TRACER.activate(span.parent)
+
+    def _record_context_cache(self, agent: str, prompt: int, cached: int):
+        CONTEXT_CACHE.inc(agent, "hit" if cached else "miss")
+        totals = self._context_cache.get(agent)
+        if totals is None:
+            totals = self._context_cache[agent] = [0, 0, 0, 0]
+        totals[0] += 1
+        totals[1] += 1 if cached else 0
+        totals[2] += prompt
+        totals[3] += cached
+
+    def context_cache_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per agent: how often prompt tokens came from the context cache, and how many."""
+        return {
+            agent: {
+                "responses": responses,
+                "hits": hits,
+                "hit_rate": round(hits / responses, 4),
+                "prompt_tokens": prompt,
+                "cached_tokens": cached,
+                "cached_ratio": round(cached / prompt, 4) if prompt else 0.0
+            }
+            for agent, (responses, hits, prompt, cached) in list(self._context_cache.items())
+        }
+
+    def _finish_tool(self, tool: BaseTool, tool_context: ToolContext, outcome: str):
+        span = self._tool_starts.pop((tool_context.invocation_id, tool_context.function_call_id), None)
+        if span is not None:
+            TRACER.end_span(span, outcome)
+            TRACER.activate(span.parent)
+            TOOL_DURATION.observe(span.duration_s, tool_context.agent_name, tool.name, outcome)
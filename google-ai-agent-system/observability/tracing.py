@@ -0,0 +1,208 @@
+import asyncio
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, List, Optional
+
+class Span:
+    __slots__ = ("trace_id", "span_id", "parent", "name", "kind", "start_ns", "end_ns", "status", "attrs", "lane")
+
+    def __init__(self, trace_id: str, parent: Optional["Span"], name: str, kind: str, attrs: Dict[str, Any]):
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent = parent
+        self.name = name
+        self.kind = kind
+        self.start_ns = time.perf_counter_ns()
+        self.end_ns: Optional[int] = None
+        self.status = "open"
+        self.attrs = attrs
+        # Concurrent siblings (parallel tool calls) run in different tasks; one lane per task keeps slices nested
+        try:
+            self.lane = id(asyncio.current_task())
+        except RuntimeError:
+            self.lane = threading.get_ident()
+
+    @property
+    def duration_s(self) -> float:
+        return ((self.end_ns or time.perf_counter_ns()) - self.start_ns) / 1e9
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "span_id": self.span_id,
+            "parent_id": self.parent.span_id if self.parent else None,
+            "name": self.name,
+            "kind": self.kind,
+            "duration_ms": round(self.duration_s * 1000, 3),
+            "status": self.status,
+            "attrs": self.attrs
+        }
+
+class _Trace:
+    __slots__ = ("trace_id", "root", "spans", "started_at")
+
+    def __init__(self, trace_id: str, root: Span):
+        self.trace_id = trace_id
+        self.root = root
+        self.spans: List[Span] = []
+        self.started_at = time.time()
+
+    @property
+    def session_id(self) -> Optional[str]:
+        return self.root.attrs.get("session_id")
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "session_id": self.session_id,
+            "root": self.root.name,
+            "started_at": self.started_at,
+            "duration_ms": round(self.root.duration_s * 1000, 3),
+            "span_count": len(self.spans),
+            "status": self.root.status
+        }
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+class Tracer:
+    """
+    Lightweight in-process span tracer.
+    The current span lives in a ContextVar, so spans opened in one asyncio task nest naturally
+    and tasks spawned from it (parallel tool calls) inherit their parent. A trace is finished
+    when its root span ends; finished traces are kept in a ring buffer of `capacity` traces.
+    """
+    def __init__(self, capacity: Optional[int] = None, max_active: int = 1000):
+        self.capacity = capacity if capacity is not None else int(os.getenv("TRACE_BUFFER_SIZE", "256"))
+        self.max_active = max_active
+        self._active: "OrderedDict[str, _Trace]" = OrderedDict()
+        self._finished: Deque[_Trace] = deque(maxlen=self.capacity)
+        self._lock = threading.Lock()
+
+    # --- Span lifecycle ---
+
+    def current(self) -> Optional[Span]:
+        return _current_span.get()
+
+    def current_trace_id(self) -> Optional[str]:
+        span = _current_span.get()
+        return span.trace_id if span else None
+
+    def start_span(self, name: str, kind: str, trace_id: Optional[str] = None, **attrs) -> Span:
+        """
+        Open a span under the current one. An explicit trace_id that differs from the current
+        trace (e.g. an incoming A2A message) starts a new root in that trace instead.
+        """
+        parent = _current_span.get()
+        if trace_id and parent and parent.trace_id != trace_id:
+            parent = None
+        trace_id = trace_id or (parent.trace_id if parent else str(uuid.uuid4()))
+        span = Span(trace_id, parent, name, kind, attrs)
+
+        with self._lock:
+            trace = self._active.get(trace_id)
+            if trace is None:
+                trace = self._active[trace_id] = _Trace(trace_id, span)
+                if len(self._active) > self.max_active:
+                    # Roots that never ended (crashed invocations); don't let them pile up
+                    self._active.popitem(last=False)
+            trace.spans.append(span)
+        return span
+
+    def end_span(self, span: Span, status: str = "ok"):
+        if span.end_ns is not None:
+            return
+        span.end_ns = time.perf_counter_ns()
+        span.status = status
+        with self._lock:
+            trace = self._active.get(span.trace_id)
+            if trace is None or trace.root is not span:
+                return
+            del self._active[span.trace_id]
+            for other in trace.spans:
+                if other.end_ns is None:
+                    other.end_ns = span.end_ns
+                    other.status = "incomplete"
+            self._finished.append(trace)
+
+    def activate(self, span: Optional[Span]):
+        """Make `span` the parent of spans opened from here on (in this task)."""
+        _current_span.set(span)
+
+    @contextmanager
+    def span(self, name: str, kind: str, trace_id: Optional[str] = None, **attrs):
+        span = self.start_span(name, kind, trace_id=trace_id, **attrs)
+        previous = _current_span.get()
+        _current_span.set(span)
+        try:
+            yield span
+        except BaseException:
+            self.end_span(span, "error")
+            raise
+        else:
+            self.end_span(span, span.status if span.status != "open" else "ok")
+        finally:
+            _current_span.set(previous)
+
+    def traceparent(self) -> Optional[str]:
+        """W3C traceparent for the current span, for calls that leave the process (MCP, HTTP)."""
+        span = _current_span.get()
+        if span is None:
+            return None
+        return f"00-{span.trace_id.replace('-', '')}-{span.span_id}-01"
+
+    # --- Queries and export ---
+
+    def traces(self, session_id: Optional[str] = None, limit: int = 20) -> List[Dict[str, Any]]:
+        with self._lock:
+            finished = list(self._finished)
+        matches = [t for t in reversed(finished) if session_id is None or t.session_id == session_id]
+        return [t.summary() for t in matches[:limit]]
+
+    def _find(self, trace_ids: Optional[List[str]] = None, session_id: Optional[str] = None) -> List[_Trace]:
+        with self._lock:
+            finished = list(self._finished)
+        return [
+            t for t in finished
+            if (trace_ids is None or t.trace_id in trace_ids) and (session_id is None or t.session_id == session_id)
+        ]
+
+    def get(self, trace_id: str) -> Optional[Dict[str, Any]]:
+        found = self._find([trace_id])
+        if not found:
+            return None
+        trace = found[0]
+        return {**trace.summary(), "spans": [s.to_dict() for s in trace.spans]}
+
+    def export_chrome(self, trace_ids: Optional[List[str]] = None, session_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Chrome trace-event JSON (loads in chrome://tracing and ui.perfetto.dev).
+        One process per trace, one thread lane per asyncio task.
+        """
+        events: List[Dict[str, Any]] = []
+        for pid, trace in enumerate(self._find(trace_ids, session_id), start=1):
+            origin_ns = trace.root.start_ns
+            # Absolute offsets keep several traces of one session on a shared timeline
+            base_us = trace.started_at * 1e6
+            lanes: Dict[int, int] = {}
+            label = f"{trace.root.name} [{trace.trace_id[:8]}]"
+            events.append({"ph": "M", "name": "process_name", "pid": pid, "args": {"name": label}})
+            for span in trace.spans:
+                tid = lanes.setdefault(span.lane, len(lanes) + 1)
+                events.append({
+                    "ph": "X",
+                    "name": span.name,
+                    "cat": span.kind,
+                    "pid": pid,
+                    "tid": tid,
+                    "ts": round(base_us + (span.start_ns - origin_ns) / 1000, 3),
+                    "dur": round(((span.end_ns or span.start_ns) - span.start_ns) / 1000, 3),
+                    "args": {"status": span.status, "span_id": span.span_id, **span.attrs}
+                })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+# Process-wide tracer used by the observability plugin, the A2A gateway and the MCP client
+TRACER = Tracer()
@@ -0,0 +1,53 @@
+"""
+Stand-in remote A2A peer for localhost testing of the networked transport.
+Runs its own A2AGateway in a separate process, registers a few mock agents on it and
+serves them over WebSocket with A2AServerAdapter, the way an agent pod would.
+
+Point the engine at it with:
+    A2A_REMOTE_PEERS="agent://finance_ws=ws://127.0.0.1:8765,agent://echo_ws=ws://127.0.0.1:8765"
+
+Usage:
+    python scripts/a2a_peer.py [port] [--quiet]
+"""
+import asyncio
+import contextlib
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from websockets.asyncio.server import serve
+from frameworks.a2a.gateway import A2AGateway
+from frameworks.a2a.network import MAX_FRAME_BYTES, A2AServerAdapter
+from frameworks.a2a.protocol import A2AMessage, A2AMessageType
+
+FINANCE_CAPABILITIES = ["budget_analysis", "tax_forecasting", "portfolio_optimization"]
+
+async def finance_agent(message: A2AMessage) -> A2AMessage:
+    if message.type == A2AMessageType.DISCOVERY:
+        return message.reply(A2AMessageType.RESULT, "Capabilities: budget_analysis, tax_forecasting, portfolio_optimization.",
+                             metadata={"capabilities": FINANCE_CAPABILITIES})
+    return message.reply(A2AMessageType.RESULT, f"Finance analysis for '{message.content}' completed. Status: Profit expected.")
+
+async def echo_agent(message: A2AMessage) -> A2AMessage:
+    return message.reply(A2AMessageType.RESULT, message.content, artifacts=message.artifacts)
+
+async def main(port: int):
+    gateway = A2AGateway()
+    gateway.register_endpoint("agent://finance_ws", finance_agent, capabilities=FINANCE_CAPABILITIES)
+    gateway.register_endpoint("agent://echo_ws", echo_agent, max_concurrent=1024)
+    adapter = A2AServerAdapter(gateway)
+    async with serve(adapter.serve_websockets, "127.0.0.1", port, compression=None, max_size=MAX_FRAME_BYTES):
+        print(f"[A2A Peer] Serving {', '.join(gateway.get_system_topology())} on ws://127.0.0.1:{port}", flush=True)
+        await asyncio.Future()
+
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    peer_port = int(args[0]) if args else 8765
+    # --quiet: drop the per-message [A2A Dispatch] lines (benchmarks)
+    quiet = "--quiet" in sys.argv
+    with contextlib.redirect_stdout(open(os.devnull, "w")) if quiet else contextlib.nullcontext():
+        try:
+            asyncio.run(main(peer_port))
+        except KeyboardInterrupt:
+            pass
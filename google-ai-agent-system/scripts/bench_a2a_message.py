@@ -0,0 +1,89 @@
+"""
+A2AMessage construction and serialization microbenchmark.
+One exchange = build a request, build its reply, then serialize and parse both.
+
+"previous" reproduces the old construction path: str(uuid.uuid4()) for every message_id
+and trace_id, and a new A2AContext for each reply just to copy the trace_id.
+"current" uses the protocol defaults (new_id) and A2AMessage.reply(), which shares the
+request's immutable context; "trusted reply" also skips validating the reply, as the
+gateway does for its own error replies. Parsing always validates, since frames can come from a peer.
+
+Usage:
+    python scripts/bench_a2a_message.py [exchanges]
+"""
+import os
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from frameworks.a2a.codec import MsgpackCodec
+from frameworks.a2a.protocol import A2AContext, A2AMessage, A2AMessageType
+
+def previous_exchange(i: int):
+    request = A2AMessage(
+        message_id=str(uuid.uuid4()),
+        sender="agent://supervisor", receiver="agent://finance_remote",
+        type=A2AMessageType.TASK_ASSIGN, content=f"Analyze cost center {i}",
+        context=A2AContext(trace_id=str(uuid.uuid4()), ttl=30)
+    )
+    reply = A2AMessage(
+        message_id=str(uuid.uuid4()),
+        sender=request.receiver, receiver=request.sender,
+        type=A2AMessageType.RESULT, content="Status: Profit expected.",
+        in_reply_to=request.message_id,
+        context=A2AContext(trace_id=request.context.trace_id)
+    )
+    return request, reply
+
+def current_exchange(i: int):
+    request = A2AMessage(
+        sender="agent://supervisor", receiver="agent://finance_remote",
+        type=A2AMessageType.TASK_ASSIGN, content=f"Analyze cost center {i}",
+        context=A2AContext(ttl=30)
+    )
+    return request, request.reply(A2AMessageType.RESULT, "Status: Profit expected.")
+
+def trusted_exchange(i: int):
+    request = A2AMessage(
+        sender="agent://supervisor", receiver="agent://finance_remote",
+        type=A2AMessageType.TASK_ASSIGN, content=f"Analyze cost center {i}",
+        context=A2AContext(ttl=30)
+    )
+    return request, request.reply(A2AMessageType.RESULT, "Status: Profit expected.", trusted=True)
+
+def run(name: str, build, encode, decode, n: int) -> float:
+    start = time.perf_counter()
+    exchanges = [build(i) for i in range(n)]
+    built = time.perf_counter() - start
+
+    start = time.perf_counter()
+    frames = [(encode(request), encode(reply)) for request, reply in exchanges]
+    encoded = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for request, reply in frames:
+        decode(request)
+        decode(reply)
+    decoded = time.perf_counter() - start
+
+    total = built + encoded + decoded
+    messages = 2 * n
+    print(f"{name:<22} build {built / messages * 1e6:5.2f}us | serialize {encoded / messages * 1e6:5.2f}us | "
+          f"parse {decoded / messages * 1e6:5.2f}us | {messages / total:8.0f} msgs/s")
+    return messages / total
+
+if __name__ == "__main__":
+    n_exchanges = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    codec = MsgpackCodec()
+    json_encode, json_decode = (lambda m: m.model_dump_json()), A2AMessage.model_validate_json
+
+    print(f"\n--- [A2A Message Benchmark] {n_exchanges} request/reply exchanges ---")
+    run("warmup", current_exchange, json_encode, json_decode, 1000)
+    before = run("previous, json", previous_exchange, json_encode, json_decode, n_exchanges)
+    after = run("current, json", current_exchange, json_encode, json_decode, n_exchanges)
+    run("trusted reply, json", trusted_exchange, json_encode, json_decode, n_exchanges)
+    run("previous, msgpack", previous_exchange, codec.encode, codec.decode, n_exchanges)
+    fastest = run("current, msgpack", current_exchange, codec.encode, codec.decode, n_exchanges)
+    print(f"Build + serialize + parse: {after / before:.2f}x with json, {fastest / before:.2f}x with the msgpack codec")
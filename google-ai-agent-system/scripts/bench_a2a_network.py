@@ -0,0 +1,141 @@
+"""
+Networked A2A transport benchmarks, entirely on localhost.
+1. Serialization: encode + decode of a typical A2AMessage (with one JSON artifact) through
+   pydantic's model_dump_json / model_validate_json versus the msgpack codec, plus frame size.
+2. Round trip: requests from a local gateway to a stand-in peer process
+   (scripts/a2a_peer.py) over WebSocket. Compares a fresh connection per request with the
+   pooled, pipelined WebSocketTransport using each codec.
+
+Usage:
+    python scripts/bench_a2a_network.py [requests] [concurrency]
+"""
+import asyncio
+import contextlib
+import os
+import socket
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from websockets.asyncio.client import connect
+from frameworks.a2a.codec import JsonCodec, MsgpackCodec
+from frameworks.a2a.gateway import A2AGateway
+from frameworks.a2a.network import WebSocketTransport
+from frameworks.a2a.protocol import A2AArtifact, A2AContext, A2AMessage, A2AMessageType
+
+RECEIVER = "agent://echo_ws"
+
+def sample_message(i: int = 0) -> A2AMessage:
+    return A2AMessage(
+        sender="agent://supervisor",
+        receiver=RECEIVER,
+        type=A2AMessageType.TASK_ASSIGN,
+        content=f"Analyze Q3 budget variance for cost center {i} and flag anomalies above 5%.",
+        context=A2AContext(priority=3),
+        artifacts=[A2AArtifact(mimetype="application/json", payload={"rows": [[i, 1200.5, "ok"]] * 10})],
+        metadata={"origin": "bench", "attempt": 1}
+    )
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))] if ordered else 0.0
+
+def bench_serialization(n: int):
+    print(f"\n--- [A2A Serialization] {n} messages, encode + decode ---")
+    message = sample_message()
+    cases = [
+        ("model_dump_json/validate_json", lambda m: m.model_dump_json(), A2AMessage.model_validate_json),
+        ("MsgpackCodec", MsgpackCodec().encode, MsgpackCodec().decode),
+    ]
+    results = {}
+    for name, encode, decode in cases:
+        frame = encode(message)
+        assert decode(frame) == message
+        start = time.perf_counter()
+        for _ in range(n):
+            frame = encode(message)
+        encoded = time.perf_counter() - start
+        start = time.perf_counter()
+        for _ in range(n):
+            decode(frame)
+        decoded = time.perf_counter() - start
+        results[name] = encoded + decoded
+        print(f"{name:<32} encode {encoded / n * 1e6:6.2f}us | decode {decoded / n * 1e6:6.2f}us | "
+              f"{n / (encoded + decoded):9.0f} msgs/s | {len(frame):5d} bytes")
+    base, fast = results.values()
+    print(f"msgpack codec {base / fast:.1f}x faster, frame {len(MsgpackCodec().encode(message)) / len(JsonCodec().encode(message)):.0%} of JSON size")
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+async def wait_for_peer(url: str, timeout: float = 15.0):
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            async with connect(url):
+                return
+        except OSError:
+            if time.perf_counter() > deadline:
+                raise
+            await asyncio.sleep(0.1)
+
+class ConnectPerRequest(WebSocketTransport):
+    """Baseline: no pooling, a new WebSocket (TCP + HTTP upgrade) for every request."""
+    async def send(self, message, endpoint=None):
+        async with connect(self.url, compression=None) as websocket:
+            await websocket.send(self.codec.encode(message))
+            return self.codec.decode(await websocket.recv())
+
+async def bench_round_trip(name: str, transport, n: int, concurrency: int):
+    gateway = A2AGateway(transport=transport)
+    gateway.register_endpoint(RECEIVER, None, transport=transport, max_concurrent=concurrency)
+    semaphore = asyncio.Semaphore(concurrency)
+    rtts, failures = [], 0
+
+    async def one(i: int):
+        nonlocal failures
+        async with semaphore:
+            start = time.perf_counter()
+            reply = await gateway.request(sample_message(i), timeout=10)
+            if reply.type == A2AMessageType.ERROR:
+                failures += 1
+            else:
+                rtts.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(n)))
+    elapsed = time.perf_counter() - start
+    if isinstance(transport, WebSocketTransport) and not isinstance(transport, ConnectPerRequest):
+        await transport.close()
+    sys.__stdout__.write(f"{name:<32} {n / elapsed:8.0f} req/s | rtt p50 {percentile(rtts, 0.5) * 1000:6.2f}ms "
+                         f"p99 {percentile(rtts, 0.99) * 1000:6.2f}ms | failed {failures}\n")
+    return n / elapsed
+
+async def round_trips(n: int, concurrency: int):
+    port = free_port()
+    url = f"ws://127.0.0.1:{port}"
+    peer = subprocess.Popen([sys.executable, os.path.join(ROOT, "scripts", "a2a_peer.py"), str(port), "--quiet"],
+                            env={**os.environ, "PYTHONPATH": ROOT})
+    try:
+        await wait_for_peer(url)
+        print(f"\n--- [A2A Round Trip] {n} requests, concurrency {concurrency}, peer process on {url} ---")
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            before = await bench_round_trip("connect per request, json", ConnectPerRequest(url, codec=JsonCodec()), n, concurrency)
+            await bench_round_trip("pooled x1, json", WebSocketTransport(url, pool_size=1, codec=JsonCodec()), n, concurrency)
+            await bench_round_trip("pooled x1, msgpack", WebSocketTransport(url, pool_size=1, codec=MsgpackCodec()), n, concurrency)
+            after = await bench_round_trip("pooled x4, msgpack", WebSocketTransport(url, pool_size=4, codec=MsgpackCodec()), n, concurrency)
+        print(f"Pooled msgpack transport {after / before:.1f}x the throughput of a connection per request")
+    finally:
+        peer.terminate()
+        peer.wait()
+
+if __name__ == "__main__":
+    n_requests = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    n_concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 32
+    bench_serialization(20000)
+    asyncio.run(round_trips(n_requests, n_concurrency))
@@ -0,0 +1,112 @@
+"""
+A2A endpoint resilience under failure, on the simulated network transport.
+1. Hung peer: an endpoint that never answers, hit by `requests` requests with a 2s TTL.
+   Without a deadline or breaker, every caller waits out its TTL. With them, the first few
+   time out at A2A_ENDPOINT_TIMEOUT and the rest fail fast while the circuit is open.
+2. Flaky peer: 20% of deliveries hit a reset connection. OBSERVATION messages, with 1
+   attempt versus 3 attempts with jittered backoff.
+3. Long-tail peer: lognormal round trips (median 10ms, heavy tail). DISCOVERY requests
+   without hedging versus a duplicate after the endpoint's p90 latency.
+
+Usage:
+    python scripts/bench_a2a_resilience.py [requests]
+"""
+import asyncio
+import contextlib
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from frameworks.a2a.gateway import A2AGateway
+from frameworks.a2a.protocol import A2AContext, A2AMessage, A2AMessageType
+from frameworks.a2a.resilience import ResiliencePolicy
+from frameworks.a2a.transport import SimulatedNetworkTransport
+
+RECEIVER = "agent://bench_peer"
+NEVER = 10 ** 6
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))] if ordered else 0.0
+
+def report(name: str, latencies, failures: int, extra: str = ""):
+    sys.__stdout__.write(f"{name:<34} p50 {percentile(latencies, 0.5) * 1000:8.1f}ms | p99 {percentile(latencies, 0.99) * 1000:8.1f}ms | "
+                         f"max {max(latencies) * 1000:8.1f}ms | failed {failures:4d}{extra}\n")
+
+async def echo(message: A2AMessage) -> A2AMessage:
+    return message.reply(A2AMessageType.RESULT, "ok")
+
+async def hung(message: A2AMessage) -> A2AMessage:
+    await asyncio.sleep(NEVER)
+
+async def fire(gateway: A2AGateway, message_type: A2AMessageType, n: int, concurrency: int, ttl: int = 30):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, failures = [], 0
+
+    async def one():
+        nonlocal failures
+        async with semaphore:
+            message = A2AMessage(sender="agent://supervisor", receiver=RECEIVER, type=message_type,
+                                 content="bench", context=A2AContext(ttl=ttl))
+            start = time.perf_counter()
+            reply = await gateway.request(message)
+            latencies.append(time.perf_counter() - start)
+            if reply.type == A2AMessageType.ERROR:
+                failures += 1
+
+    await asyncio.gather(*(one() for _ in range(n)))
+    return latencies, failures
+
+def gateway_for(endpoint, transport, policy: ResiliencePolicy) -> A2AGateway:
+    gateway = A2AGateway(transport=transport)
+    gateway.register_endpoint(RECEIVER, endpoint, resilience=policy, max_concurrent=1024)
+    return gateway
+
+async def hung_peer(n: int):
+    print(f"\n--- [Hung Peer] {n} requests, 2s TTL, concurrency 8 ---")
+    transport = SimulatedNetworkTransport(latency_ms=1, seed=1)
+    off = ResiliencePolicy(timeout=NEVER, breaker_failures=NEVER)
+    on = ResiliencePolicy(timeout=0.25, breaker_failures=5, breaker_reset=30)
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        before = await fire(gateway_for(hung, transport, off), A2AMessageType.TASK_ASSIGN, n, 8, ttl=2)
+        after = await fire(gateway_for(hung, transport, on), A2AMessageType.TASK_ASSIGN, n, 8, ttl=2)
+    report("no deadline, no breaker", *before)
+    report("0.25s deadline + breaker", *after)
+    print(f"Callers blocked on the hung peer: {sum(before[0]):.1f}s -> {sum(after[0]):.1f}s in total")
+
+async def flaky_peer(n: int):
+    print(f"\n--- [Flaky Peer] {n} OBSERVATION messages, 20% connection resets ---")
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        once = gateway_for(echo, SimulatedNetworkTransport(latency_ms=5, error_rate=0.2, seed=2),
+                           ResiliencePolicy(retry_attempts=1, breaker_failures=NEVER))
+        before = await fire(once, A2AMessageType.OBSERVATION, n, 16)
+        retried = gateway_for(echo, SimulatedNetworkTransport(latency_ms=5, error_rate=0.2, seed=2),
+                              ResiliencePolicy(retry_attempts=3, retry_base_delay=0.01, breaker_failures=NEVER))
+        after = await fire(retried, A2AMessageType.OBSERVATION, n, 16)
+    report("1 attempt", *before)
+    report("3 attempts, jittered backoff", *after, extra=f" | retries {retried.resilience[RECEIVER].retries}")
+
+async def long_tail_peer(n: int):
+    print(f"\n--- [Long-Tail Peer] {n} DISCOVERY requests, lognormal RTT (median 10ms) ---")
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        plain = gateway_for(echo, SimulatedNetworkTransport(latency_ms=10, jitter_ms=30, distribution="lognormal", seed=3),
+                            ResiliencePolicy(hedge_percentile=0))
+        before = await fire(plain, A2AMessageType.DISCOVERY, n, 16)
+        hedged = gateway_for(echo, SimulatedNetworkTransport(latency_ms=10, jitter_ms=30, distribution="lognormal", seed=3),
+                             ResiliencePolicy(hedge_percentile=90, hedge_min_samples=50))
+        after = await fire(hedged, A2AMessageType.DISCOVERY, n, 16)
+    report("no hedging", *before)
+    guard = hedged.resilience[RECEIVER]
+    report("hedge after p90", *after, extra=f" | hedged {guard.hedged} ({guard.hedged / n:.0%} extra load)")
+    print(f"p99 latency: {percentile(before[0], 0.99) * 1000:.1f}ms -> {percentile(after[0], 0.99) * 1000:.1f}ms")
+
+async def main(n: int):
+    await hung_peer(min(n, 200))
+    await flaky_peer(n)
+    await long_tail_peer(n)
+
+if __name__ == "__main__":
+    n_requests = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    asyncio.run(main(n_requests))
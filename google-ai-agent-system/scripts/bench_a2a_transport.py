@@ -0,0 +1,104 @@
+"""
+Per-message A2A dispatch overhead for each transport.
+Sends messages one after another through A2AGateway.dispatch to an endpoint that replies
+immediately, so the measured time is the gateway (history, tracing) plus the transport.
+The old gateway slept 100ms per message; the in-process transport shows what co-located
+agents pay now. The simulated transport is run at zero latency (pure overhead) and with a
+latency profile, loss and errors, reporting the realised round-trip distribution under
+concurrent load.
+
+Usage:
+    python scripts/bench_a2a_transport.py [messages] [concurrency]
+"""
+import asyncio
+import contextlib
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from frameworks.a2a.gateway import A2AGateway
+from frameworks.a2a.protocol import A2AContext, A2AMessage, A2AMessageType
+from frameworks.a2a.transport import InProcessTransport, SimulatedNetworkTransport
+
+RECEIVER = "agent://bench_echo"
+
+async def echo(message: A2AMessage) -> A2AMessage:
+    return A2AMessage(
+        sender=message.receiver,
+        receiver=message.sender,
+        type=A2AMessageType.RESULT,
+        content="ok",
+        context=A2AContext(trace_id=message.context.trace_id)
+    )
+
+class SleepTransport(InProcessTransport):
+    """The previous dispatch path: a fixed 100ms sleep before every call."""
+    name = "sleep_100ms"
+
+    async def send(self, message, endpoint):
+        await asyncio.sleep(0.1)
+        return await endpoint(message)
+
+def message(i: int) -> A2AMessage:
+    return A2AMessage(sender="agent://bench", receiver=RECEIVER, type=A2AMessageType.OBSERVATION, content=f"tick {i}")
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))] if ordered else 0.0
+
+async def sequential(name: str, transport, n: int):
+    gateway = A2AGateway(transport=transport)
+    gateway.register_endpoint(RECEIVER, echo)
+    messages = [message(i) for i in range(n)]
+    start = time.perf_counter()
+    for m in messages:
+        await gateway.dispatch(m)
+    elapsed = time.perf_counter() - start
+    sys.__stdout__.write(f"{name:<32} {elapsed / n * 1e6:10.1f}us per message | {n / elapsed:10.0f} msgs/s\n")
+    return elapsed / n
+
+async def concurrent(name: str, transport, n: int, concurrency: int):
+    gateway = A2AGateway(transport=transport)
+    gateway.register_endpoint(RECEIVER, echo)
+    semaphore = asyncio.Semaphore(concurrency)
+    rtts, failures = [], 0
+
+    async def one(i):
+        nonlocal failures
+        async with semaphore:
+            start = time.perf_counter()
+            reply = await gateway.dispatch(message(i))
+            if reply is None:
+                failures += 1
+            else:
+                rtts.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(n)))
+    elapsed = time.perf_counter() - start
+    sys.__stdout__.write(
+        f"{name:<32} rtt p50 {percentile(rtts, 0.5) * 1000:7.2f}ms p99 {percentile(rtts, 0.99) * 1000:7.2f}ms | "
+        f"failed {failures}/{n} (lost {transport.lost}, errors {transport.errors}) | {n / elapsed:8.0f} msgs/s\n")
+
+async def main(n: int, concurrency: int):
+    print(f"\n--- [A2A Transport Benchmark] {n} messages, sequential ---")
+    # The gateway prints one [A2A Dispatch] line per message; keep the terminal out of the timing
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        await sequential("sleep 100ms (before)", SleepTransport(), min(n, 20))
+        inprocess = await sequential("InProcessTransport", InProcessTransport(), n)
+        await sequential("SimulatedNetwork (0ms)", SimulatedNetworkTransport(latency_ms=0, seed=1), n)
+
+        sys.__stdout__.write(f"\n--- {n} messages, concurrency {concurrency}, simulated network ---\n")
+        await concurrent("uniform 20ms +/- 5ms", SimulatedNetworkTransport(
+            latency_ms=20, jitter_ms=5, distribution="uniform", seed=1), n, concurrency)
+        await concurrent("lognormal 20ms, 1% loss, 2% err", SimulatedNetworkTransport(
+            latency_ms=20, jitter_ms=20, distribution="lognormal", loss_rate=0.01, error_rate=0.02,
+            loss_timeout=0.2, seed=1), n, concurrency)
+    print(f"\nIn-process dispatch overhead {inprocess * 1e6:.1f}us vs 100000us with the fixed sleep")
+
+if __name__ == "__main__":
+    n_messages = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    n_concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 64
+    asyncio.run(main(n_messages, n_concurrency))
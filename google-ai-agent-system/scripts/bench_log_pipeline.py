@@ -0,0 +1,90 @@
+"""
+Event-loop blocking time of the observability logging path.
+Concurrent tasks log the way EnterpriseObservabilityPlugin's tool callbacks do, first through
+the old synchronous FileHandler with eager f-string formatting, then through the batched
+JSON-lines pipeline with lazy arguments. Reports the time spent inside log calls (the loop is
+blocked for all of it) and the lag seen by a task that expects to wake every millisecond.
+
+Usage:
+    python scripts/bench_log_pipeline.py [tasks] [calls_per_task]
+"""
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from observability.log_pipeline import BatchedJsonLogHandler, Truncated
+
+# A typical search/MCP tool result
+RESULT = {"results": [{"title": f"Result {i}", "snippet": "lorem ipsum dolor sit amet " * 20} for i in range(10)]}
+ARGS = {"query": "Google Gemini enterprise adoption", "max_results": 10}
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))] if ordered else 0.0
+
+def log_sync(logger, i):
+    logger.info(f"[Tool:web_search] Starting execution with args: {ARGS}")
+    res_str = str(RESULT)[:200]
+    logger.info(f"[Tool:web_search] Completed. Result: {res_str}...")
+
+def log_batched(logger, i):
+    logger.info("[Tool:%s] Starting execution with args: %s", "web_search", Truncated(ARGS),
+                extra={"event": "tool.start", "fields": {"tool": "web_search", "invocation_id": f"inv-{i}"}})
+    logger.info("[Tool:%s] Completed. Result: %s", "web_search", Truncated(RESULT),
+                extra={"event": "tool.end", "fields": {"tool": "web_search", "invocation_id": f"inv-{i}"}})
+
+async def run(name, handler, log_pair, tasks, calls):
+    logger = logging.getLogger(f"bench.{name}")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    logger.addHandler(handler)
+
+    blocked = []
+    lags = []
+    done = asyncio.Event()
+
+    async def lag_monitor():
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(0.001)
+            lags.append(time.perf_counter() - start - 0.001)
+
+    async def worker(w):
+        for i in range(calls):
+            start = time.perf_counter()
+            log_pair(logger, w * calls + i)
+            blocked.append(time.perf_counter() - start)
+            await asyncio.sleep(0)
+
+    monitor = asyncio.create_task(lag_monitor())
+    wall = time.perf_counter()
+    await asyncio.gather(*(worker(w) for w in range(tasks)))
+    wall = time.perf_counter() - wall
+    done.set()
+    await monitor
+
+    handler.close()
+    logger.removeHandler(handler)
+    print(f"{name:<30} blocked total {sum(blocked) * 1000:8.1f}ms | per pair p50 {percentile(blocked, 0.5) * 1e6:6.1f}us "
+          f"p99 {percentile(blocked, 0.99) * 1e6:7.1f}us | loop lag p99 {percentile(lags, 0.99) * 1000:6.2f}ms "
+          f"max {max(lags, default=0) * 1000:6.2f}ms | wall {wall * 1000:7.1f}ms")
+    return sum(blocked)
+
+async def main(tasks, calls):
+    print(f"\n--- [Log Pipeline Benchmark] {tasks} tasks x {calls} tool calls ---")
+    with tempfile.TemporaryDirectory() as tmp:
+        sync_handler = logging.FileHandler(os.path.join(tmp, "sync.log"))
+        sync_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+        before = await run("FileHandler (before)", sync_handler, log_sync, tasks, calls)
+        after = await run("BatchedJsonLogHandler (after)", BatchedJsonLogHandler(os.path.join(tmp, "batched.log")), log_batched, tasks, calls)
+    print(f"Event-loop time spent logging reduced {before / after:.1f}x")
+
+if __name__ == "__main__":
+    n_tasks = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    n_calls = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    asyncio.run(main(n_tasks, n_calls))
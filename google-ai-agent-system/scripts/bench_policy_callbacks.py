@@ -0,0 +1,127 @@
+"""
+Cost of AgentPolicyPlugin's callback path for one invocation.
+A supervisor turn is simulated as a run of agent hops (before_agent + before_model, plus
+tool calls, some sensitive). The previous implementation looked the identity up in every
+callback and checked permissions with a list scan; the current one resolves it once per
+invocation through the IdentityCache and checks a compiled bitset. Both edit a real
+LlmRequest the same way (shared policy instruction, trailing identity note), so only
+identity resolution and the permission checks differ.
+Run with a simulated IdP round trip to see what each lookup would cost against a real IdP.
+
+Usage:
+    python scripts/bench_policy_callbacks.py [invocations] [idp_latency_ms]
+"""
+import asyncio
+import contextlib
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from google.adk.models.llm_request import LlmRequest
+from google.genai import types
+from engine.identity import IdentityCache, LocalIdentityProvider, UserIdentity, check_permission
+from engine.policy import IDENTITY_MARKER, POLICY_INSTRUCTION, AgentPolicyPlugin
+
+AGENT_HOPS = 4
+TOOLS_PER_HOP = 3
+TOOLS = ["web_search", "mcp_read_document", "open_a2a_communication"]
+USERS = ["user_001", "user_002", "user_003", "user_404"]
+
+class LegacyPolicy:
+    """The per-callback lookup path this benchmark compares against."""
+    def __init__(self, provider: LocalIdentityProvider, sensitive_tools):
+        self.provider = provider
+        self.sensitive_tools = sensitive_tools
+
+    async def identity(self, user_id):
+        return await self.provider.lookup(user_id) or UserIdentity(
+            user_id=user_id, username="Unknown", role="guest", permissions=["search_web"])
+
+    async def before_agent(self, ctx):
+        identity = await self.identity(ctx.user_id)
+        ctx.state["user_role"] = identity.role
+        ctx.state["username"] = identity.username
+
+    async def before_tool(self, tool, args, ctx):
+        identity = await self.identity(ctx.user_id)
+        if tool.name in self.sensitive_tools:
+            print(f"[POLICY] Intercepted sensitive tool: {tool.name} for user: {identity.username} ({identity.role})")
+            if tool.name == "mcp_read_document" and not check_permission(identity, "read_internal"):
+                return {"error": "SECURITY_BLOCK"}
+            if args.get("access_level") == "write" and identity.role != "admin":
+                return {"error": "SECURITY_BLOCK"}
+        return None
+
+    async def before_model(self, ctx, request):
+        identity = await self.identity(ctx.user_id)
+        if POLICY_INSTRUCTION not in request.config.system_instruction:
+            request.append_instructions([POLICY_INSTRUCTION])
+        request.contents.append(types.Content(role="user", parts=[types.Part(
+            text=f"{IDENTITY_MARKER} You are currently assisting {identity.username} (Role: {identity.role})."
+        )]))
+
+def request():
+    # A real LlmRequest: the plugin appends to its system instruction and its contents
+    return LlmRequest(
+        model="gemini-2.5-flash",
+        contents=[types.Content(role="user", parts=[types.Part(text="Summarize the latest finance report.")])],
+        config=types.GenerateContentConfig(system_instruction="You are the Supervisor.")
+    )
+
+def contexts(i):
+    user_id = USERS[i % len(USERS)]
+    invocation = SimpleNamespace(invocation_id=f"inv-{i}", user_id=user_id)
+    callback = SimpleNamespace(invocation_id=f"inv-{i}", user_id=user_id, state={}, agent_name="Supervisor")
+    return invocation, callback
+
+async def run_legacy(policy, invocations):
+    tools = [SimpleNamespace(name=name) for name in TOOLS]
+    for i in range(invocations):
+        _, ctx = contexts(i)
+        for hop in range(AGENT_HOPS):
+            await policy.before_agent(ctx)
+            await policy.before_model(ctx, request())
+            for t in range(TOOLS_PER_HOP):
+                await policy.before_tool(tools[(hop + t) % len(tools)], {"access_level": "read"}, ctx)
+
+async def run_current(plugin, invocations):
+    tools = [SimpleNamespace(name=name) for name in TOOLS]
+    for i in range(invocations):
+        invocation, ctx = contexts(i)
+        await plugin.before_run_callback(invocation_context=invocation)
+        for hop in range(AGENT_HOPS):
+            await plugin.before_agent_callback(agent=None, callback_context=ctx)
+            await plugin.before_model_callback(callback_context=ctx, llm_request=request())
+            for t in range(TOOLS_PER_HOP):
+                await plugin.before_tool_callback(tool=tools[(hop + t) % len(tools)], tool_args={"access_level": "read"}, tool_context=ctx)
+        await plugin.after_run_callback(invocation_context=invocation)
+
+async def timed(name, coro, provider, invocations):
+    # The [POLICY] audit lines are printed by both paths; keep the terminal out of the timing
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        await coro
+    elapsed = time.perf_counter() - start
+    print(f"{name:<28} {elapsed / invocations * 1e6:9.1f}us per invocation | "
+          f"IdP lookups {provider.lookups:6d} ({provider.lookups / invocations:.2f} per invocation)")
+    return elapsed
+
+async def main(invocations, latency_ms):
+    print(f"\n--- [Policy Callback Benchmark] {invocations} invocations x {AGENT_HOPS} hops x {TOOLS_PER_HOP} tools, "
+          f"IdP latency {latency_ms}ms ---")
+    legacy_idp = LocalIdentityProvider(latency=latency_ms / 1000)
+    before = await timed("per-callback lookup (before)", run_legacy(LegacyPolicy(legacy_idp, ["mcp_read_document"]), invocations),
+                         legacy_idp, invocations)
+
+    idp = LocalIdentityProvider(latency=latency_ms / 1000)
+    plugin = AgentPolicyPlugin(sensitive_tools=["mcp_read_document"], identities=IdentityCache(idp))
+    after = await timed("cached context (after)", run_current(plugin, invocations), idp, invocations)
+    print(f"Policy callback path {before / after:.1f}x faster")
+
+if __name__ == "__main__":
+    n_invocations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    idp_latency_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 0.0
+    asyncio.run(main(n_invocations, idp_latency_ms))
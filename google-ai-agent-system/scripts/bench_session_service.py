@@ -0,0 +1,83 @@
+"""
+Session backend benchmark: append and load latency of the ADK InMemorySessionService
+versus the durable SqliteSessionService at 10k+ sessions.
+
+Usage:
+    python scripts/bench_session_service.py [num_sessions] [events_per_session]
+"""
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from google.adk.events.event import Event
+from google.adk.sessions.in_memory_session_service import InMemorySessionService
+from google.genai import types
+from engine.sessions.sqlite_service import SqliteSessionService
+
+APP = "bench_app"
+
+def make_event(i: int) -> Event:
+    return Event(
+        author="user" if i % 2 == 0 else "Supervisor",
+        invocation_id=f"inv_{i // 2}",
+        content=types.Content(role="user", parts=[types.Part(text=f"Message {i}: " + "lorem ipsum " * 20)])
+    )
+
+def summarize(label: str, samples):
+    samples = sorted(samples)
+    p50 = samples[len(samples) // 2] * 1e6
+    p99 = samples[int(len(samples) * 0.99)] * 1e6
+    print(f"  {label:<14} n={len(samples):<7} mean={statistics.mean(samples) * 1e6:8.1f}us  p50={p50:8.1f}us  p99={p99:8.1f}us")
+
+async def bench(service, num_sessions: int, events_per_session: int):
+    sessions = []
+    for i in range(num_sessions):
+        sessions.append(await service.create_session(app_name=APP, user_id=f"user_{i % 100}", session_id=f"s{i}"))
+
+    append_times = []
+    for n in range(events_per_session):
+        event_template = make_event(n)
+        for session in sessions:
+            event = event_template.model_copy()
+            start = time.perf_counter()
+            await service.append_event(session, event)
+            append_times.append(time.perf_counter() - start)
+    summarize("append", append_times)
+
+    hot_times = []
+    for i in range(0, num_sessions, max(1, num_sessions // 2000)):
+        start = time.perf_counter()
+        loaded = await service.get_session(app_name=APP, user_id=f"user_{i % 100}", session_id=f"s{i}")
+        hot_times.append(time.perf_counter() - start)
+        assert len(loaded.events) == events_per_session
+    summarize("load (hot)", hot_times)
+
+    if isinstance(service, SqliteSessionService):
+        service.clear_cache()
+        cold_times = []
+        for i in range(0, num_sessions, max(1, num_sessions // 2000)):
+            start = time.perf_counter()
+            loaded = await service.get_session(app_name=APP, user_id=f"user_{i % 100}", session_id=f"s{i}")
+            cold_times.append(time.perf_counter() - start)
+            assert len(loaded.events) == events_per_session
+        summarize("load (cold)", cold_times)
+
+async def main():
+    num_sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    events_per_session = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    print(f"--- Session backend benchmark: {num_sessions} sessions x {events_per_session} events ---")
+
+    print("\nInMemorySessionService")
+    await bench(InMemorySessionService(), num_sessions, events_per_session)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print("\nSqliteSessionService (WAL + LRU hot cache)")
+        await bench(SqliteSessionService(os.path.join(tmp, "bench.sqlite"), cache_size=num_sessions), num_sessions, events_per_session)
+
+if __name__ == "__main__":
+    asyncio.run(main())
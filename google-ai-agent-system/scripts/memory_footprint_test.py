@@ -0,0 +1,82 @@
+"""
+Tracemalloc check that MemoryStore view mode stops holding the transcript twice.
+Simulates chat turns against the ADK InMemorySessionService and measures the
+extra memory MemoryStore adds on top of the session events in copy vs view mode.
+
+Usage:
+    python scripts/memory_footprint_test.py [sessions] [turns]
+"""
+import asyncio
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from google.adk.events.event import Event
+from google.adk.sessions.in_memory_session_service import InMemorySessionService
+from google.genai import types
+from engine.memory.store import MemoryStore, event_text
+
+APP = "footprint_app"
+
+def make_text(prefix: str, size: int) -> str:
+    # Unique per call so nothing is interned or shared by accident
+    return (prefix + " ") + "".join(chr(97 + (i * 7 + len(prefix)) % 26) for i in range(size))
+
+async def simulate(mode, sessions: int, turns: int) -> int:
+    """Return bytes allocated for the whole run (session service + optional MemoryStore)."""
+    gc.collect()
+    tracemalloc.start()
+    service = InMemorySessionService()
+    memory = MemoryStore(mode=mode, persist_dir="") if mode else None
+
+    for s in range(sessions):
+        session = await service.create_session(app_name=APP, user_id="user_001", session_id=f"s{s}")
+        for t in range(turns):
+            user_message = types.Content(role="user", parts=[types.Part(text=make_text(f"user {s}-{t}", 200))])
+            # The runner wraps the caller's Content in the session's user event
+            await service.append_event(session, Event(author="user", content=user_message))
+            turn_events = []
+            for agent in ("Supervisor", "Senior_Researcher", "Professional_Tech_Writer"):
+                event = Event(
+                    author=agent,
+                    invocation_id=f"inv_{s}_{t}",
+                    content=types.Content(role="model", parts=[types.Part(text=make_text(f"{agent} {s}-{t}", 1500))])
+                )
+                await service.append_event(session, event)
+                turn_events.append(event)
+
+            if memory is not None:
+                memory.add_user_message(f"s{s}", user_message)
+                memory.add_turn(f"s{s}", turn_events, "".join(event_text(e) for e in turn_events))
+
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current
+
+async def test_memory_footprint(sessions: int = 100, turns: int = 5):
+    print("\n--- [MemoryStore Footprint Test] ---")
+    baseline = await simulate(None, sessions, turns)
+    copy_total = await simulate("copy", sessions, turns)
+    view_total = await simulate("view", sessions, turns)
+
+    copy_extra = (copy_total - baseline) / sessions
+    view_extra = (view_total - baseline) / sessions
+    print(f"Session events only : {baseline / sessions / 1024:8.1f} KiB/session")
+    print(f"+ MemoryStore copy  : {copy_total / sessions / 1024:8.1f} KiB/session (+{copy_extra / 1024:.1f} KiB)")
+    print(f"+ MemoryStore view  : {view_total / sessions / 1024:8.1f} KiB/session (+{view_extra / 1024:.1f} KiB)")
+
+    if view_extra <= copy_extra * 0.5:
+        print("✅ PASS: View mode at least halves MemoryStore's per-session footprint.")
+        return True
+    print("❌ FAIL: View mode did not halve MemoryStore's per-session footprint.")
+    return False
+
+if __name__ == "__main__":
+    n_sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    n_turns = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    ok = asyncio.run(test_memory_footprint(n_sessions, n_turns))
+    sys.exit(0 if ok else 1)
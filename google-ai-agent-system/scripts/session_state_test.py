@@ -0,0 +1,57 @@
+"""
+Check that SqliteSessionService applies state deltas the way ADK's InMemorySessionService does:
+top-level keys are replaced (a nested dict is not merged) and None is stored, not deleted.
+Runs the same deltas, including app: and user: keys, against both services and compares
+the state they return, from the hot cache and after a cold reload.
+
+Usage:
+    python scripts/session_state_test.py
+"""
+import asyncio
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from google.adk.events.event import Event
+from google.adk.events.event_actions import EventActions
+from google.adk.sessions.in_memory_session_service import InMemorySessionService
+from engine.sessions.sqlite_service import SqliteSessionService
+
+APP, USER, SESSION = "state_app", "user_001", "s1"
+
+INITIAL = {"cfg": {"x": 1}, "flag": True, "app:limits": {"a": 1}, "user:prefs": {"theme": "dark"}}
+DELTAS = [
+    {"cfg": {"y": 2}, "flag": None},
+    {"app:limits": {"b": 2}, "user:prefs": None, "count": 1},
+    {"cfg": None, "count": 2},
+]
+
+async def replay(service) -> dict:
+    session = await service.create_session(app_name=APP, user_id=USER, session_id=SESSION, state=dict(INITIAL))
+    for i, delta in enumerate(DELTAS):
+        await service.append_event(session, Event(
+            invocation_id=f"inv-{i}", author="agent", actions=EventActions(state_delta=dict(delta))))
+    return (await service.get_session(app_name=APP, user_id=USER, session_id=SESSION)).state
+
+async def test_session_state() -> bool:
+    print("\n--- [Session State Semantics Test] ---")
+    expected = await replay(InMemorySessionService())
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sqlite = SqliteSessionService(db_path=os.path.join(tmp, "state.sqlite"))
+        hot = await replay(sqlite)
+        sqlite.clear_cache()
+        cold = (await sqlite.get_session(app_name=APP, user_id=USER, session_id=SESSION)).state
+
+    print(f"InMemorySessionService : {expected}")
+    print(f"SqliteSessionService   : {hot} (hot), {cold} (cold)")
+    if hot == expected and cold == expected:
+        print("✅ PASS: SQLite session state matches the in-memory service.")
+        return True
+    print("❌ FAIL: SQLite session state differs from the in-memory service.")
+    return False
+
+if __name__ == "__main__":
+    sys.exit(0 if asyncio.run(test_session_state()) else 1)
@@ -1,36 +1,43 @@
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 import asyncio
+import os
 from google.adk.tools.base_tool import BaseTool
 from google.adk.tools.tool_context import ToolContext
 from google.genai import types
 from frameworks.a2a.protocol import A2AMessage, A2AMessageType, A2AContext
 from frameworks.a2a.gateway import A2AGateway
+from frameworks.a2a.network import WebSocketTransport, parse_peers
+from observability.tracing import TRACER
 
 # Global Gateway instance (Simulated service mesh)
 A2A_NET = A2AGateway()
 
+FINANCE_CAPABILITIES = ["budget_analysis", "tax_forecasting", "portfolio_optimization"]
+
 async def mock_remote_finance_agent(message: A2AMessage) -> A2AMessage:
     """A simulated external agent using A2A protocol."""
     if message.type == A2AMessageType.DISCOVERY:
-        return A2AMessage(
-            sender=message.receiver,
-            receiver=message.sender,
-            type=A2AMessageType.RESULT,
-            content="Capabilities: budget_analysis, tax_forecasting, portfolio_optimization.",
-            context=A2AContext(trace_id=message.context.trace_id)
-        )
-    return A2AMessage(
-        sender=message.receiver,
-        receiver=message.sender,
-        type=A2AMessageType.RESULT,
-        content=f"Finance analysis for '{message.content}' completed. Status: Profit expected.",
-        context=A2AContext(trace_id=message.context.trace_id)
-    )
+        return message.reply(A2AMessageType.RESULT, "Capabilities: budget_analysis, tax_forecasting, portfolio_optimization.",
+                             metadata={"capabilities": FINANCE_CAPABILITIES})
+    return message.reply(A2AMessageType.RESULT, f"Finance analysis for '{message.content}' completed. Status: Profit expected.")
 
 # Register the remote agent in our local mesh
-A2A_NET.register_endpoint("agent://finance_remote", mock_remote_finance_agent)
+A2A_NET.register_endpoint(
+    "agent://finance_remote", mock_remote_finance_agent,
+    capabilities=FINANCE_CAPABILITIES
+)
 
-def open_a2a_communication(recipient: str, task_text: str, msg_type: str = "task_assign") -> str:
+# Agents in other pods, reached over pooled WebSockets (A2A_REMOTE_PEERS="agent://x=ws://host:8000/a2a/ws,...")
+_peer_transports: Dict[str, WebSocketTransport] = {}
+for _uri, _url in parse_peers(os.getenv("A2A_REMOTE_PEERS", "")).items():
+    # Agents served by the same peer share its connection pool
+    _transport = _peer_transports.setdefault(_url, WebSocketTransport(_url))
+    A2A_NET.register_endpoint(_uri, None, transport=_transport)
+
+# Seconds a tool-initiated A2A request may wait for its reply (becomes the message TTL)
+A2A_TOOL_TTL = int(os.getenv("A2A_TOOL_TTL", "30"))
+
+async def open_a2a_communication(recipient: str, task_text: str, msg_type: str = "task_assign") -> str:
     """
     Open an A2A protocol channel to a remote agent.
     
@@ -39,36 +46,97 @@ def open_a2a_communication(recipient: str, task_text: str, msg_type: str = "task
         task_text: The payload or command.
         msg_type: The A2A message type (discovery, task_assign, handoff).
     """
-    # Note: ADK prefers sync functions for simple tools, but we wrap the async dispatch
     try:
-        loop = asyncio.get_event_loop()
-    except RuntimeError:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-    
+        message_type = A2AMessageType(msg_type)
+    except ValueError:
+        return f"[A2A Protocol Error] Unknown message type '{msg_type}'. Use one of: {', '.join(t.value for t in A2AMessageType)}."
+
+    # Continue the caller's trace so the A2A hop shows up inside the ADK invocation
+    trace_id = TRACER.current_trace_id()
+    context = A2AContext(trace_id=trace_id, ttl=A2A_TOOL_TTL) if trace_id else A2AContext(ttl=A2A_TOOL_TTL)
     msg = A2AMessage(
         sender="agent://supervisor",
         receiver=recipient,
-        type=A2AMessageType(msg_type),
-        content=task_text
+        type=message_type,
+        content=task_text,
+        context=context
     )
     
-    # Run the async dispatch in a synchronous-looking way for the agent
     print(f"[A2A Tool] Opening channel to {recipient}...")
+    # Awaits only this request's reply (matched by message_id); other turns keep running meanwhile
+    response = await A2A_NET.request(msg)
     
-    # For safety in varied environments, we check if loop is running
-    if loop.is_running():
-        # This is a bit tricky in async environments, but for ADK sync tools:
-        # In real world, A2A would be an async tool.
-        return f"[A2A Tool] Deferred: A2A Request to {recipient} sent to mesh."
-    
-    response = loop.run_until_complete(A2A_NET.dispatch(msg))
-    
-    if response:
-        return f"[A2A Protocol Result] {response.sender}: {response.content}"
-    return "[A2A Protocol Error] Failed to receive response from remote agent."
+    if response.type == A2AMessageType.ERROR:
+        return f"[A2A Protocol Error] {response.content}"
+    return f"[A2A Protocol Result] {response.sender}: {response.content}"
+
+async def broadcast_a2a(
+    task_text: str,
+    msg_type: str = "discovery",
+    recipients: Optional[List[str]] = None,
+    capability: str = "",
+    policy: str = "all",
+    min_replies: int = 0,
+    deadline_seconds: float = 10.0
+) -> str:
+    """
+    Send one A2A message to several remote agents at once and collect their replies in a single step.
+    Use it instead of calling open_a2a_communication once per agent, e.g. to gather capabilities or bids.
+
+    Args:
+        task_text: The payload or command sent to every recipient.
+        msg_type: The A2A message type (discovery, negotiation, task_assign).
+        recipients: A2A URIs to contact. Leave empty to contact every agent offering `capability`.
+        capability: Contact every agent that offers this capability (e.g. 'budget_analysis'), when no recipients are given.
+        policy: 'all' waits for every agent, 'quorum' for a majority, 'first' for the first reply.
+        min_replies: Stop as soon as this many agents replied (overrides the policy when > 0).
+        deadline_seconds: Overall time limit; agents that have not replied by then are reported as unanswered.
+    """
+    try:
+        message_type = A2AMessageType(msg_type)
+    except ValueError:
+        return f"[A2A Protocol Error] Unknown message type '{msg_type}'."
+    if not recipients and not capability:
+        recipients = A2A_NET.get_system_topology()
+
+    trace_id = TRACER.current_trace_id()
+    try:
+        result = await A2A_NET.broadcast(
+            message_type, task_text, sender="agent://supervisor",
+            receivers=recipients, capability=capability or None,
+            policy=policy, min_replies=min_replies or None, deadline=deadline_seconds,
+            context=A2AContext(trace_id=trace_id) if trace_id else None
+        )
+    except ValueError as e:
+        return f"[A2A Protocol Error] {e}"
+
+    if not result.receivers:
+        return f"[A2A Broadcast] No agents offer '{capability}'."
+    lines = [f"[A2A Broadcast] {len(result.replies)}/{len(result.receivers)} replied in {result.elapsed_ms:.0f}ms "
+             f"(needed {result.required}{'' if result.satisfied else ', NOT met'})."]
+    lines += [f"- {uri}: {reply.content}" for uri, reply in result.replies.items()]
+    lines += [f"- {uri}: ERROR {error}" for uri, error in result.errors.items()]
+    lines += [f"- {uri}: no reply" for uri in result.unanswered]
+    return "\n".join(lines)
 
 def list_a2a_directory() -> str:
-    """Retrieve the list of active agents in the A2A Open Directory."""
-    endpoints = A2A_NET.get_system_topology()
-    return "Active A2A Agent Registry: " + ", ".join(endpoints)
+    """Retrieve the list of active agents in the A2A Open Directory, with the capabilities each one offers."""
+    entries = []
+    for uri in A2A_NET.get_system_topology():
+        capabilities = A2A_NET.capabilities.capabilities_of(uri)
+        entries.append(f"{uri} ({', '.join(capabilities)})" if capabilities else uri)
+    return "Active A2A Agent Registry: " + ", ".join(entries)
+
+def find_a2a_agents(capability: str) -> str:
+    """
+    Find which remote A2A agents can do something, from the directory's capability index.
+    Answers immediately without contacting any agent; use it instead of sending discovery messages.
+
+    Args:
+        capability: The capability needed, e.g. 'budget_analysis' or 'tax forecasting'.
+    """
+    endpoints = A2A_NET.endpoints_with(capability)
+    if endpoints:
+        return f"[A2A Directory] Agents offering '{capability}': " + ", ".join(endpoints)
+    known = A2A_NET.capabilities.known()
+    return f"[A2A Directory] No agent offers '{capability}'. Known capabilities: {', '.join(known) or 'none discovered yet'}."